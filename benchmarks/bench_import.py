@@ -0,0 +1,86 @@
+#! python3
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ["networkx", "numpy", "matplotlib", "pyvis", "requests", "bs4",
+         "lxml", "sqlite3"]
+
+# run in a fresh interpreter, prints the seconds and the heavy modules
+# that got loaded as json
+CHILD = '''
+import json, sys
+from time import perf_counter
+sys.path.insert(0, %(root)r)
+start = perf_counter()
+%(statement)s
+elapsed = perf_counter() - start
+print(json.dumps({"seconds": elapsed,
+                  "loaded": [m for m in %(heavy)r if m in sys.modules]}))
+'''
+
+CASES = {
+    # what a worker that only looks up prerequisites pays
+    "core": "import curriculummapper",
+    "core+graph": "import curriculummapper\n"
+                  "import curriculummapper.analysis\n"
+                  "import curriculummapper.layout",
+    # everything, like every import did before the split
+    "full": "import curriculummapper\n"
+            "import curriculummapper.analysis\n"
+            "import curriculummapper.courseleaf\n"
+            "import curriculummapper.fetch\n"
+            "import curriculummapper.layout\n"
+            "import curriculummapper.parallel\n"
+            "import curriculummapper.style\n"
+            "import pyvis.network",
+}
+
+
+def time_case(statement, repeat):
+    ''' (list of seconds, heavy modules loaded) over repeat fresh runs '''
+    code = CHILD % {"root": ROOT, "statement": statement, "heavy": HEAVY}
+    times = []
+    loaded = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], check=True,
+                             capture_output=True, text=True).stdout
+        result = json.loads(out.splitlines()[-1])
+        times.append(result["seconds"])
+        loaded = result["loaded"]
+    return times, loaded
+
+
+def main():
+    '''
+    Times "import curriculummapper" in fresh interpreters against the
+    optional submodules, python benchmarks/bench_import.py [--json]
+    '''
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true",
+                        help="print the results as json")
+    args = parser.parse_args()
+    results = {}
+    for name, statement in CASES.items():
+        times, loaded = time_case(statement, args.repeat)
+        results[name] = {"median_seconds": statistics.median(times),
+                         "min_seconds": min(times),
+                         "loaded": loaded}
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for name, result in results.items():
+        print("%-12s median %.4f s  min %.4f s  loads: %s" %
+              (name, result["median_seconds"], result["min_seconds"],
+               ", ".join(result["loaded"]) or "-"))
+
+
+if __name__ == "__main__":
+    main()
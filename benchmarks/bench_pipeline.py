@@ -0,0 +1,152 @@
+#! python3
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from curriculummapper import Curriculum  # noqa: E402
+from synthetic import (SYNTHETIC_EXTRACTOR, courseleaf_pages,  # noqa: E402
+                       synthetic_records)
+
+STAGES = ["extract", "add_course", "update", "generate_nx",
+          "generate_graph_analysis", "print_graph", "print_all"]
+
+
+def run_pipeline(n_courses, seed=0, fan_in=2.0, alias_density=0.05,
+                 cycle_rate=0.0, skip=(), workdir=None):
+    '''
+    {stage : seconds} of one pass over a synthetic bulletin of n_courses,
+    stages in skip are left out. generate_nx includes one analysis of
+    the graph, generate_graph_analysis times another from scratch.
+    Files are written under workdir.
+    '''
+    records = synthetic_records(n_courses, seed=seed, fan_in=fan_in,
+                                alias_density=alias_density,
+                                cycle_rate=cycle_rate)
+    pages = courseleaf_pages(records)
+    curriculum = Curriculum("Synthetic", "Benchmark %d" % n_courses, "AAAA")
+    timings = {}
+
+    def stage(name, func):
+        if name in skip:
+            return
+        start = perf_counter()
+        # generate_nx and friends print progress, keep it out of the way
+        with redirect_stdout(io.StringIO()):
+            func()
+        timings[name] = perf_counter() - start
+
+    extracted = []
+    stage("extract", lambda: extracted.extend(
+        record for page in pages
+        for record in SYNTHETIC_EXTRACTOR(page, curriculum)))
+    if not extracted:
+        extracted = records
+    stage("add_course", lambda: [curriculum.add_record(record)
+                                 for record in extracted])
+    stage("update", curriculum.update)
+    stage("generate_nx", curriculum.generate_nx)
+
+    def analysis():
+        # generate_nx already analysed the graph, start from scratch
+        curriculum.analysis_engine = None
+        curriculum.generate_graph_analysis()
+
+    stage("generate_graph_analysis", analysis)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(dir=workdir) as scratch:
+        os.chdir(scratch)
+        try:
+            stage("print_graph", lambda: curriculum.print_graph(show=False))
+            stage("print_all", lambda: curriculum.print_all(show=False))
+        finally:
+            os.chdir(cwd)
+    return timings
+
+
+def compare(results, baseline, tolerance):
+    '''
+    [(size, stage, baseline seconds, seconds)] of the stages more than
+    tolerance (fraction) slower than in baseline
+    '''
+    regressions = []
+    for size, timings in results.items():
+        for name, seconds in timings.items():
+            before = baseline.get(size, {}).get(name)
+            if before and seconds > before * (1 + tolerance):
+                regressions.append((size, name, before, seconds))
+    return regressions
+
+
+def main():
+    '''
+    Times every pipeline stage over synthetic bulletins,
+    python benchmarks/bench_pipeline.py --sizes 1000 10000
+    --output results.json --baseline baseline.json
+    pyvis takes quadratic time to build big networks, add
+    --skip print_graph print_all for 100000 courses
+    '''
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[1000, 10000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fan-in", type=float, default=2.0)
+    parser.add_argument("--alias-density", type=float, default=0.05)
+    parser.add_argument("--cycle-rate", type=float, default=0.0)
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="passes per size, the fastest one counts")
+    parser.add_argument("--skip", nargs="*", default=[], choices=STAGES)
+    parser.add_argument("--output", help="write the results as json")
+    parser.add_argument("--baseline", help="json results to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="slowdown over the baseline counted as a "
+                             "regression")
+    args = parser.parse_args()
+
+    results = {}
+    for size in args.sizes:
+        best = {}
+        for _ in range(args.repeat):
+            timings = run_pipeline(size, args.seed, args.fan_in,
+                                   args.alias_density, args.cycle_rate,
+                                   args.skip)
+            for name, seconds in timings.items():
+                best[name] = min(seconds, best.get(name, seconds))
+        results[str(size)] = best
+        print("%d courses" % size)
+        for name in STAGES:
+            if name in best:
+                print("\t%-24s %.4f s" % (name, best[name]))
+
+    report = {"python": platform.python_version(),
+              "platform": platform.platform(),
+              "settings": {"seed": args.seed, "fan_in": args.fan_in,
+                           "alias_density": args.alias_density,
+                           "cycle_rate": args.cycle_rate},
+              "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for size, name, before, seconds in regressions:
+            print("REGRESSION %s courses %s: %.4f s -> %.4f s" %
+                  (size, name, before, seconds))
+        if regressions:
+            sys.exit(1)
+        print("No regressions against %s" % args.baseline)
+
+
+if __name__ == "__main__":
+    main()
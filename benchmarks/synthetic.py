@@ -0,0 +1,101 @@
+#! python3
+
+import random
+from html import escape
+
+from curriculummapper import CourseLeafExtractor, CourseRecord
+
+
+WORDS = ("data", "analysis", "theory", "methods", "systems", "design",
+         "advanced", "introduction", "applied", "topics", "models",
+         "computation", "statistics", "learning", "networks", "algebra",
+         "structures", "seminar", "research", "practice", "foundations")
+
+# reads the pages made by courseleaf_pages
+SYNTHETIC_EXTRACTOR = CourseLeafExtractor(
+    desc_stop=r"Prerequisite:|Also offered as",
+    prereq_search=r"Prerequisite: ([^.]*)",
+    alias_search=r"Also offered as ([^.]*)")
+
+
+def subject_codes(count):
+    ''' count distinct four capital subject codes, AAAA, AAAB, ... '''
+    codes = []
+    for i in range(count):
+        letters = []
+        for _ in range(4):
+            i, digit = divmod(i, 26)
+            letters.append(chr(ord("A") + digit))
+        codes.append("".join(reversed(letters)))
+    return codes
+
+
+def synthetic_records(n_courses, seed=0, per_subject=100, fan_in=2.0,
+                      alias_density=0.05, cycle_rate=0.0,
+                      description_words=40):
+    '''
+    list of n_courses CourseRecords of a made up bulletin, the same for
+    the same arguments.
+    per_subject (int) courses per subject code, at most 900
+    fan_in (float) average number of prerequisites per course, drawn
+        from earlier courses so the graph is a DAG ...
+    cycle_rate (float) ... except this share of courses also requires a
+        later course
+    alias_density (float) share of courses cross-listed under a second
+        subject code
+    '''
+    rng = random.Random(seed)
+    subjects = subject_codes(max(1, -(-n_courses // per_subject)))
+    alias_subjects = subject_codes(len(subjects) * 2)[len(subjects):]
+    ids = ["%s %d" % (subjects[i // per_subject], 100 + i % per_subject)
+           for i in range(n_courses)]
+    records = []
+    for i, course_id in enumerate(ids):
+        subject_code, course_code = course_id.split(" ")
+        prereqs = set()
+        if i > 0:
+            count = min(i, int(rng.expovariate(1 / fan_in)
+                               if fan_in > 0 else 0))
+            # mostly recent courses, like a subject's own lower levels
+            for _ in range(count):
+                back = min(i, 1 + int(rng.expovariate(1 / 50)))
+                prereqs.add(ids[i - back])
+        if rng.random() < cycle_rate and i + 1 < n_courses:
+            prereqs.add(ids[rng.randrange(i + 1, n_courses)])
+        aliases = ()
+        if rng.random() < alias_density:
+            alias = "%s %s" % (rng.choice(alias_subjects), course_code)
+            aliases = (alias, course_id)
+        title = " ".join(rng.choice(WORDS)
+                         for _ in range(rng.randint(2, 5))).title()
+        description = " ".join(rng.choice(WORDS)
+                               for _ in range(description_words)) + "."
+        records.append(CourseRecord(subject_code, course_code, title,
+                                    description, tuple(sorted(prereqs)),
+                                    aliases))
+    return records
+
+
+def courseleaf_page(records):
+    ''' bytes of one CourseLeaf style catalog page listing records '''
+    parts = ["<html><body><div id='courseinventorycontainer'>"]
+    for record in records:
+        course_id = "%s %s" % (record.subject_code, record.course_code)
+        text = escape(record.course_description)
+        if record.prerequisites:
+            text += " Prerequisite: %s." % " and ".join(record.prerequisites)
+        if record.aliases:
+            text += " Also offered as %s." % record.aliases[0]
+        parts.append(
+            "<div class='courseblock'>"
+            "<p class='courseblocktitle'><strong>%s. %s. 3 Units."
+            "</strong></p><p class='courseblockdesc'>%s</p></div>"
+            % (course_id, escape(record.course_title), text))
+    parts.append("</div></body></html>")
+    return "\n".join(parts).encode("utf-8")
+
+
+def courseleaf_pages(records, per_page=500):
+    ''' records split into pages of per_page courses, see courseleaf_page '''
+    return [courseleaf_page(records[i:i + per_page])
+            for i in range(0, len(records), per_page)]
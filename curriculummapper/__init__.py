@@ -1,8 +1,27 @@
 #!python3
 
+import importlib
+
 from .curriculummapper import Course, Curriculum
+from .instrument import Instrument, JsonSink, LoggingSink
+from .records import CourseRecord
+from .store import CourseStore, ProgramView
+
+# these pull in networkx or lxml, so they are imported on first use
+LAZY = {'AnalysisBudget': 'analysis',
+        'CourseLeafExtractor': 'courseleaf'}
+
+
+def __getattr__(name):
+    if name in LAZY:
+        return getattr(importlib.import_module('.' + LAZY[name], __name__),
+                       name)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
 
-__all__ = ['Course', 'Curriculum']
+__all__ = ['Course', 'Curriculum', 'CourseRecord', 'CourseLeafExtractor',
+           'CourseStore', 'ProgramView', 'AnalysisBudget', 'Instrument',
+           'JsonSink', 'LoggingSink']
 '''The __init__.py files are required to make Python treat directories
 containing the file as packages. This prevents directories with a common name,
 such as string, unintentionally hiding valid modules that occur later on the
@@ -0,0 +1,95 @@
+#! python3
+
+
+class AliasForest:
+    '''
+    Disjoint sets of course handles, one set per group of cross-listed
+    or paired courses. Every set keeps one canonical handle, which is the
+    course that gets drawn and returned by Curriculum.get_course.
+    '''
+    def __init__(self, prefer=None):
+        '''
+        parent = {handle : parent handle}, roots point at themselves
+        canonical_of = {root : canonical handle}
+        members_of = {root : [handle]}
+        prefer (callable) handle -> bool, preferred handles win canonical
+        '''
+        self.parent = {}
+        self.canonical_of = {}
+        self.members_of = {}
+        self.prefer = prefer
+
+    @classmethod
+    def from_groups(cls, groups, prefer=None):
+        '''
+        AliasForest of groups (iterable of (canonical, [handle]) pairs) as
+        they are, nothing is joined or preferred again. The canonical
+        handle becomes the root of its group.
+        '''
+        forest = cls(prefer)
+        for canonical, members in groups:
+            members = list(members)
+            for handle in members:
+                forest.parent[handle] = canonical
+            forest.parent[canonical] = canonical
+            forest.canonical_of[canonical] = canonical
+            forest.members_of[canonical] = members
+        return forest
+
+    def __len__(self):
+        ''' number of handles that belong to a group '''
+        return len(self.parent)
+
+    def find(self, handle):
+        ''' root of the set holding handle (with path halving) '''
+        parent = self.parent
+        if handle not in parent:
+            return handle
+        while parent[handle] != handle:
+            parent[handle] = parent[parent[handle]]
+            handle = parent[handle]
+        return handle
+
+    def canonical(self, handle):
+        ''' the canonical handle of the set holding handle '''
+        return self.canonical_of.get(self.find(handle), handle)
+
+    def members(self, handle):
+        ''' every handle in the set holding handle '''
+        return self.members_of.get(self.find(handle), [handle])
+
+    def groups(self):
+        ''' yields the member list of every set with more than one handle '''
+        return iter(self.members_of.values())
+
+    def union(self, a, b):
+        '''
+        Joins the sets of a and b.
+        Returns (kept, lost, moved) where kept is the canonical handle of
+        the joined set, lost the canonical handle that stopped being one
+        and moved the handles whose canonical changed,
+        or None if a and b were already in the same set.
+        '''
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return None
+        for root in (root_a, root_b):
+            if root not in self.parent:
+                self.parent[root] = root
+                self.canonical_of[root] = root
+                self.members_of[root] = [root]
+        kept = self.canonical_of[root_a]
+        lost = self.canonical_of[root_b]
+        if (self.prefer is not None and not self.prefer(kept) and
+                self.prefer(lost)):
+            kept, lost = lost, kept
+        moved = list(self.members_of[root_b if lost ==
+                                     self.canonical_of[root_b] else root_a])
+        # union by size, the smaller member list is copied over
+        if len(self.members_of[root_a]) < len(self.members_of[root_b]):
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.members_of[root_a].extend(self.members_of.pop(root_b))
+        del self.canonical_of[root_b]
+        self.canonical_of[root_a] = kept
+        return kept, lost, moved
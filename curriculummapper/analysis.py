@@ -0,0 +1,368 @@
+#! python3
+
+import hashlib
+import heapq
+import json
+import math
+import random
+import zlib
+from collections import namedtuple
+from functools import cached_property
+from time import perf_counter
+
+import networkx as nx
+
+from .instrument import NULL_INSTRUMENT
+from .reachability import reachability_counts
+
+
+# an analysis value that may not be exact: the truth lies in
+# [lower, upper], exact is True when lower == upper was proven
+Estimate = namedtuple("Estimate", ["value", "lower", "upper", "exact"])
+
+
+class AnalysisBudget:
+    '''
+    How much work generate_graph_analysis may put into the diameter and
+    transitivity of the largest connected component.
+    '''
+    def __init__(self, exact_limit=2000, sweeps=64, seconds=None,
+                 samples=20000, confidence=0.95, seed=0):
+        '''
+        exact_limit (int) components with at most this many nodes get the
+            exact networkx values, bigger ones get Estimates
+        sweeps (int) most breadth first searches for the diameter bounds
+        seconds (float) wall time for the diameter bounds, None for no limit
+        samples (int) wedges sampled for the transitivity
+        confidence (float) of the transitivity error bound
+        seed (int) for the random choices, so reruns agree
+        '''
+        self.exact_limit = exact_limit
+        self.sweeps = sweeps
+        self.seconds = seconds
+        self.samples = samples
+        self.confidence = confidence
+        self.seed = seed
+
+    def key(self):
+        ''' string telling budgets apart in the AnalysisCache '''
+        return "%s:%s:%s:%s:%s:%s" % (self.exact_limit, self.sweeps,
+                                      self.seconds, self.samples,
+                                      self.confidence, self.seed)
+
+
+def bfs_levels(graph, source):
+    ''' {node : distance from source} of an undirected graph '''
+    # the plain dict of dicts, graph.adj wraps every lookup in a view
+    adj = graph._adj
+    levels = {source: 0}
+    frontier = [source]
+    depth = 0
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for node in frontier:
+            for neighbor in adj[node]:
+                if neighbor not in levels:
+                    levels[neighbor] = depth
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    return levels
+
+
+def farthest(levels):
+    ''' (node, distance) farthest away in levels '''
+    node = max(levels, key=levels.get)
+    return node, levels[node]
+
+
+def diameter_bounds(graph, sweeps=64, seconds=None):
+    '''
+    Estimate of the diameter of a connected undirected graph.
+    A 4-sweep picks a central start node, then iFUB runs breadth first
+    searches from the nodes farthest from it until the lower and upper
+    bounds meet (exact) or the sweeps / seconds budget runs out.
+    '''
+    start_time = perf_counter()
+    searches = 0
+
+    def out_of_budget():
+        return (searches >= sweeps or
+                (seconds is not None and
+                 perf_counter() - start_time >= seconds))
+
+    # 4-sweep: two double sweeps, the second from the middle of the first
+    start = max(graph.degree, key=lambda pair: pair[1])[0]
+    a, start_ecc = farthest(bfs_levels(graph, start))
+    levels_a = bfs_levels(graph, a)
+    b, lower = farthest(levels_a)
+    levels_b = bfs_levels(graph, b)
+    searches = 3
+    middle = min(levels_a, key=lambda n: max(levels_a[n], levels_b[n]))
+    levels = bfs_levels(graph, middle)
+    searches += 1
+    eccentricity = max(levels.values())
+    lower = max(lower, eccentricity)
+    # eccentricities the sweeps found already, iFUB doesn't redo them
+    known = {start: start_ecc, a: max(levels_a.values()),
+             b: max(levels_b.values()),
+             middle: eccentricity}
+    upper = 2 * eccentricity
+    by_level = {}
+    for node, level in levels.items():
+        by_level.setdefault(level, []).append(node)
+    # iFUB: nodes up to level i are at most 2i apart, once level i is
+    # swept the ones below it are at most 2(i - 1) apart, stop once the
+    # lower bound reaches that
+    for i in range(eccentricity, 0, -1):
+        if lower >= 2 * i:
+            upper = lower
+            break
+        for node in by_level[i]:
+            if node in known:
+                lower = max(lower, known[node])
+                continue
+            if out_of_budget():
+                return Estimate(lower, lower, upper, lower == upper)
+            lower = max(lower, max(bfs_levels(graph, node).values()))
+            searches += 1
+        if lower > 2 * (i - 1):
+            upper = lower
+            break
+        upper = 2 * (i - 1)
+    else:
+        upper = lower
+    return Estimate(lower, lower, upper, lower == upper)
+
+
+def transitivity_estimate(graph, samples=20000, confidence=0.95, seed=0):
+    '''
+    Estimate of nx.transitivity of an undirected graph from sampled
+    wedges (two edges sharing a node), the fraction of closed wedges is
+    the transitivity. Bounds come from Hoeffding's inequality.
+    '''
+    rng = random.Random(seed)
+    adj = graph.adj
+    centers = []
+    weights = []
+    for node, degree in graph.degree:
+        if degree > 1:
+            centers.append(node)
+            weights.append(degree * (degree - 1) // 2)
+    if not centers:
+        return Estimate(0, 0, 0, True)
+    total = sum(weights)
+    if total <= samples:
+        # fewer wedges than samples, just count them
+        value = nx.transitivity(graph)
+        return Estimate(value, value, value, True)
+    closed = 0
+    neighbors = {}
+    for center in rng.choices(centers, weights=weights, k=samples):
+        if center not in neighbors:
+            neighbors[center] = list(adj[center])
+        u, v = rng.sample(neighbors[center], 2)
+        if v in adj[u]:
+            closed += 1
+    value = closed / samples
+    error = math.sqrt(math.log(2 / (1 - confidence)) / (2 * samples))
+    return Estimate(value, max(0.0, value - error), min(1.0, value + error),
+                    False)
+
+
+def graph_fingerprint(graph):
+    '''
+    sha256 of the sorted nodes and edges of graph, the same graph always
+    gets the same fingerprint however it was built
+    '''
+    digest = hashlib.sha256()
+    for node in sorted(map(str, graph.nodes)):
+        digest.update(node.encode() + b"\n")
+    digest.update(b"\0")
+    for u, v in sorted((str(u), str(v)) for u, v in graph.edges):
+        digest.update(u.encode() + b"\t" + v.encode() + b"\n")
+    return digest.hexdigest()
+
+
+def ranking(counts, order, descending=True, n=10):
+    '''
+    [(node, count)] of the n nodes with the highest (or lowest) counts,
+    ties kept in order, same as sorted(...)[:n]
+    '''
+    pick = heapq.nlargest if descending else heapq.nsmallest
+    return [(node, counts[node])
+            for node in pick(n, order, key=counts.get)]
+
+
+class AnalysisEngine:
+    '''
+    Computes graph_analysis metrics of one prerequisite nx.DiGraph.
+    The undirected view, largest component, degrees and reachability
+    counts are worked out the first time a metric needs them and then
+    shared by every other metric.
+    '''
+    def __init__(self, graph, budget=None, instrument=None):
+        '''
+        graph nx.DiGraph, shouldn't change while the engine is in use
+        budget AnalysisBudget for the diameter and transitivity
+        instrument Instrument timing every metric as analysis.<metric>,
+            the shared work lands in the first metric needing it
+        '''
+        self.graph = graph
+        self.budget = AnalysisBudget() if budget is None else budget
+        if instrument is None:
+            instrument = NULL_INSTRUMENT
+        self.instrument = instrument
+
+    @cached_property
+    def undirected(self):
+        # without the node attributes, to_undirected deep copies them
+        undirected = nx.Graph()
+        undirected.add_nodes_from(self.graph)
+        undirected.add_edges_from(self.graph.edges)
+        return undirected
+
+    @cached_property
+    def largest_component(self):
+        ''' undirected subgraph of the largest connected component '''
+        nodes = max(nx.connected_components(self.undirected), key=len)
+        # a copy, breadth first searches over a subgraph view are slow
+        return self.undirected.subgraph(nodes).copy()
+
+    @cached_property
+    def order(self):
+        return list(self.graph.nodes)
+
+    @cached_property
+    def in_degrees(self):
+        return dict(self.graph.in_degree)
+
+    @cached_property
+    def out_degrees(self):
+        return dict(self.graph.out_degree)
+
+    @cached_property
+    def reachability(self):
+        ''' ({node : ancestors}, {node : descendants}) counts '''
+        return reachability_counts(self.graph)
+
+    def is_exact(self):
+        return (self.largest_component.number_of_nodes() <=
+                self.budget.exact_limit)
+
+    def compute(self, metrics):
+        ''' {metric : value} for every name in metrics (list of str) '''
+        results = {}
+        for metric in metrics:
+            with self.instrument.span("analysis." + metric):
+                results[metric] = METRICS[metric](self)
+        return results
+
+
+def subgraph_diameter(engine):
+    if engine.is_exact():
+        return nx.diameter(engine.largest_component)
+    # too big for all pairs, an Estimate with bounds instead
+    return diameter_bounds(engine.largest_component, engine.budget.sweeps,
+                           engine.budget.seconds)
+
+
+def subgraph_transitivity(engine):
+    if engine.is_exact():
+        return nx.transitivity(engine.largest_component)
+    return transitivity_estimate(engine.largest_component,
+                                 engine.budget.samples,
+                                 engine.budget.confidence,
+                                 engine.budget.seed)
+
+
+# metric name : function of an AnalysisEngine, rankings are [(node, count)]
+METRICS = {
+    'density': lambda engine: nx.density(engine.graph),
+    'number_of_nodes': lambda engine: engine.graph.number_of_nodes(),
+    'subgraph_definition': lambda engine: "largest connected component",
+    'subgraph_number_of_nodes':
+        lambda engine: engine.largest_component.number_of_nodes(),
+    'subgraph_density': lambda engine: nx.density(engine.largest_component),
+    'subgraph_diameter': subgraph_diameter,
+    'subgraph_transitivity': subgraph_transitivity,
+    'most ancestors': lambda engine: ranking(engine.reachability[0],
+                                             engine.order),
+    'least ancestors': lambda engine: ranking(engine.reachability[0],
+                                              engine.order, False),
+    'most descendants': lambda engine: ranking(engine.reachability[1],
+                                               engine.order),
+    'least descendants': lambda engine: ranking(engine.reachability[1],
+                                                engine.order, False),
+    'most in_degree': lambda engine: ranking(engine.in_degrees,
+                                             engine.order),
+    'most out_degree': lambda engine: ranking(engine.out_degrees,
+                                              engine.order),
+}
+METRICS['most_ancestors'] = METRICS['most ancestors']
+
+# rankings hold course keys, Curriculum shows them as titles
+RANKINGS = frozenset(metric for metric in METRICS
+                     if metric.startswith(("most", "least")))
+
+ANALYSIS_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS analysis (
+    fingerprint TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    budget TEXT NOT NULL,
+    body BLOB NOT NULL,
+    PRIMARY KEY (fingerprint, metric, budget)
+);
+'''
+
+
+def encode_value(value):
+    if isinstance(value, Estimate):
+        return {"estimate": list(value)}
+    return value
+
+
+def decode_value(value):
+    if isinstance(value, dict) and "estimate" in value:
+        return Estimate(*value["estimate"])
+    if isinstance(value, list):
+        return [tuple(pair) for pair in value]
+    return value
+
+
+class AnalysisCache:
+    '''
+    Metric values keyed by graph_fingerprint, metric name and
+    AnalysisBudget, so an unchanged graph is never analysed twice.
+    Lives in the same SQLite file as the PageStore it is given.
+    '''
+    def __init__(self, store):
+        ''' store PageStore whose connection holds the analysis table '''
+        self.store = store
+        with store.lock, store.connection:
+            store.connection.executescript(ANALYSIS_SCHEMA)
+
+    def get(self, fingerprint, metrics, budget):
+        ''' {metric : value} of the metrics (list of str) found '''
+        found = {}
+        with self.store.lock:
+            for metric in metrics:
+                row = self.store.connection.execute(
+                    "SELECT body FROM analysis WHERE fingerprint = ? AND "
+                    "metric = ? AND budget = ?",
+                    (fingerprint, metric, budget.key())).fetchone()
+                if row is not None:
+                    found[metric] = decode_value(
+                        json.loads(zlib.decompress(row[0])))
+        return found
+
+    def put(self, fingerprint, results, budget):
+        ''' stores results ({metric : value}) of the fingerprinted graph '''
+        rows = [(fingerprint, metric, budget.key(),
+                 zlib.compress(json.dumps(encode_value(value)).encode()))
+                for metric, value in results.items()]
+        with self.store.lock, self.store.connection:
+            self.store.connection.executemany(
+                "INSERT OR REPLACE INTO analysis "
+                "(fingerprint, metric, budget, body) VALUES (?, ?, ?, ?)",
+                rows)
@@ -0,0 +1,195 @@
+#! python3
+
+import json
+from collections.abc import Mapping
+from functools import reduce
+
+import numpy as np
+
+from .curriculummapper import Course
+from .registry import REGISTRY
+from .report import BUFFER_SIZE
+from .requirements import AND
+
+# course x student bits unpacked at a time while streaming results
+BLOCK_BITS = 1 << 22
+
+
+def encode(transcripts, size):
+    '''
+    packed bits (size rows, one bit per transcript along each row) of
+    transcripts (list of lists of row numbers): row r of transcript t
+    is bit t of row r, 8 transcripts to a byte
+    '''
+    rows = []
+    students = []
+    for student, completed in enumerate(transcripts):
+        rows.extend(completed)
+        students.extend([student] * len(completed))
+    bits = np.zeros((size, (len(transcripts) + 7) // 8), dtype=np.uint8)
+    rows = np.asarray(rows, dtype=np.intp)
+    students = np.asarray(students, dtype=np.intp)
+    # same bit order as np.packbits, repeats just set the bit again
+    np.bitwise_or.at(bits, (rows, students >> 3),
+                     (0x80 >> (students & 7)).astype(np.uint8))
+    return bits
+
+
+def evaluate(expr, bits, row, every, none):
+    '''
+    packed bits of the transcripts meeting expr (AND/OR expression of
+    handles), each leaf is bits[row[leaf]], a leaf outside row is never
+    met, every is all ones and none all zeros
+    '''
+    if expr is None:
+        return every
+    if not isinstance(expr, tuple):
+        found = row.get(expr)
+        return none if found is None else bits[found]
+    op = np.bitwise_and if expr[0] == AND else np.bitwise_or
+    return reduce(op, [evaluate(child, bits, row, every, none)
+                       for child in expr[1:]])
+
+
+class Audit:
+    '''
+    Which courses every transcript of a cohort can take, as packed bits:
+    one row per course with one bit per student, see Curriculum.audit.
+    Read it back with courses_of(), rows(), counts(), coordinates(),
+    to_sparse() or write_jsonl().
+    '''
+    def __init__(self, keys, students, eligible):
+        '''
+        keys [str] course_key of every row
+        students [list] id of every transcript, in bit order
+        eligible numpy uint8 array (len(keys), bytes) of packed bits
+        '''
+        self.keys = keys
+        self.students = students
+        self.eligible = eligible
+
+    def __len__(self):
+        return len(self.students)
+
+    def blocks(self):
+        '''
+        yields (first student, bool array (courses, students)) over
+        the unpacked bits, a few million at a time
+        '''
+        total = len(self.students)
+        step = max(1, BLOCK_BITS // (8 * max(1, len(self.keys))))
+        for start in range(0, self.eligible.shape[1], step):
+            first = start * 8
+            block = np.unpackbits(self.eligible[:, start:start + step],
+                                  axis=1)
+            yield first, block[:, :total - first].view(bool)
+
+    def courses_of(self, position):
+        ''' [course_key] the position-th transcript can take '''
+        column = (self.eligible[:, position >> 3] >>
+                  (7 - (position & 7))) & 1
+        return [self.keys[i] for i in np.flatnonzero(column)]
+
+    def rows(self):
+        ''' yields (student, [course_key]) of every transcript in order '''
+        keys = self.keys
+        for first, block in self.blocks():
+            courses = block.T.nonzero()[1]
+            ends = np.cumsum(block.sum(axis=0))
+            start = 0
+            for offset, end in enumerate(ends.tolist()):
+                yield (self.students[first + offset],
+                       [keys[i] for i in courses[start:end].tolist()])
+                start = end
+
+    def counts(self):
+        ''' {course_key : number of transcripts that can take it} '''
+        total = np.zeros(len(self.keys), dtype=np.int64)
+        for first, block in self.blocks():
+            total += block.sum(axis=1)
+        return dict(zip(self.keys, total.tolist()))
+
+    def coordinates(self):
+        '''
+        (transcript positions, course rows) numpy arrays of every
+        eligible pair, sorted by transcript
+        '''
+        found = [(first + students, courses)
+                 for first, block in self.blocks()
+                 for students, courses in [block.T.nonzero()]]
+        if not found:
+            return (np.zeros(0, dtype=np.intp),) * 2
+        return (np.concatenate([f[0] for f in found]),
+                np.concatenate([f[1] for f in found]))
+
+    def to_sparse(self):
+        '''
+        scipy.sparse csr_matrix (transcripts, courses) of bools, needs
+        scipy installed
+        '''
+        from scipy.sparse import csr_matrix
+        students, courses = self.coordinates()
+        return csr_matrix((np.ones(len(students), dtype=bool),
+                           (students, courses)),
+                          shape=(len(self.students), len(self.keys)))
+
+    def write_jsonl(self, f):
+        ''' one {"student", "eligible": [course_key]} line per transcript '''
+        dumps = json.dumps
+        for student, courses in self.rows():
+            f.write(dumps({"student": student, "eligible": courses}) + "\n")
+
+    def export(self, path):
+        ''' write_jsonl into path, returns path '''
+        with open(path, "w", encoding="utf-8", buffering=BUFFER_SIZE) as f:
+            self.write_jsonl(f)
+        return path
+
+
+def audit(curriculum, transcripts, include_completed=False):
+    '''
+    Audit of transcripts ({student : completed} or [completed], each a
+    list of Course or ids) against the and/or requirements of every
+    course of curriculum, see Curriculum.audit
+    '''
+    if isinstance(transcripts, Mapping):
+        students = list(transcripts)
+        transcripts = list(transcripts.values())
+    else:
+        transcripts = list(transcripts)
+        students = list(range(len(transcripts)))
+    nodes = list(curriculum.get_reachability().nodes)
+    row = {node: i for i, node in enumerate(nodes)}
+    node_handle = curriculum.node_handle
+    # each id is looked up once for the whole cohort
+    rows_of = {}
+
+    def row_of(course):
+        key = course.handle if isinstance(course, Course) else course
+        found = rows_of.get(key, -1)
+        if found == -1:
+            try:
+                found = row[node_handle(course)]
+            except KeyError:
+                found = None
+            rows_of[key] = found
+        return found
+
+    completed_rows = []
+    for completed in transcripts:
+        found = {row_of(course) for course in completed}
+        found.discard(None)
+        completed_rows.append(list(found))
+    taken = encode(completed_rows, len(nodes))
+    width = taken.shape[1]
+    every = np.full(width, 0xFF, dtype=np.uint8)
+    none = np.zeros(width, dtype=np.uint8)
+    eligible = np.empty_like(taken)
+    requirement_ids = curriculum.requirement_ids
+    for i, node in enumerate(nodes):
+        eligible[i] = evaluate(requirement_ids(node), taken, row, every,
+                               none)
+    if not include_completed:
+        eligible &= ~taken
+    keys = REGISTRY.keys
+    return Audit([keys[node] for node in nodes], students, eligible)
@@ -0,0 +1,229 @@
+#! python3
+
+import hashlib
+import io
+import re
+import unicodedata
+
+from lxml import etree
+
+from .records import CourseRecord
+from .requirements import has_choice, map_leaves, parse_requirements
+
+
+# bump whenever the records produced for the same page and config change
+EXTRACTOR_VERSION = 2
+
+
+def has_class(name):
+    ''' XPath predicate matching elements whose class list holds name '''
+    return ("contains(concat(' ', normalize-space(@class), ' '), ' %s ')" %
+            name)
+
+
+def clean(text):
+    ''' NFKD normalized text with runs of whitespace squeezed '''
+    return re.sub(r"\s+", " ",
+                  unicodedata.normalize('NFKD', text or "")).strip()
+
+
+class CourseLeafExtractor:
+    '''
+    Extracts CourseRecords from CourseLeaf catalog pages (the
+    div.courseblock / p.courseblocktitle / courseblockdesc layout).
+    Parses the raw page with lxml, handles one course block at a time
+    with precompiled XPath and frees each block once it is done, so
+    memory stays flat however many pages are ingested.
+    Per-school differences go in the keyword arguments.
+    '''
+    # Curriculum.ingest hands this extractor the raw page bytes
+    markup = "bytes"
+
+    def __init__(self, block_class="courseblock",
+                 title_path=".//p[%s]" % has_class("courseblocktitle"),
+                 title_search=r"^[\s.]*(.*?)[\s.]*"
+                              r"(?:\(\d[^)]*\)|\d[\d.-]*\s+Units?\.?)?\s*$",
+                 desc_path=".//*[%s]" % has_class("courseblockdesc"),
+                 desc_stop=None,
+                 desc_extra=None,
+                 prereq_path=None,
+                 prereq_search=None,
+                 alias_search=None,
+                 paired_search=None,
+                 courselist_class=None):
+        '''
+        block_class (string) class of the div around each course
+        title_path (XPath) element holding "SUBJ 123 Title ..."
+        title_search (regex) group 1 is the title in the text after the id
+        desc_path (XPath) first match holds the description
+        desc_stop (regex) description is cut at the first match
+        desc_extra (regex) later paragraphs of the description element
+            that match are added to the description on their own lines
+        prereq_path (XPath) anchors naming prereqs, e.g. bubblelinks
+        prereq_search (regex) group 1 names prereqs in the block text
+        alias_search (regex) group 1 names cross-listed ids in the block
+        paired_search (regex) matched against the text after the last
+            anchor, when it matches the last two anchors are aliases
+        courselist_class (string) class of requirement tables whose rows
+            ("SUBJ 123" link, title cell) are added as bare courses
+        '''
+        # kept for pickling, compiled XPath objects can't be pickled
+        self.config = dict(block_class=block_class, title_path=title_path,
+                           title_search=title_search, desc_path=desc_path,
+                           desc_stop=desc_stop, desc_extra=desc_extra,
+                           prereq_path=prereq_path,
+                           prereq_search=prereq_search,
+                           alias_search=alias_search,
+                           paired_search=paired_search,
+                           courselist_class=courselist_class)
+        self.block_class = block_class
+        self.title_path = etree.XPath(title_path)
+        self.title_search = re.compile(title_search)
+        self.desc_path = etree.XPath(desc_path)
+        self.desc_stop = None if desc_stop is None else re.compile(desc_stop)
+        self.desc_extra = (None if desc_extra is None
+                           else re.compile(desc_extra))
+        self.prereq_path = (None if prereq_path is None
+                            else etree.XPath(prereq_path))
+        self.prereq_search = (None if prereq_search is None
+                              else re.compile(prereq_search))
+        self.alias_search = (None if alias_search is None
+                             else re.compile(alias_search))
+        self.paired_search = (None if paired_search is None
+                              else re.compile(paired_search))
+        self.courselist_class = courselist_class
+        self.in_courselist = (None if courselist_class is None else
+                              etree.XPath("ancestor::table[%s]" %
+                                          has_class(courselist_class)))
+        self.row_cells = etree.XPath("./td")
+        self.row_link = etree.XPath(".//a")
+        # the config is part of the version so the record cache never
+        # mixes up records from differently configured extractors
+        config = repr(sorted(self.config.items()))
+        self.version = "%d-%s" % (EXTRACTOR_VERSION,
+                                  hashlib.sha1(config.encode())
+                                  .hexdigest()[:12])
+
+    def __getstate__(self):
+        return self.config
+
+    def __setstate__(self, config):
+        self.__init__(**config)
+
+    def __call__(self, content, curriculum):
+        '''
+        yields a CourseRecord for every course block (and requirement
+        table row) of content (bytes), using the id regexes of curriculum
+        '''
+        tags = ("div", "tr") if self.courselist_class else ("div",)
+        for _, element in etree.iterparse(io.BytesIO(content),
+                                          events=("end",), tag=tags,
+                                          html=True, recover=True):
+            if element.tag == "tr":
+                if not self.in_courselist(element):
+                    continue
+                record = self.row_record(element, curriculum)
+            elif self.block_class in (element.get("class") or "").split():
+                record = self.block_record(element, curriculum)
+            else:
+                continue
+            if record is not None:
+                yield record
+            # free the finished block and everything parsed before it
+            element.clear()
+            parent = element.getparent()
+            if parent is not None:
+                while element.getprevious() is not None:
+                    del parent[0]
+
+    def block_record(self, block, curriculum):
+        ''' CourseRecord of one course block or None if it has no id '''
+        titles = self.title_path(block)
+        title_string = clean(" ".join(titles[0].itertext())) if titles \
+            else ""
+        match = curriculum.course_search.search(title_string)
+        if match is None:
+            return None
+        course_id = clean(match.group(1) if match.groups() else match[0])
+        subject_code, course_code = curriculum.course_id_to_list(course_id)
+        end = match.end(1) if match.groups() else match.end()
+        title_match = self.title_search.search(title_string[end:])
+        course_title = title_match.group(1) if title_match else ""
+
+        descs = self.desc_path(block)
+        course_description = ""
+        extras = []
+        if descs:
+            first = descs[0]
+            # a description wrapper with paragraphs uses the first one
+            paragraphs = first.findall("p")
+            course_description = clean(" ".join(
+                (paragraphs[0] if paragraphs else first).itertext()))
+            if self.desc_extra is not None:
+                extras = [text for text in
+                          (clean(" ".join(p.itertext()))
+                           for p in paragraphs[1:])
+                          if self.desc_extra.search(text)]
+        if self.desc_stop is not None:
+            course_description = \
+                self.desc_stop.split(course_description, 1)[0].strip()
+        course_description = "\n".join([course_description] + extras)
+
+        block_text = clean(" ".join(block.itertext()))
+        prereqs = []
+        # the sentences naming the prereqs, read again for and/or logic
+        prereq_texts = []
+        if self.prereq_path is not None:
+            for anchor in self.prereq_path(block):
+                prereqs += curriculum.course_id_list_from_string(
+                    clean(" ".join(anchor.itertext())) + " ")
+                parent = anchor.getparent()
+                if parent is not None:
+                    prereq_texts.append(clean(" ".join(parent.itertext())))
+        if self.prereq_search is not None:
+            for found in self.prereq_search.findall(block_text):
+                prereqs += curriculum.course_id_list_from_string(found + " ")
+                prereq_texts.append(found)
+        aliases = []
+        if self.alias_search is not None:
+            for found in self.alias_search.findall(block_text):
+                aliases += curriculum.course_id_list_from_string(found + " ")
+        if self.paired_search is not None:
+            children = list(block)
+            if (len(children) >= 2 and children[-1].tail and
+                    self.paired_search.search(children[-1].tail)):
+                aliases += [clean(" ".join(children[-1].itertext())),
+                            clean(" ".join(children[-2].itertext()))]
+        if aliases:
+            aliases.append(course_id)
+        aliases = list(dict.fromkeys(aliases))
+        prereqs = [p for p in dict.fromkeys(prereqs)
+                   if p not in aliases and p != course_id]
+        requirements = None
+        if prereq_texts:
+            kept = set(prereqs)
+            requirements = map_leaves(
+                parse_requirements("; ".join(dict.fromkeys(prereq_texts)),
+                                   curriculum.course_search,
+                                   curriculum.id_parser.normalize),
+                lambda p: p if p in kept else None)
+            if not has_choice(requirements):
+                requirements = None
+        return CourseRecord(subject_code, course_code, course_title,
+                            course_description, tuple(prereqs),
+                            tuple(aliases), requirements)
+
+    def row_record(self, row, curriculum):
+        ''' CourseRecord of a requirement table row or None '''
+        cells = self.row_cells(row)
+        links = self.row_link(row)
+        if len(cells) < 2 or not links:
+            return None
+        course_ids = curriculum.course_id_list_from_string(
+            clean(" ".join(links[0].itertext())) + " ")
+        if not course_ids:
+            return None
+        subject_code, course_code = \
+            curriculum.course_id_to_list(course_ids[0])
+        return CourseRecord(subject_code, course_code,
+                            clean(" ".join(cells[1].itertext())), "", (), ())
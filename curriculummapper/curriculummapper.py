@@ -5,17 +5,21 @@ from time import perf_counter
 import sys
 import os
 import re
-import requests
 import unicodedata
-from bs4 import BeautifulSoup
 
-# Visualization
-from pprint import pprint
-import matplotlib.pyplot as plt
-import matplotlib.colors
-import networkx as nx
-from pyvis.network import Network
-import numpy as np
+# networkx, numpy, matplotlib, pyvis, requests and bs4 take seconds to
+# import, so the modules using them (and pprint) are only imported by
+# the methods that need them and the course model loads without them
+from .aliases import AliasForest
+from .idparser import CourseIdParser, code_int
+from .instrument import NULL_INSTRUMENT
+from .records import RecordCache, extractor_key
+from .registry import REGISTRY, CourseDict
+from .requirements import (AND, combine, compile_requirement, from_json,
+                           has_choice, leaves, map_leaves)
+
+# shared empty id set for courses without prereqs or aliases
+NO_IDS = frozenset()
 
 
 def printbreak(): print("----------")
@@ -23,26 +27,50 @@ def printbreak(): print("----------")
 
 class Course:
     '''Course object to handle course data'''
+    __slots__ = ('handle', 'subject_code', 'course_code', 'course_title',
+                 'course_description', 'prereq_ids', 'alias_ids',
+                 'prereq_expr', 'prereq_courses')
+
     def __init__(self, subject_code="NONE", course_code="0",
                  course_title="",
                  course_description="",
                  prerequisites=None, alias_list=None,
-                 subject_search=r"([A-Z]+\s*[A-Z]*)\s\d+"):
+                 subject_search=r"([A-Z]+\s*[A-Z]*)\s\d+",
+                 requirements=None):
         ''' * subject_code (string): Example "CSDS"
             * course_code (string): Example "498"
             course_key (string) = subject_code + " " + course_code = "CSDS 498"
             * course_title (string)
             * course_description (string)
-            * prerequisites SET of string objects # Changed to strings
-            * alias_set SET of strings
+            * prerequisites SET of Course objects (stored as prereq_ids)
+            * alias_set SET of strings (stored as alias_ids)
+            * requirements AND/OR expression of course keys (see
+              requirements.py), its courses join the prerequisites
+            handle (int) = REGISTRY handle of course_key, doubles as the hash
+            prereq_expr expression of handles, None when every prereq is
+              needed, prereqs it leaves out are needed as well
+            prereq_courses {handle : Course} the prerequisites given as
+              Course objects, details and all, None if there are none
         '''
+        if isinstance(subject_code, str):
+            subject_code = sys.intern(subject_code)
+        if isinstance(course_code, str):
+            course_code = sys.intern(course_code)
         self.subject_code = subject_code
         self.course_code = course_code
-        self.course_key = str(subject_code) + " " + str(course_code)
+        self.handle = REGISTRY.intern(str(subject_code) + " " +
+                                      str(course_code),
+                                      subject_code, course_code)
         self.course_title = course_title
         self.course_description = course_description
-        self.prerequisites = set()
-        self.alias_set = set()
+        # most courses have no prereqs or aliases, so share an empty
+        # frozenset until the first id is added
+        self.prereq_ids = NO_IDS
+        self.alias_ids = NO_IDS
+        self.prereq_expr = None
+        self.prereq_courses = None
+        if requirements is not None:
+            self.set_requirements(requirements)
         if prerequisites is None:
             prerequisites = []
         for course in prerequisites:
@@ -54,36 +82,98 @@ class Course:
                 self.add_alias(name)
         # self.add_alias(self.course_key)
 
+    @property
+    def course_key(self):
+        return REGISTRY.keys[self.handle]
+
+    @property
+    def prerequisites(self):
+        '''
+        frozenset of Course objects of prereq_ids, the ones given as
+        Courses come back as they were, the rest are rebuilt from their
+        ids. It's a copy, add more with add_prereq
+        '''
+        known = self.prereq_courses or {}
+        return frozenset(known.get(h) or Course(*REGISTRY.split(h))
+                         for h in self.prereq_ids)
+
+    @property
+    def requirements(self):
+        ''' requirement_ids with course keys for leaves '''
+        return map_leaves(self.requirement_ids(), REGISTRY.keys.__getitem__)
+
+    def requirement_ids(self):
+        '''
+        expression of handles the course needs: prereq_expr and every
+        prereq it leaves out, or all the prereqs if there's no prereq_expr
+        '''
+        expr = self.prereq_expr
+        missing = self.prereq_ids - leaves(expr)
+        if missing:
+            expr = combine(expr, (AND,) + tuple(sorted(missing)))
+        return expr
+
+    def set_requirements(self, requirements):
+        '''
+        requirements AND/OR expression of course keys, its courses are
+        added to the prerequisites and only an expression with a choice
+        in it is kept
+        '''
+        expr = map_leaves(requirements, lambda key: REGISTRY.intern(
+            unicodedata.normalize('NFKD', key)))
+        for handle in leaves(expr):
+            self.add_prereq_id(handle)
+        if has_choice(expr):
+            self.prereq_expr = expr
+
+    @property
+    def alias_set(self):
+        '''
+        frozenset of course id strings rebuilt from alias_ids, it's a
+        copy, add more with add_alias
+        '''
+        keys = REGISTRY.keys
+        return frozenset(keys[h] for h in self.alias_ids)
+
     def __str__(self):
         '''all we need is subject and course code for an identifier'''
         return self.course_key
 
     def __repr__(self):
-        ''' Give stable repr for hash for set operations '''
+        ''' Give stable repr for debugging '''
         return ("Course(%s, %s, %s)" %
                 (self.subject_code, self.course_code, self.course_title))
 
     def __hash__(self):
-        ''' Give a hash based on representation '''
-        return hash(self.__repr__())
+        ''' the registry handle is a stable precomputed hash '''
+        return self.handle
 
     def __eq__(self, other):
-        ''' needed to evaulate equality for set operations '''
+        '''
+        needed to evaulate equality for set operations, courses are equal
+        when their course_keys are, so Course("SUBJ", 1234) equals
+        Course("SUBJ", "1234")
+        '''
         if isinstance(other, Course):
-            return ((self.subject_code == other.subject_code) and
-                    (self.course_code == other.course_code))
+            return self.handle == other.handle
         else:
             return False
 
     def add_alias(self, course_id):
         ''' adds an alias to the course id '''
-        self.alias_set.add(course_id)
+        course_id = unicodedata.normalize('NFKD', course_id)
+        self.add_alias_id(REGISTRY.intern(course_id))
+
+    def add_alias_id(self, handle):
+        if not self.alias_ids:
+            self.alias_ids = set()
+        self.alias_ids.add(handle)
 
     def add_prereq(self, x):
         ''' adds a prereq after confirming it's a Course object '''
         try:
             if isinstance(x, Course):
-                self.prerequisites.add(x)
+                self.add_prereq_course(x)
             else:
                 raise ValueError
         except ValueError:
@@ -91,15 +181,23 @@ class Course:
             # just ignore if x is something that isn't a course
             pass
 
+    def add_prereq_id(self, handle):
+        if not self.prereq_ids:
+            self.prereq_ids = set()
+        self.prereq_ids.add(handle)
+
+    def add_prereq_course(self, x):
+        ''' adds Course x as a prereq, keeping x for its details '''
+        self.add_prereq_id(x.handle)
+        if self.prereq_courses is None:
+            self.prereq_courses = {}
+        self.prereq_courses.setdefault(x.handle, x)
+
     def get_course_code_int(self):
         ''' used for color maps, strips letters from course_code '''
         if isinstance(self.course_code, int):
             return self.course_code
-        else:
-            try:
-                return int(re.search(r"([0-9]+)", str(self.course_code))[0])
-            except Exception:
-                return int(self.course_code)
+        return code_int(str(self.course_code))
 
     def append_course_title(self, course_title=""):
         ''' add a course_title string if and only if it's longer '''
@@ -116,62 +214,93 @@ class Course:
         if len(prerequisites) > 0:
             for prereq in prerequisites:
                 if isinstance(prereq, Course):
-                    self.prerequisites.add(prereq)
+                    self.add_prereq_course(prereq)
 
     def append_alias_list(self, alias_list=[]):
         ''' going from list to the set '''
         for alias in alias_list:
-            self.alias_set.add(alias)
+            self.add_alias(alias)
 
     def full_desc(self, tooltip=False, heading=False):
         ''' returning a string that gives the full course description '''
-        temp = ""
+        # pieces are joined once at the end, no quadratic +=
+        parts = []
         newline = "\n"
         if tooltip:
             newline = r"<br>"
+            parts.append(r"<small>")
         if heading:
-            temp += str(self) + " "
-            if len(self.alias_set) > 0:
-                aka = "(aka "
-                for alias in self.alias_set:
-                    aka += alias + ", "
-                aka = aka[:-2]+") "
-                temp += aka
-        temp += self.course_title
-        course_desc = self.course_description
-        if tooltip:
-            course_desc = self.tooltip(course_desc)
+            parts.append(str(self) + " ")
+            if len(self.alias_ids) > 0:
+                parts.append("(aka " + ", ".join(self.alias_set) + ") ")
+        parts.append(self.course_title)
         if len(self.course_description) > 0:
-            temp += newline + course_desc
-        if len(self.prerequisites) > 0:
+            parts.append(newline)
+            parts.append(self.tooltip(self.course_description) if tooltip
+                         else self.course_description)
+        if len(self.prereq_ids) > 0:
             ''' if the list of prerequists is not empty list them'''
-            temp += newline + "Prereqs:"
-            for prereq in self.prerequisites:
-                temp += newline + str(prereq)
+            parts.append(newline + "Prereqs:")
+            for handle in self.prereq_ids:
+                parts.append(newline + REGISTRY.keys[handle])
         if tooltip:
-            return r"<small>" + temp + r"</small>"
-        return temp
+            parts.append(r"</small>")
+        return "".join(parts)
 
     def tooltip(self, longstring):
-        long_list = longstring.split(" ")
-        temp = ""
+        ''' longstring with a <br> after every 23 or so characters '''
+        parts = []
         i = 0
-        for word in long_list:
-            temp += word
+        for word in longstring.split(" "):
+            parts.append(word)
             i += len(word)
             if i >= 23:
-                temp += r"<br>"
+                parts.append(r"<br>")
                 i = 0
             else:
-                temp += " "
-
-        return temp
+                parts.append(" ")
+        return "".join(parts)
 
     def absorb(self, other):
         self.append_course_title(other.course_title)
         self.append_course_description(other.course_description)  # noqa: E501
-        self.append_prerequisites(other.prerequisites.copy())
-        self.append_alias_list(list(other.alias_set))
+        if self.prereq_expr is not None or other.prereq_expr is not None:
+            # both sets of requirements have to be met
+            expr = combine(self.requirement_ids(), other.requirement_ids())
+            self.prereq_expr = expr if has_choice(expr) else None
+        if other.prereq_ids:
+            for handle in other.prereq_ids:
+                self.add_prereq_id(handle)
+        if other.prereq_courses:
+            for prereq in other.prereq_courses.values():
+                self.add_prereq_course(prereq)
+        self.absorb_aliases(other)
+
+    def __reduce__(self):
+        '''
+        pickle by course ids, handles differ between processes, the
+        prereqs go as ids only so a chain isn't pickled whole
+        '''
+        requirements = None
+        if self.prereq_expr is not None:
+            requirements = map_leaves(self.prereq_expr,
+                                      REGISTRY.keys.__getitem__)
+        return (Course, (self.subject_code, self.course_code,
+                         self.course_title, self.course_description,
+                         [Course(*REGISTRY.split(h)) for h in self.prereq_ids],
+                         sorted(self.alias_set),
+                         r"([A-Z]+\s*[A-Z]*)\s\d+", requirements))
+
+    def copy(self):
+        ''' a new Course with the same details and ids '''
+        other = Course(self.subject_code, self.course_code,
+                       self.course_title, self.course_description)
+        other.absorb(self)
+        return other
+
+    def absorb_aliases(self, other):
+        for handle in other.alias_ids:
+            self.add_alias_id(handle)
 
     def copypasta(self, other):
         self.absorb(other)
@@ -191,49 +320,95 @@ class Curriculum:
                  # get the subject code which is by default first 4 capitals
                  subject_search=r"([A-Z]{4})",
                  # get the course_code which are the digits
-                 code_search=r"(\d+\w*)", colored_subjects=None
-                 ):
+                 code_search=r"(\d+\w*)", colored_subjects=None,
+                 page_store=None, analysis_budget=None, palette=None,
+                 instrument=None):
         '''
         university (string)
         degree_name (string)
         preferred_subject_code (string)
-        course_dict = {course_code : Course}
+        courses = {handle : Course}
+        course_dict = {course_key : Course} view over courses
         url = ""
         url_list = [] # for history
         data_dir = data_directory
-        alias_dict = (str: [list of str])
-        diGraph nx.DiGraph
+        aliases AliasForest of handles, canonical course per alias group
+        alias_dict = {str: set of str} view of aliases
+        diGraph nx.DiGraph, made on first use (see nx_graph)
+        version (int) bumped on every change to the courses
+        dirty = set(handle) courses changed since the last generate_nx
+        graph_version (int) version the diGraph was last built at
+        node_of = {handle : course_key of the node drawing it}
+        node_members = {course_key : set(handle)}
         soup = ""
+        session requests.Session, created on the first fetch
+        page_store PageStore, opened on the first fetch
+        record_cache RecordCache, extracted courses per cached page
+        snapshot Snapshot the courses were loaded from, see load
         course_search (re.Match Object)
         subject_search (re.Match Object)
         code_search (re.Match Object)
+        id_parser CourseIdParser, memoized split of ids into codes
         colored_subjects [list of str]
+        palette = {subject : colormap name or Colormap} of colored subjects
+            not using the DEFAULT_PALETTE one for their position
+        analysis_budget AnalysisBudget, when diameter and transitivity
+            are estimated instead of computed exactly, None for the default
+        analysis_engine AnalysisEngine of the diGraph at graph_version
+        analysis_results = {(metric, budget key) : value} of that graph
+        analysis_cache AnalysisCache, metric values kept in the page store
+        layouts = {method : {course_key : (x, y)}} of the diGraph
+        layout_cache LayoutCache, node positions kept in the page store
+        reachability_index ReachabilityIndex over the canonical course
+            handles, rebuilt once per version (see get_reachability)
+        evaluators = {handle : compiled requirement check} of this version
+        instrument Instrument timing the pipeline stages, None (the
+            default) turns the instrumentation off
         '''
         self.university = university
         self.degree_name = degree_name
         self.preferred_subject_code = preferred_subject_code
+        if instrument is None:
+            instrument = NULL_INSTRUMENT
+        self.instrument = instrument
+        if instrument.enabled:
+            # a span per course costs a few percent, only paid when enabled
+            self.add_course_object = self.instrumented_add_course_object
         if course_list is None:
             course_list = []
-        self.course_dict = {}
+        self.courses = {}
         self.url = ""
         self.url_list = []
         if URL is not None:
             self.set_url(URL)
-        self.alias_dict = {}
+        self.aliases = AliasForest(self.prefers)
         # for a directed graph
         # this will stay empty until generate_nx is called!
-        self.diGraph = nx.DiGraph()
+        self.nx_graph = None
+        self.version = 0
+        self.dirty = set()
+        self.graph_version = -1
+        self.graph_emphasis = None
+        self.graph_color_max = None
+        self.node_of = {}
+        self.node_members = {}
         self.soup = None
+        self.session = None
+        self.page_store = page_store
+        self.record_cache = None
+        self.snapshot = None
 
         ''' RegEx compiled searches '''
-        if isinstance(course_search, str):
-            self.course_search = re.compile(course_search)
-        if isinstance(subject_search, str):
-            self.subject_search = re.compile(subject_search)
-        if isinstance(code_search, str):
-            self.code_search = re.compile(code_search)
+        self.course_search = re.compile(course_search)
+        self.subject_search = re.compile(subject_search)
+        self.code_search = re.compile(code_search)
+        self.id_parser = CourseIdParser(self.course_search,
+                                        self.subject_search,
+                                        self.code_search)
 
         self.colored_subjects = []
+        self.palette = dict(palette or {})
+        self.graph_colormaps = None
         if len(self.preferred_subject_code) > 0:
             self.colored_subjects.append(self.preferred_subject_code)
         if colored_subjects is not None and isinstance(colored_subjects, list):
@@ -245,28 +420,126 @@ class Curriculum:
             for course in course_list:
                 self.add_course(course)
         self.graph_analysis = {}
+        self.analysis_budget = analysis_budget
+        self.analysis_engine = None
+        self.analysis_version = -1
+        self.analysis_fingerprint = None
+        self.analysis_results = {}
+        self.analysis_cache = None
+        self.layouts = {}
+        self.layout_cache = None
+        self.reachability_index = None
+        self.reachability_version = -1
+        self.evaluators = {}
+        self.evaluator_version = -1
+        # made by print_all when there is something to write
         self.data_dir = os.path.join("canned_soup/" +
                                      str(self).replace(" ", "_") +
                                      "/")
-        try:
-            os.makedirs(self.data_dir)
-        except Exception:
-            # only here if already have the directory
-            # do nothing safely
-            pass
 
-    def add_subject(self, subj):
+    @property
+    def diGraph(self):
+        ''' the prerequisite nx.DiGraph, networkx is imported on first use '''
+        if self.nx_graph is None:
+            import networkx as nx
+            self.nx_graph = nx.DiGraph()
+        return self.nx_graph
+
+    @property
+    def course_dict(self):
+        return CourseDict(self.courses)
+
+    def add_subject(self, subj, colormap=None):
+        '''
+        colors subj as its own group, the courses of subj are touched so
+        the next generate_nx regroups and restyles them
+        '''
         if re.match(self.subject_search, subj):
             self.colored_subjects.append(subj)
+            if colormap is not None:
+                self.palette[subj] = colormap
+            for course in list(self.courses.values()):
+                if course.subject_code == subj:
+                    self.touch(course.handle)
+            # a new group or colormap restyles every node even if
+            # no course of subj is in yet
+            self.version += 1
+
+    def colormaps(self):
+        '''
+        [Colormap] of each node group: other subjects first, then every
+        colored subject from the palette or DEFAULT_PALETTE
+        '''
+        from .style import DEFAULT_PALETTE, OTHER_COLORMAP, get_colormap
+        colormaps = [get_colormap(OTHER_COLORMAP)]
+        for i, subj in enumerate(self.colored_subjects):
+            default = (DEFAULT_PALETTE[i] if i < len(DEFAULT_PALETTE)
+                       else OTHER_COLORMAP)
+            colormaps.append(get_colormap(self.palette.get(subj, default)))
+        return colormaps
+
+    def touch(self, handle):
+        ''' marks a course as changed since the last generate_nx '''
+        self.version += 1
+        self.dirty.add(handle)
+
+    def prefers(self, handle):
+        ''' True if the course id matches the preferred_subject_code '''
+        return re.match(self.preferred_subject_code,
+                        REGISTRY.keys[handle]) is not None
+
+    def alias_groups(self):
+        ''' yields the member handles of every alias group '''
+        return self.aliases.groups()
+
+    @property
+    def alias_dict(self):
+        ''' {course_key : set of course_key} view of the alias groups '''
+        keys = REGISTRY.keys
+        alias_dict = {}
+        for members in self.alias_groups():
+            group = {keys[handle] for handle in members}
+            for handle in members:
+                alias_dict[keys[handle]] = group
+        return alias_dict
 
     def add_alias_group(self, alias_group=[]):
-        ''' Makes sure that aliases are all added to every possible position'''
-        for alias in alias_group:
-            try:
-                for i in alias_group:
-                    self.alias_dict[alias].add(i)
-            except KeyError:
-                self.alias_dict[alias] = set(alias_group)
+        ''' Joins every course id in alias_group into one alias group '''
+        self.join_aliases([REGISTRY.intern(unicodedata.normalize('NFKD', a))
+                           for a in alias_group])
+
+    def join_aliases(self, handles):
+        '''
+        Unions the courses in handles (list of handles), adding the ones
+        we haven't seen. Course details are merged into the canonical
+        course once per union.
+        '''
+        first = None
+        for handle in handles:
+            if handle not in self.courses:
+                try:
+                    self.add_course_object(Course(
+                        *self.course_id_to_list(REGISTRY.keys[handle])))
+                except (IndexError, TypeError):
+                    pass
+                if handle not in self.courses:
+                    continue
+            if first is None:
+                first = handle
+                continue
+            joined = self.aliases.union(first, handle)
+            if joined is None:
+                continue
+            kept, lost, moved = joined
+            self.instrument.count("alias_unions")
+            self.instrument.count("absorbs")
+            course = self.courses[kept]
+            course.absorb(self.courses[lost])
+            course.add_alias_id(kept)
+            course.add_alias_id(lost)
+            self.touch(kept)
+            for moved_id in moved:
+                self.touch(moved_id)
 
     def add_course_object(self, x):
         '''
@@ -276,43 +549,43 @@ class Curriculum:
         '''
         try:
             # first, only add to dict if it's not already there...
-            key = str(x)
+            handle = x.handle
             self.course_codes_set.add(x.get_course_code_int())
-            # print("Attempting to add %s" % key)
-            if self.course_dict.get(key) is None:
-                # print("\tAdding %s as a new key" % key)
+            existing = self.courses.get(handle)
+            self.touch(handle)
+            if existing is None:
                 # adding to dictionary
-                self.course_dict[key] = x
-                # print("\tNew course added.")
-                # importing alias relationships
-                if len(x.alias_set) > 0:
-                    # print("Found Aliases %s in Curriculum.add_course(x)" %
-                    #      x.alias_list)
-                    # generating alias_dict[key] : [alias_1, alias_2, etc]
-                    x.alias_set.add(str(x))
-                    self.add_alias_group(x.alias_set)
+                self.courses[handle] = x
             else:
-                # print("\tUpdating %s as existing key" % key)
-                # print("\tAlready in dictionary, appending details...")
                 # replace the details only if it's longer (nonempty)
-                self.course_dict[key].absorb(x)
-                self.add_alias_group(self.course_dict[key].alias_set)
-            # loop through prerequisites list
-            for prereq in x.prerequisites:
-                # recurison
-                # print("Found prereq %s, adding it" % str(prereq))
-                self.add_course(prereq)
-            if len(x.alias_set) > 1:
-                # print("Alias Found")
-                for alias in x.alias_set:
-                    # print("Attempting to split %s" % alias)
-                    alias = unicodedata.normalize('NFKD', alias)
-                    self.add_course_by_id(alias)
-                    self.course_dict[alias].append_alias_list(x.alias_set)
+                existing.absorb(x)
+            # loop through prerequisites, adding the ones we haven't seen
+            # and the details of the ones given as Course objects
+            known = x.prereq_courses or {}
+            for prereq_id in x.prereq_ids:
+                prereq = known.get(prereq_id)
+                if prereq is not None:
+                    if prereq is not self.courses.get(prereq_id):
+                        self.add_course_object(prereq)
+                elif prereq_id not in self.courses:
+                    self.add_course_object(Course(*REGISTRY.split(prereq_id)))
+            if len(x.alias_ids) > 0:
+                # importing alias relationships, x is one of its own aliases
+                self.join_aliases([handle] + list(x.alias_ids))
         except Exception:
             raise TypeError("tried to add an object that is \
                              not a Course to course_list")
 
+    def instrumented_add_course_object(self, x):
+        ''' add_course_object timed and counted by the instrument '''
+        instrument = self.instrument
+        if getattr(x, "handle", None) in self.courses:
+            instrument.count("absorbs")
+        else:
+            instrument.count("courses_added")
+        with instrument.span("add_course_object"):
+            type(self).add_course_object(self, x)
+
     def add_course(self, x):
         # print("add %s" % str(x))
         if isinstance(x, Course):
@@ -322,46 +595,33 @@ class Curriculum:
 
     def course_id_to_list(self, course_id):
         ''' breaks course_id into subject and course codes '''
-        course_id = unicodedata.normalize('NFKD', course_id)
-        return (re.findall(self.subject_search, course_id)[0],
-                re.findall(self.code_search, course_id)[0])
+        return self.id_parser.split(course_id)
 
     def course_list_from_string(self, somewords):
         '''
         extracts list of courses from a string'
         returns them as a list of Course objects
         '''
-        course_list = []
-        course_ids = re.findall(self.course_search, str(somewords))
-        for course_id in course_ids:
-            # FOR SOME REASON \xa0 started appearing so clean it...
-            norm_id = unicodedata.normalize('NFKD', course_id)
-            # getting the subject and code to initiate Course object
-            subject_code, course_code = self.course_id_to_list(norm_id)
-            course_list.append(Course(subject_code, course_code))
-        return course_list
+        split = self.id_parser.split
+        return [Course(*split(course_id)) for course_id in
+                self.course_search.findall(str(somewords))]
 
     def course_id_list_from_string(self, somewords):
         '''
         extracts list of courses from a string
         returns the courses as a list of course_id.
         '''
-        course_ids = re.findall(self.course_search, somewords)
-        return [unicodedata.normalize('NFKD', course_id) for
-                course_id in course_ids]
+        normalize = self.id_parser.normalize
+        return [normalize(course_id) for
+                course_id in self.course_search.findall(somewords)]
 
     def add_course_by_id(self, x):
-        x = unicodedata.normalize('NFKD', x)
-        if re.match(self.course_search, x):
-            # print("Adding %s to curriculum" % str(x))
-            subject_code, course_code = self.course_id_to_list(x)
-            self.add_course(Course(subject_code, course_code))
+        if self.id_parser.is_course_id(x):
+            self.add_course(Course(*self.id_parser.split(x)))
 
     def add_courses_from_string(self, somewords):
-        # print("\tParsing: '%s'" % somewords)
         somewords = unicodedata.normalize('NFKD', somewords)
         for c in self.course_list_from_string(somewords):
-            # print("Adding %s to curriculum" % str(c))
             self.add_course(c)
 
     def __str__(self):
@@ -370,77 +630,54 @@ class Curriculum:
 
     def num_courses(self):
         ''' returns total number of unique courses'''
-        return len(self.course_dict)
+        return len(self.courses)
 
     def get_course(self, course_id=""):
         ''' tries to retreive a Course object using the key (subj_code course_code)
-            scans thru alias list and returns one.
+            returns the canonical course of its alias group.
         '''
-        course_id = unicodedata.normalize('NFKD', course_id)
-        # print("\t\tTrying to retreive %s" % course_id)
-        # DEBUG print("\tseeking %s" % course_id)
-        if self.alias_dict.get(course_id) is not None:
-            # print("\t\tAlias entry found in alias dict")
-            for alias in self.alias_dict[course_id]:
-                # DEBUG print("checking %s" % alias)
-                if re.match(self.preferred_subject_code, alias):
-                    # print("returning %s" % self.course_dict[alias])
-                    return self.course_dict[alias]
-            key = list(self.alias_dict[course_id])[0]
-            return self.course_dict[key]
-        else:
-            # DEBUG print("No Alias found returning %s" % course_id)
-            try:
-                return self.course_dict[course_id]
-            except Exception:
+        handle = self.lookup_handle(course_id)
+        if handle is None:
+            self.add_course_by_id(self.id_parser.key(course_id))
+            handle = self.lookup_handle(course_id)
+            if handle is None:
+                raise KeyError(course_id)
+        return self.courses[self.aliases.canonical(handle)]
 
-                self.add_course_by_id(course_id)
-                return self.course_dict[course_id]
+    def lookup_handle(self, course_id):
+        '''
+        handle of course_id (string) in courses: the exact normalized key
+        first, then the "SUBJ CODE" key id_parser reads out of it, or None
+        '''
+        handle = REGISTRY.lookup(self.id_parser.normalize(course_id))
+        if handle not in self.courses:
+            handle = REGISTRY.lookup(self.id_parser.key(course_id))
+            if handle not in self.courses:
+                return None
+        return handle
 
     def generate_nx(self, emphasize_in_degree=False):
         '''
         Generates internal NetworkX object.
+        Only the nodes and edges of courses touched since the last call are
+        rebuilt, and nothing is done if the curriculum hasn't changed.
         '''
-        self.update()
-        if self.num_courses() > 0:
+        if (self.graph_version == self.version and
+                self.graph_emphasis == emphasize_in_degree):
+            return
+        if self.num_courses() == 0:
+            print("Add courses first!")
+            return
+        with self.instrument.span("generate_nx"):
+            import numpy as np
+            from .style import style_nodes
             print("Course Inventory contains %d courses..." %
                   self.num_courses())
-            # Looping through every course:
-            for course in self.course_dict.values():
-                # DEBUG print("In generate_nx Looking for %s" % str(course))
-                chosen = (self.get_course(str(course)))
-                course_key = str(chosen)
-                subject_code, course_code = self.course_id_to_list(course_key)
-                # DEBUG print("Adding class %s as node" % course_key)
-                color_group = 0
-                try:
-                    color_group = self.colored_subjects.index(subject_code) + 1
-                except Exception:
-                    pass
-                self.diGraph.add_node(course_key,
-                                      label=course_key,
-                                      title=self.course_dict[course_key].full_desc(tooltip=True),  # noqa: E501,
-                                      group=color_group)
-                if len(course.prerequisites) > 0:
-                    for prereq in course.prerequisites:
-                        # print("Scanning for %s" % str(prereq))
-                        prereq_true_self = self.get_course(str(prereq))
-                        prereq_key = str(prereq_true_self)
-                        if prereq_key != course_key:
-                            subject_code = prereq_true_self.subject_code
-                            # Adding node prereq_key
-                            color_group = 0
-                            try:
-                                color_group = 1 + self.colored_subjects.index(
-                                      subject_code)
-                            except Exception:
-                                pass
-                            self.diGraph.add_node(prereq_key,
-                                                  label=str(prereq_true_self),
-                                                  title=prereq_true_self.full_desc(tooltip=True),  # noqa: E501,
-                                                  group=color_group)
-                            # Adding edge (prereq_key => course_key)
-                            self.diGraph.add_edge(prereq_key, course_key)
+            self.update()
+            # anything touched while patching stays dirty for the next call
+            self.graph_version = self.version
+            dirty, self.dirty = self.dirty, set()
+            touched = self.patch_nx(dirty)
             print("NetworkX object initiated.")
             print("Found %d unique classes with %d prerequisite relationships"
                   % (len(self.diGraph.nodes), len(self.diGraph.edges)))
@@ -449,140 +686,572 @@ class Curriculum:
                                        np.quantile(course_ints, 0.1)) &
                                       (course_ints <
                                        np.quantile(course_ints, 0.9))].tolist()
-            color_min = 0
-            color_max = max(course_ints)
-            # print(color_min, color_max)
-            for node in self.diGraph:
-                # setting the size of each node to depend
-                # on the in_degree or out degree based on emphasize_in_degree
-                self.diGraph.nodes[node]['size'] = \
-                    (2*(self.diGraph.in_degree(node) + 5)
-                     if emphasize_in_degree else
-                     2*(self.diGraph.out_degree(node) + 5))
-                norm = matplotlib.colors.Normalize(color_min, color_max)
-                if self.diGraph.nodes[node]['group'] == 1:
-                    cmap = plt.cm.Blues
-                elif self.diGraph.nodes[node]['group'] == 2:
-                    cmap = plt.cm.Greens
-                elif self.diGraph.nodes[node]['group'] == 3:
-                    cmap = plt.cm.Purples
-                else:
-                    cmap = plt.cm.Greys
-                # 1) get the course #
-                # 2) normalize from
-                self.diGraph.nodes[node]['color'] = \
-                    matplotlib.colors.rgb2hex(cmap(norm(
-                        self.course_dict[node].get_course_code_int())))
+            color_max = max(course_ints or self.course_codes_set)
+            colormaps = self.colormaps()
+            if (self.graph_emphasis != emphasize_in_degree or
+                    self.graph_color_max != color_max or
+                    self.graph_colormaps != colormaps):
+                # sizes or color scale changed, every node needs restyling
+                touched = self.diGraph.nodes
+            self.graph_emphasis = emphasize_in_degree
+            self.graph_color_max = color_max
+            self.graph_colormaps = colormaps
+            # sizes from the in or out degree depending on
+            # emphasize_in_degree, colors from the course number
+            touched = list(touched)
+            style_nodes(self.diGraph, touched,
+                        [self.course_dict[node].get_course_code_int()
+                         for node in touched],
+                        colormaps, color_max, emphasize_in_degree)
             self.generate_graph_analysis()
-        else:
-            print("Add courses first!")
+
+    def patch_nx(self, dirty):
+        '''
+        Rebuilds the diGraph nodes of the courses in dirty (set of handles)
+        along with their incoming prerequisite edges.
+        Returns the set of nodes whose attributes or degree changed.
+        '''
+        graph = self.diGraph
+        keys = REGISTRY.keys
+        dirty_nodes = set()
+        # 1) work out which node every dirty course is drawn as
+        for handle in dirty:
+            old = self.node_of.get(handle)
+            if handle not in self.courses:
+                # course left the curriculum (see ProgramView)
+                if old is not None:
+                    del self.node_of[handle]
+                    self.node_members[old].discard(handle)
+                    dirty_nodes.add(old)
+                    if old in graph:
+                        dirty_nodes.update(graph.successors(old))
+                continue
+            node = keys[self.aliases.canonical(handle)]
+            if old is not None and old != node:
+                # course got merged into an alias, move everything
+                # that pointed at the old node
+                self.node_members[old].discard(handle)
+                dirty_nodes.add(old)
+                if old in graph:
+                    dirty_nodes.update(graph.successors(old))
+            self.node_of[handle] = node
+            self.node_members.setdefault(node, set()).add(handle)
+            dirty_nodes.add(node)
+        # 2) rebuild those nodes and their incoming edges
+        touched = set(dirty_nodes)
+        for node in dirty_nodes:
+            if node in graph:
+                in_edges = list(graph.in_edges(node))
+                touched.update(u for u, _ in in_edges)
+                graph.remove_edges_from(in_edges)
+            members = self.node_members.get(node)
+            if not members:
+                if node in graph:
+                    touched.update(graph.successors(node))
+                    graph.remove_node(node)
+                self.node_members.pop(node, None)
+                continue
+            self.add_nx_node(node)
+            for handle in members:
+                for prereq_id in self.courses[handle].prereq_ids:
+                    prereq_node = self.node_of.get(prereq_id)
+                    if prereq_node is None:
+                        canonical = self.aliases.canonical(prereq_id)
+                        if canonical not in self.courses:
+                            continue
+                        prereq_node = keys[canonical]
+                    if prereq_node != node:
+                        if prereq_node not in graph:
+                            self.add_nx_node(prereq_node)
+                        # Adding edge (prereq_key => course_key)
+                        graph.add_edge(prereq_node, node)
+                        touched.add(prereq_node)
+        touched.intersection_update(graph.nodes)
+        return touched
+
+    def add_nx_node(self, course_key):
+        ''' adds or refreshes the diGraph node of a course '''
+        chosen = self.course_dict[course_key]
+        subject_code = chosen.subject_code
+        color_group = 0
+        try:
+            color_group = self.colored_subjects.index(subject_code) + 1
+        except Exception:
+            pass
+        self.diGraph.add_node(course_key,
+                              label=course_key,
+                              group=color_group)
+        # the tooltip is stale now, render_titles makes a new one
+        self.diGraph.nodes[course_key].pop('title', None)
+
+    def render_titles(self):
+        '''
+        sets the tooltip HTML (title) of every diGraph node without one,
+        only renderers need them so generate_nx leaves them out
+        '''
+        for node, data in self.diGraph.nodes(data=True):
+            if 'title' not in data:
+                data['title'] = \
+                    self.course_dict[node].full_desc(tooltip=True)
 
     def get_nx(self):
         self.generate_nx()
         return self.diGraph
 
-    def generate_graph_analysis(self):
+    def get_reachability(self):
+        '''
+        ReachabilityIndex of the prerequisite graph over the canonical
+        course handles, built straight from the courses (no generate_nx)
+        once per version
+        '''
+        from .reachability import ReachabilityIndex
+        if (self.reachability_index is None or
+                self.reachability_version != self.version):
+            with self.instrument.span("reachability"):
+                canonical = self.aliases.canonical
+                pred = {}
+                # same edges as patch_nx draws, every alias brings its own
+                for handle, course in self.courses.items():
+                    node = canonical(handle)
+                    prereqs = pred.setdefault(node, set())
+                    for prereq_id in course.prereq_ids:
+                        prereq = canonical(prereq_id)
+                        if prereq != node and prereq in self.courses:
+                            prereqs.add(prereq)
+                self.reachability_index = ReachabilityIndex(pred)
+                self.reachability_version = self.version
+        return self.reachability_index
+
+    def node_handle(self, course):
+        ''' handle of the canonical course of course (Course, id or handle) '''
+        if isinstance(course, Course):
+            handle = course.handle
+        elif isinstance(course, int):
+            handle = course
+        else:
+            handle = self.lookup_handle(course)
+        if handle is None or handle not in self.courses:
+            raise KeyError("%s is not in %s" % (course, self))
+        return self.aliases.canonical(handle)
+
+    def prerequisites_of(self, course, transitive=True):
+        '''
+        set of the course_keys course (Course or id) requires, only the
+        direct prerequisites unless transitive. Same answer as
+        nx.ancestors(diGraph, course_key) without building the diGraph.
+        '''
+        index = self.get_reachability()
+        node = self.node_handle(course)
+        keys = REGISTRY.keys
+        if transitive:
+            return {keys[h] for h in index.ancestors_of(node)}
+        return {keys[h] for h in index.pred[node]}
+
+    def unlocked_by(self, course, transitive=True):
+        ''' set of the course_keys requiring course, see prerequisites_of '''
+        index = self.get_reachability()
+        node = self.node_handle(course)
+        keys = REGISTRY.keys
+        if transitive:
+            return {keys[h] for h in index.descendants_of(node)}
+        return {keys[h] for h in index.succ[node]}
+
+    def is_prerequisite(self, a, b):
+        ''' True if course a is required, directly or not, for course b '''
+        return self.get_reachability().reaches(self.node_handle(a),
+                                               self.node_handle(b))
+
+    def prerequisites_of_many(self, courses, transitive=True,
+                              combined=False):
+        '''
+        {course_key : prerequisites_of(course)} of every course in
+        courses, or with combined one set of everything they require
+        '''
+        if combined and transitive:
+            index = self.get_reachability()
+            keys = REGISTRY.keys
+            return {keys[h] for h in index.ancestors_of_all(
+                [self.node_handle(course) for course in courses])}
+        found = {REGISTRY.keys[self.node_handle(course)]:
+                 self.prerequisites_of(course, transitive)
+                 for course in courses}
+        if combined:
+            return set().union(*found.values())
+        return found
+
+    def unlocked_by_many(self, courses, transitive=True, combined=False):
+        '''
+        {course_key : unlocked_by(course)} of every course in courses, or
+        with combined one set of everything requiring any of them
+        '''
+        if combined and transitive:
+            index = self.get_reachability()
+            keys = REGISTRY.keys
+            return {keys[h] for h in index.descendants_of_all(
+                [self.node_handle(course) for course in courses])}
+        found = {REGISTRY.keys[self.node_handle(course)]:
+                 self.unlocked_by(course, transitive)
+                 for course in courses}
+        if combined:
+            return set().union(*found.values())
+        return found
+
+    def requirement_ids(self, course):
+        '''
+        AND/OR expression of canonical handles the canonical course of
+        course (Course or id) needs, every alias bringing its own
+        '''
+        node = self.node_handle(course)
+        canonical = self.aliases.canonical
+        expr = combine(*[self.courses[member].requirement_ids()
+                         for member in self.aliases.members(node)
+                         if member in self.courses])
+
+        def resolve(handle):
+            handle = canonical(handle)
+            # an alias listed as its own prerequisite
+            return None if handle == node else handle
+        return map_leaves(expr, resolve)
+
+    def requirements_of(self, course):
+        '''
+        AND/OR expression of the course_keys course needs, see
+        requirements.py, None if it has no prerequisites
+        '''
+        return map_leaves(self.requirement_ids(course),
+                          REGISTRY.keys.__getitem__)
+
+    def get_evaluator(self, course):
+        '''
+        compiled check of a set of canonical handles against the
+        requirements of course, made once per version
+        '''
+        if self.evaluator_version != self.version:
+            self.evaluators = {}
+            self.evaluator_version = self.version
+        node = self.node_handle(course)
+        evaluator = self.evaluators.get(node)
+        if evaluator is None:
+            evaluator = self.evaluators[node] = compile_requirement(
+                self.requirement_ids(node))
+        return evaluator
+
+    def completed_handles(self, completed):
+        ''' set of canonical handles of completed, unknown ids are left out '''
+        handles = set()
+        for course in completed:
+            try:
+                handles.add(self.node_handle(course))
+            except KeyError:
+                pass
+        return handles
+
+    def is_eligible(self, course, completed):
+        '''
+        True if completed (list of Course or ids) meets the and/or
+        prerequisites of course
+        '''
+        return self.get_evaluator(course)(self.completed_handles(completed))
+
+    def eligible_many(self, course, transcripts):
+        '''
+        [is_eligible(course, completed)] of every completed in
+        transcripts, the requirements are compiled once
+        '''
+        evaluator = self.get_evaluator(course)
+        return [evaluator(self.completed_handles(completed))
+                for completed in transcripts]
+
+    def audit(self, transcripts, include_completed=False):
+        '''
+        audit.Audit of which courses every transcript of a cohort can
+        take next, same answers as is_eligible for every pair:
+        transcripts {student : completed} or [completed], each a list
+            of Course or ids, unknown ids are left out
+        include_completed (bool) also count courses already taken
+        Transcripts become rows of bits, one bit per student, and each
+        course's and/or requirements are &'d and |'d over those rows.
+        '''
+        from .audit import audit
+        return audit(self, transcripts, include_completed)
+
+    def credit_load(self, credits=None, default_credits=3):
+        '''
+        function of a course handle giving its credits, from credits
+        ({course id : credits} or a function of the Course, None where
+        unknown) or else default_credits
+        '''
+        if callable(credits):
+            def credit_of(handle):
+                return credits(self.courses[handle])
+        else:
+            credit_of = {self.node_handle(course): value
+                         for course, value in (credits or {}).items()}.get
+
+        def load(handle):
+            value = credit_of(handle)
+            return default_credits if value is None else value
+        return load
+
+    def plan(self, courses=None, subjects=None, completed=(),
+             max_courses=None, max_credits=None, credits=None,
+             default_credits=3):
+        '''
+        planner.Plan of course_keys taking a student from completed to
+        every course in courses and subjects:
+        courses [list of Course or id] target courses
+        subjects [list of str] subject codes whose courses are all targets
+        completed [list of Course or id] taken already, along with
+            everything they require
+        max_courses (int) cap on the courses per term
+        max_credits (number) cap on the credits per term
+        credits = {course id : credits} or a function of the Course,
+            default_credits for the courses it leaves out
+        Only the required courses are planned, each in the first term
+        after its prerequisites that has room (see planner.schedule).
+        '''
+        from .planner import Plan, required, schedule
+        index = self.get_reachability()
+        targets = [self.node_handle(course) for course in courses or ()]
+        if subjects:
+            subjects = set(subjects)
+            canonical = self.aliases.canonical
+            targets.extend({canonical(handle)
+                            for handle, course in self.courses.items()
+                            if course.subject_code in subjects})
+        done = [self.node_handle(course) for course in completed]
+        need = required(index, targets, done)
+        keys = REGISTRY.keys
+        load = None
+        if max_credits is not None:
+            load = self.credit_load(credits, default_credits)
+        plan = schedule(index, need, max_credits, load, max_courses)
+        return Plan([[keys[h] for h in term] for term in plan.terms],
+                    {keys[h]: level for h, level in plan.levels.items()},
+                    plan.loads)
+
+    def is_prerequisite_many(self, pairs):
+        ''' [is_prerequisite(a, b)] of every (a, b) in pairs '''
+        index = self.get_reachability()
+        node_handle = self.node_handle
+        return [index.reaches(node_handle(a), node_handle(b))
+                for a, b in pairs]
+
+    def get_analysis_engine(self):
+        ''' AnalysisEngine of the current diGraph, made once per version '''
+        from .analysis import AnalysisBudget, AnalysisEngine
+        if self.analysis_budget is None:
+            self.analysis_budget = AnalysisBudget()
+        if (self.analysis_engine is None or
+                self.analysis_version != self.graph_version):
+            self.analysis_engine = AnalysisEngine(self.diGraph,
+                                                  self.analysis_budget,
+                                                  self.instrument)
+            self.analysis_version = self.graph_version
+            self.analysis_fingerprint = None
+            self.analysis_results = {}
+            self.layouts = {}
+        return self.analysis_engine
+
+    def get_fingerprint(self):
+        ''' graph_fingerprint of the current diGraph '''
+        from .analysis import graph_fingerprint
+        self.get_analysis_engine()
+        if self.analysis_fingerprint is None:
+            self.analysis_fingerprint = graph_fingerprint(self.diGraph)
+        return self.analysis_fingerprint
+
+    def get_analysis_cache(self):
+        ''' AnalysisCache kept next to the pages in the page store '''
+        from .analysis import AnalysisCache
+        if self.analysis_cache is None:
+            self.analysis_cache = AnalysisCache(self.get_page_store())
+        return self.analysis_cache
+
+    def analyze(self, metrics):
+        '''
+        {metric : value} of the diGraph for metrics (list of str, see
+        analysis.METRICS). Values come from memory, then from the analysis
+        cache when the curriculum has a page store, and only the missing
+        ones are computed, together, by the AnalysisEngine.
+        '''
+        engine = self.get_analysis_engine()
+        budget = self.analysis_budget
+        engine.budget = budget
+        results = {metric: self.analysis_results[(metric, budget.key())]
+                   for metric in metrics
+                   if (metric, budget.key()) in self.analysis_results}
+        missing = [metric for metric in metrics if metric not in results]
+        if missing and self.page_store is not None:
+            with self.instrument.span("cache_lookup"):
+                results.update(self.get_analysis_cache().get(
+                    self.get_fingerprint(), missing, budget))
+            found = len(missing)
+            missing = [metric for metric in metrics if metric not in results]
+            self.instrument.count("analysis_cache_hits",
+                                  found - len(missing))
+            self.instrument.count("analysis_cache_misses", len(missing))
+        if missing:
+            with self.instrument.span("analysis"):
+                computed = engine.compute(missing)
+            if self.page_store is not None:
+                self.get_analysis_cache().put(self.get_fingerprint(),
+                                              computed, budget)
+            results.update(computed)
+        for metric, value in results.items():
+            self.analysis_results[(metric, budget.key())] = value
+        return {metric: results[metric] for metric in metrics}
+
+    def titled(self, ranking):
+        ''' {course_title : count} of a [(course_key, count)] ranking '''
+        return {self.course_dict[key].course_title: count
+                for key, count in ranking}
+
+    def generate_graph_analysis(self, metrics=None):
         ''' generates internal dictionary of information on graph '''
-        self.graph_analysis['density'] = nx.density(self.diGraph)
-        # get the largest connected component
-        self.graph_analysis['number_of_nodes'] = self.diGraph.number_of_nodes()
-        undirected = self.diGraph.to_undirected()
-        largest_component = max(nx.connected_components(undirected), key=len)
-        subgraph = undirected.subgraph(largest_component)
-        self.graph_analysis['subgraph_definition'] =\
-            "largest connected component"
-        self.graph_analysis['subgraph_number_of_nodes'] =\
-            subgraph.number_of_nodes()
-        self.graph_analysis['subgraph_density'] =\
-            nx.density(subgraph)
-        self.graph_analysis['subgraph_diameter'] =\
-            nx.diameter(subgraph)
-        self.graph_analysis['subgraph_transitivity'] =\
-            nx.transitivity(subgraph)
-
-        ancestor_dict =\
-            {n: len(nx.ancestors(self.diGraph, n)) for n in self.diGraph}
-        most_ancestors = sorted(ancestor_dict,
-                                key=ancestor_dict.get, reverse=True)[:10]
-        self.graph_analysis['most_ancestors'] =\
-            {self.course_dict[key].course_title: ancestor_dict[key]
-             for key in most_ancestors}
+        from .analysis import RANKINGS
+        if metrics is None:
+            metrics = ['density', 'number_of_nodes', 'subgraph_definition',
+                       'subgraph_number_of_nodes', 'subgraph_density',
+                       'subgraph_diameter', 'subgraph_transitivity',
+                       'most_ancestors']
+        for metric, value in self.analyze(metrics).items():
+            if metric in RANKINGS:
+                value = self.titled(value)
+            self.graph_analysis[metric] = value
 
     def nx_analysis(self, key='ancestors',
-                    nx_func=nx.ancestors,
+                    nx_func=None,
                     descending=True):
-        tempdict =\
-            {n: len(nx_func(self.diGraph, n)) for n in self.diGraph}
-        sortedlist = sorted(tempdict,
-                            key=tempdict.get, reverse=descending)[:10]
+        ''' nx_func defaults to nx.ancestors '''
+        import networkx as nx
+        if nx_func is None:
+            nx_func = nx.ancestors
         adjective = 'most' if descending else 'least'
         graph_analysis_key = adjective + ' ' + key
-        self.graph_analysis[graph_analysis_key] =\
-            {self.course_dict[key].course_title: tempdict[key]
-             for key in sortedlist}
+        if nx_func is nx.ancestors or nx_func is nx.descendants:
+            metric = adjective + ' ' + nx_func.__name__
+            ranking = self.analyze([metric])[metric]
+        else:
+            tempdict =\
+                {n: len(nx_func(self.diGraph, n)) for n in self.diGraph}
+            sortedlist = sorted(tempdict,
+                                key=tempdict.get, reverse=descending)[:10]
+            ranking = [(n, tempdict[n]) for n in sortedlist]
+        self.graph_analysis[graph_analysis_key] = self.titled(ranking)
 
     def print_graph_analysis(self):
+        from pprint import pprint
         for key in self.graph_analysis:
             print("\t%s:" % key, end=' ')
             pprint(self.graph_analysis[key], sort_dicts=False)
 
-    def print_graph(self, notebook=False, emphasize_in_degree=False,
-                    defaults=True):
+    def get_layout_cache(self):
+        ''' LayoutCache kept next to the pages in the page store '''
+        from .layout import LayoutCache
+        if self.layout_cache is None:
+            self.layout_cache = LayoutCache(self.get_page_store())
+        return self.layout_cache
 
+    def get_layout(self, method="layered"):
+        '''
+        {course_key : (x, y)} of every diGraph node laid out by method
+        (see layout.LAYOUTS), computed once per graph and kept in the
+        layout cache when the curriculum has a page store
+        '''
+        from .layout import LAYOUTS
+        self.generate_nx()
+        self.get_analysis_engine()
+        if method not in self.layouts:
+            positions = None
+            if self.page_store is not None:
+                positions = self.get_layout_cache().get(
+                    self.get_fingerprint(), method)
+            if positions is None:
+                with self.instrument.span("layout"):
+                    positions = LAYOUTS[method](self.diGraph)
+                if self.page_store is not None:
+                    self.get_layout_cache().put(self.get_fingerprint(),
+                                                method, positions)
+            self.layouts[method] = positions
+        return self.layouts[method]
+
+    def print_graph(self, notebook=False, emphasize_in_degree=False,
+                    defaults=True, layout="layered", show=True):
+        '''
+        draws the diGraph with pyvis into visualizations/
+        layout (string) method of get_layout placing the nodes, None
+            leaves it to the pyvis physics in the browser
+        show (bool) open the page, False only writes the html file
+        '''
+        from pyvis.network import Network
         self.generate_nx(emphasize_in_degree=emphasize_in_degree)
-        nx.draw_kamada_kawai(self.diGraph, arrows=True)
-        net = Network('768px', '1024px', notebook)
-
-        net.from_nx(self.diGraph)
-        if defaults:
-            net.set_options('''
-                var options = {
-                  "nodes": {
-                    "shadow": {
-                      "enabled": true,
-                      "size": 15
-                    }
-                  },
-                  "edges": {
-                    "arrows": {
-                      "to": {
+        self.render_titles()
+        with self.instrument.span("render"):
+            net = Network('768px', '1024px', notebook)
+
+            net.from_nx(self.diGraph)
+            if layout is not None:
+                positions = self.get_layout(layout)
+                for node in net.nodes:
+                    node['x'], node['y'] = positions[node['id']]
+                    node['physics'] = False
+                physics = '{"enabled": false}'
+            else:
+                physics = '''{
+                        "forceAtlas2Based": {
+                          "gravitationalConstant": -200,
+                          "centralGravity": 0.02,
+                          "springLength": 120,
+                          "springConstant": 0.2,
+                          "avoidOverlap": 0.5
+                        },
+                        "minVelocity": 0.75,
+                        "solver": "forceAtlas2Based"
+                      }'''
+            if defaults:
+                net.set_options('''
+                    var options = {
+                      "nodes": {
+                        "shadow": {
+                          "enabled": true,
+                          "size": 15
+                        }
+                      },
+                      "edges": {
+                        "arrows": {
+                          "to": {
+                            "enabled": true
+                          }
+                        },
+                        "color": {
+                          "inherit": "both"
+                        },
+                        "smooth": false
+                      },
+                      "interaction": {
+                        "hover": true
+                      },
+                      "manipulation": {
                         "enabled": true
-                      }
-                    },
-                    "color": {
-                      "inherit": "both"
-                    },
-                    "smooth": false
-                  },
-                  "interaction": {
-                    "hover": true
-                  },
-                  "manipulation": {
-                    "enabled": true
-                  },
-                  "physics": {
-                    "forceAtlas2Based": {
-                      "gravitationalConstant": -200,
-                      "centralGravity": 0.02,
-                      "springLength": 120,
-                      "springConstant": 0.2,
-                      "avoidOverlap": 0.5
-                    },
-                    "minVelocity": 0.75,
-                    "solver": "forceAtlas2Based"
-                  }
-                }
-                ''')
-        else:
-            net.show_buttons(True)
-        # net.enable_physics(True)
-        # net.show_buttons(filter_=True)
-        try:
-            os.makedirs("visualizations")
-        except Exception:
-            pass
-        net.show("visualizations/%s_%s.html" % (str(self).replace(" ", "_"),
-                 self.preferred_subject_code))
+                      },
+                      "physics": %s
+                    }
+                    ''' % physics)
+            else:
+                net.show_buttons(True)
+            # net.enable_physics(True)
+            # net.show_buttons(filter_=True)
+            try:
+                os.makedirs("visualizations")
+            except Exception:
+                pass
+            path = "visualizations/%s_%s.html" % (str(self).replace(" ", "_"),
+                                                  self.preferred_subject_code)
+            if show:
+                net.show(path)
+            else:
+                net.write_html(path)
         # net.show_buttons(filter_=['physics'])
 
     def set_url(self, new_url):
@@ -591,93 +1260,376 @@ class Curriculum:
             self.url_list.append(new_url)
             self.url = new_url
 
-    def polite_crawler(self, URL=None):
-        ''' saves a copy of the html to not overping '''
+    def get_session(self):
+        ''' pooled requests.Session shared by every fetch '''
+        from .fetch import make_session
+        if self.session is None:
+            self.session = make_session()
+        return self.session
+
+    def get_page_store(self):
+        ''' PageStore holding the cached pages, opened on first use '''
+        from .pagestore import PageStore
+        if self.page_store is None:
+            self.page_store = PageStore()
+        return self.page_store
+
+    def prefetch(self, urls, max_workers=8, per_host_rate=1.0, timeout=30):
+        '''
+        Downloads every url in urls that isn't fresh in the page store,
+        max_workers at a time and at most per_host_rate requests per
+        second to each host, so the get_soup calls that follow are all
+        cache hits. Stale pages are revalidated with a conditional GET.
+        Returns the list of urls that were downloaded or revalidated.
+        '''
+        from .fetch import fetch_all
+        instrument = self.instrument
+        store = self.get_page_store()
+        urls = list(dict.fromkeys(urls))
+        misses = []
+        headers = {}
+        with instrument.span("cache_lookup"):
+            for url in urls:
+                if not store.is_fresh(store.entry(url)):
+                    misses.append(url)
+                    headers[url] = store.conditional_headers(url)
+        instrument.count("page_cache_hits", len(urls) - len(misses))
+        instrument.count("page_cache_misses", len(misses))
+        print("Prefetching %d of %d pages..." % (len(misses), len(urls)))
+        fetched = []
+        with instrument.span("fetch"):
+            for url, res in fetch_all(misses, self.get_session(),
+                                      max_workers=max_workers,
+                                      per_host_rate=per_host_rate,
+                                      timeout=timeout, headers=headers):
+                if res is None:
+                    continue
+                store.save_response(url, res)
+                fetched.append(url)
+        return fetched
+
+    def get_page(self, URL=None):
+        '''
+        returns the raw bytes of the page from the page store to not
+        overping, the server is only asked when it's missing or stale
+        '''
+        from .fetch import fetch
         if URL is not None:
             self.set_url(URL)
-        i = 1
-        if self.url.split("/")[-i] == "":
-            i += 1
-        filename = self.url.split("/")[-i] + ".html"
-        # print("Trying %s/%s" % (data_dir, filename))
-        try:
-            os.makedirs(self.data_dir)
-        except Exception:
-            # only here if already have the directory
-            # do nothing safely
-            pass
+        instrument = self.instrument
+        store = self.get_page_store()
+        with instrument.span("cache_lookup"):
+            entry = store.entry(self.url)
+            fresh = store.is_fresh(entry)
         try:
-            # try to open html, where we cache the soup
-            print("Reading from '%s'..." %
-                  os.path.join(self.data_dir, filename))
-            with open(os.path.join(self.data_dir, filename), "r") as file:
-                self.soup = BeautifulSoup(file, "lxml")
-            return self.soup
-        except Exception:
-            try:
-                print("\t\tPinging Server")
-                res = requests.get(self.url)
-                # using lxml because of bs4 doc
-                self.soup = BeautifulSoup(res.content, "lxml")
-                print("Writing to '%s'..." %
-                      os.path.join(self.data_dir, filename))
-                with open(os.path.join(self.data_dir, filename), 'w+') as file:
-                    file.write(str(self.soup))
-                return self.soup
-            except Exception:
-                print("Why are you even here?")
-                print(str(Exception))
-                return BeautifulSoup(requests.get(self.url), "lxml")
+            if fresh:
+                print("Reading '%s' from the page store..." % self.url)
+                instrument.count("page_cache_hits")
+                return store.get(self.url)
+            instrument.count("page_cache_misses")
+            print("\t\tPinging Server")
+            with instrument.span("fetch"):
+                res = fetch(self.get_session(), self.url,
+                            headers=store.conditional_headers(self.url))
+                return store.save_response(self.url, res)
+        except Exception as e:
+            print("Why are you even here?")
+            print(str(e))
+            # fall back on the stale copy if there is one
+            return store.get(self.url) if entry is not None else b""
+
+    def polite_crawler(self, URL=None):
+        ''' parses the (cached) page into self.soup '''
+        from bs4 import BeautifulSoup
+        # using lxml because of bs4 doc
+        content = self.get_page(URL)
+        with self.instrument.span("parse"):
+            self.soup = BeautifulSoup(content, "lxml")
+        return self.soup
 
     def get_soup(self, URL=None):
         return self.polite_crawler(URL)
 
+    def get_record_cache(self):
+        ''' RecordCache kept next to the pages in the page store '''
+        if self.record_cache is None:
+            self.record_cache = RecordCache(self.get_page_store())
+        return self.record_cache
+
+    def ingest(self, URL, extractor):
+        '''
+        Adds every course on the page at URL.
+        extractor (callable) takes (soup, curriculum), or (page bytes,
+        curriculum) if its markup attribute is "bytes", and yields
+        CourseRecords, its output is cached per page content and
+        extractor version so unchanged pages are never parsed again.
+        Returns the number of records added.
+        '''
+        from .parallel import extract_records
+        content = self.get_page(URL)
+        entry = self.get_page_store().entry(self.url)
+        key = extractor_key(extractor, self.parser_settings())
+        cache = self.get_record_cache()
+        records = None
+        if entry is not None:
+            with self.instrument.span("cache_lookup"):
+                records = cache.get(entry.digest, key)
+        if records is None:
+            self.instrument.count("record_cache_misses")
+            print("Extracting courses from '%s'..." % self.url)
+            with self.instrument.span("parse"):
+                records = extract_records(extractor, content, self)
+            if entry is not None:
+                cache.put(entry.digest, key, records)
+        else:
+            self.instrument.count("record_cache_hits")
+        for record in records:
+            self.add_record(record)
+        return len(records)
+
+    def parser_settings(self):
+        ''' the Curriculum arguments an extractor in another process needs '''
+        return {"preferred_subject_code": self.preferred_subject_code,
+                "course_search": self.course_search.pattern,
+                "subject_search": self.subject_search.pattern,
+                "code_search": self.code_search.pattern}
+
+    def ingest_all(self, urls, extractor, max_workers=None):
+        '''
+        Adds every course on the pages at urls like ingest, but the pages
+        without cached records are extracted in parallel by a pool of
+        max_workers processes (one per core by default).
+        Records are added in the order of urls.
+        Returns the number of records added.
+        '''
+        from .parallel import extract_pages
+        self.prefetch(urls)
+        store = self.get_page_store()
+        cache = self.get_record_cache()
+        key = extractor_key(extractor, self.parser_settings())
+        batches = {}
+        todo = []
+        with self.instrument.span("cache_lookup"):
+            for url in dict.fromkeys(urls):
+                self.set_url(url)
+                entry = store.entry(url)
+                if entry is None:
+                    continue
+                records = cache.get(entry.digest, key)
+                if records is None:
+                    todo.append((url, entry.digest))
+                else:
+                    batches[url] = records
+        self.instrument.count("record_cache_hits", len(batches))
+        self.instrument.count("record_cache_misses", len(todo))
+        if todo:
+            print("Extracting courses from %d pages in parallel..." %
+                  len(todo))
+            with self.instrument.span("parse"):
+                extracted = extract_pages(
+                    [store.get(url) for url, _ in todo], extractor,
+                    self.parser_settings(), max_workers=max_workers)
+            for (url, digest), records in zip(todo, extracted):
+                cache.put(digest, key, records)
+                batches[url] = records
+        count = 0
+        for url in dict.fromkeys(urls):
+            for record in batches.get(url, ()):
+                self.add_record(record)
+                count += 1
+        return count
+
+    def merge(self, other):
+        '''
+        Absorbs the courses and alias groups of other (Curriculum), with
+        the same rules as adding the courses one by one.
+        '''
+        for course in other.courses.values():
+            self.add_course_object(course.copy())
+        for members in other.alias_groups():
+            self.join_aliases(list(members))
+        for url in other.url_list:
+            if url not in self.url_list:
+                self.url_list.append(url)
+        return self
+
+    @classmethod
+    def from_parts(cls, parts, **kwargs):
+        '''
+        Reduces parts into one new Curriculum(**kwargs), each part is
+        either a Curriculum or an iterable of CourseRecords
+        '''
+        curriculum = cls(**kwargs)
+        for part in parts:
+            if isinstance(part, Curriculum):
+                curriculum.merge(part)
+            else:
+                for record in part:
+                    curriculum.add_record(record)
+        return curriculum
+
+    def save(self, path):
+        '''
+        Writes the courses, prerequisites and alias groups to path as a
+        binary snapshot (see snapshot.py): one string table for every id,
+        title and description plus integer arrays for the rest.
+        '''
+        from .snapshot import write_snapshot
+        keys = REGISTRY.keys
+        courses = []
+        prereqs = []
+        aliases = []
+        for index, course in enumerate(self.courses.values()):
+            courses.append((keys[course.handle], str(course.subject_code),
+                            str(course.course_code), course.course_title,
+                            course.course_description))
+            prereqs.extend((index, keys[h]) for h in course.prereq_ids)
+            aliases.extend((index, keys[h]) for h in course.alias_ids)
+        groups = []
+        for members in self.alias_groups():
+            canonical = keys[self.aliases.canonical(members[0])]
+            groups.extend((keys[h], canonical) for h in members)
+        # the few and/or expressions ride along in the json header
+        requirements = {index: map_leaves(course.prereq_expr,
+                                          keys.__getitem__)
+                        for index, course in enumerate(self.courses.values())
+                        if course.prereq_expr is not None}
+        meta = {"university": self.university,
+                "degree_name": self.degree_name,
+                "preferred_subject_code": self.preferred_subject_code,
+                "course_search": self.course_search.pattern,
+                "subject_search": self.subject_search.pattern,
+                "code_search": self.code_search.pattern,
+                "colored_subjects": self.colored_subjects,
+                "palette": {subj: getattr(colormap, "name", colormap)
+                            for subj, colormap in self.palette.items()},
+                "url_list": self.url_list,
+                "requirements": requirements}
+        write_snapshot(path, meta, courses, prereqs, aliases, groups)
+
+    @classmethod
+    def load(cls, path, mmap=True, **kwargs):
+        '''
+        New Curriculum (or subclass) read from a snapshot written by save.
+        Nothing is parsed or merged again, the courses and alias groups
+        are rebuilt straight from the arrays. With mmap the file is
+        memory-mapped instead of read and stays open as self.snapshot:
+        titles and descriptions are only decoded from it when read (see
+        snapshot.SnapshotCourse), so worker processes loading the same
+        snapshot share those pages. Ids and edges become registry
+        handles, which belong to each process. kwargs override the saved
+        settings.
+        '''
+        from .snapshot import COURSE_FIELDS, Snapshot, SnapshotCourse
+        snapshot = Snapshot(path, mmap)
+        meta = snapshot.meta
+        course_ids = snapshot.courses.tolist()
+        prereqs = snapshot.prereqs.tolist()
+        aliases = snapshot.aliases.tolist()
+        groups = snapshot.groups.tolist()
+        # only ids and codes are decoded here, each string once
+        decoded = {}
+
+        def string(string_id):
+            value = decoded.get(string_id)
+            if value is None:
+                value = decoded[string_id] = snapshot.string(string_id)
+            return value
+        settings = {name: meta[name] for name in
+                    ("university", "degree_name", "preferred_subject_code",
+                     "course_search", "subject_search", "code_search",
+                     "palette")}
+        settings["colored_subjects"] = [
+            subj for subj in meta["colored_subjects"]
+            if subj != meta["preferred_subject_code"]]
+        settings.update(kwargs)
+        curriculum = cls(**settings)
+        curriculum.snapshot = snapshot
+        for url in meta["url_list"]:
+            curriculum.set_url(url)
+        handles = []
+        for row, i in enumerate(range(0, len(course_ids), COURSE_FIELDS)):
+            course = SnapshotCourse(snapshot, row,
+                                    string(course_ids[i + 1]),
+                                    string(course_ids[i + 2]))
+            handles.append(course.handle)
+            curriculum.courses[course.handle] = course
+            curriculum.course_codes_set.add(course.get_course_code_int())
+        intern = REGISTRY.intern
+        for index, key in zip(prereqs[::2], prereqs[1::2]):
+            curriculum.courses[handles[index]].add_prereq_id(
+                intern(string(key)))
+        for index, key in zip(aliases[::2], aliases[1::2]):
+            curriculum.courses[handles[index]].add_alias_id(
+                intern(string(key)))
+        for index, expr in meta.get("requirements", {}).items():
+            curriculum.courses[handles[int(index)]].set_requirements(
+                from_json(expr))
+        members_of = {}
+        for member, canonical in zip(groups[::2], groups[1::2]):
+            members_of.setdefault(intern(string(canonical)), []).append(
+                intern(string(member)))
+        curriculum.aliases = AliasForest.from_groups(members_of.items(),
+                                                     curriculum.prefers)
+        for handle in handles:
+            curriculum.touch(handle)
+        return curriculum
+
+    def add_record(self, record):
+        ''' adds the course described by record (CourseRecord) '''
+        prereqs = [Course(*self.course_id_to_list(course_id))
+                   for course_id in record.prerequisites]
+        requirements = map_leaves(
+            record.requirements,
+            lambda course_id: "%s %s" % self.course_id_to_list(course_id))
+        self.add_course(Course(record.subject_code, record.course_code,
+                               record.course_title,
+                               record.course_description,
+                               prereqs, list(record.aliases),
+                               requirements=requirements))
+
     def update(self, guess_alias=False):
-        for key, alias_list in self.alias_dict.items():
-            for alias in alias_list:
-                try:
-                    self.course_dict[key].add_alias(alias)
-                    self.course_dict[key].copypasta(self.course_dict[alias])
-                except KeyError:
-                    self.add_course(key)
-                    self.add_course(alias)
-                    self.course_dict[key].add_alias(alias)
-                    self.course_dict[key].copypasta(self.course_dict[alias])
+        '''
+        passes details added to aliases since their union on to the
+        canonical course of their group
+        '''
+        with self.instrument.span("update"):
+            for handle in list(self.dirty):
+                canonical = self.aliases.canonical(handle)
+                if canonical != handle and handle in self.courses:
+                    self.courses[canonical].absorb(self.courses[handle])
+                    self.instrument.count("absorbs")
+                    self.touch(canonical)
 
-    def print_all(self, notebook=False, logging=True, defaults=True):
+    def export(self, formats=("text", "jsonl", "csv"), base=None):
         '''
-        no unit test for this one
-        since it's rly just printing things out
-        for debugging purposes
+        Streams the course inventory, alias groups, prerequisite edges and
+        graph_analysis to files, see report.export for the formats.
+        base (string) path without extension, by default
+            data_dir/<name>_output
+        Returns the paths written.
         '''
-        # Save a reference to the original standard output
-        init_time = perf_counter()
-        self.print_graph(notebook=notebook, defaults=defaults)
-        original_stdout = sys.stdout
+        from .report import export
+        if base is None:
+            base = os.path.join(self.data_dir,
+                                str(self).replace(" ", "_") + "_output")
+        return export(self, base, formats)
 
-        with open(os.path.join(self.data_dir,
-                  str(str(self).replace(" ", "_") +
-                      "_output.txt")), 'w+') as f:
-            # Change the standard output to the file we created.
+    def print_all(self, notebook=False, logging=True, defaults=True,
+                  formats=("text",), show=True):
+        '''
+        draws the graph and writes the report in formats (see export),
+        without logging the text report goes to the console instead
+        '''
+        from .report import write_text
+        init_time = perf_counter()
+        self.print_graph(notebook=notebook, defaults=defaults, show=show)
+        with self.instrument.span("export"):
             if logging:
-                sys.stdout = f
-            print('Sources:')
-            for u in self.url_list:
-                print("\t" + str(u) + "\n")
-            printbreak()
-            print(str(self))
-            printbreak()
-            print("Course Inventory contains %d courses..." %
-                  self.num_courses())
-            if self.num_courses() > 0:
-                for x in self.course_dict:
-                    printbreak()
-                    print(self.course_dict[x].full_desc(heading=True))
-                printbreak()
-                # print(self.alias_dict)
-            self.print_graph_analysis()
-        # Reset the standard output to its original value
-        sys.stdout = original_stdout
+                for path in self.export(formats):
+                    print("Report written to %s" % path)
+            else:
+                write_text(self, sys.stdout)
         self.print_graph_analysis()
         finish_time = perf_counter()
         print("Printing time: %.6f seconds" % (finish_time - init_time))
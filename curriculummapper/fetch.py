@@ -0,0 +1,90 @@
+#! python3
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def make_session(pool_size=8, retries=3, backoff=0.5):
+    '''
+    requests.Session with a connection pool of pool_size per host that
+    retries connection errors and 429/5xx answers with exponential backoff
+    '''
+    retry = Retry(total=retries, backoff_factor=backoff,
+                  status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=("GET", "HEAD"))
+    adapter = HTTPAdapter(pool_connections=pool_size,
+                          pool_maxsize=pool_size,
+                          max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class HostRateLimiter:
+    '''
+    Spaces out requests so no host sees more than per_host_rate
+    requests per second, shared by every worker thread.
+    '''
+    def __init__(self, per_host_rate=1.0):
+        '''
+        interval (float) seconds between two requests to the same host
+        next_slot = {host : time.monotonic() of the next free slot}
+        '''
+        self.interval = 1.0 / per_host_rate if per_host_rate else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = {}
+
+    def wait(self, url):
+        ''' blocks until a request to the host of url is allowed '''
+        host = urlsplit(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def fetch(session, url, timeout=30, limiter=None, headers=None):
+    '''
+    GETs url politely, returns the requests.Response
+    (a 304 when the conditional headers matched)
+    '''
+    if limiter is not None:
+        limiter.wait(url)
+    res = session.get(url, timeout=timeout, headers=headers)
+    res.raise_for_status()
+    return res
+
+
+def fetch_all(urls, session=None, max_workers=8, per_host_rate=1.0,
+              timeout=30, headers=None):
+    '''
+    Downloads urls concurrently, yields (url, requests.Response) in order
+    of urls, the response is None when the url couldn't be fetched.
+    headers = {url : extra request headers}
+    '''
+    if session is None:
+        session = make_session(pool_size=max_workers)
+    if headers is None:
+        headers = {}
+    limiter = HostRateLimiter(per_host_rate)
+
+    def task(url):
+        try:
+            return url, fetch(session, url, timeout, limiter,
+                              headers.get(url))
+        except requests.RequestException as e:
+            print("\t\tFailed to fetch %s: %s" % (url, e))
+            return url, None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for result in pool.map(task, urls):
+            yield result
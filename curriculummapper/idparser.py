@@ -0,0 +1,122 @@
+#! python3
+
+import re
+import unicodedata
+from functools import lru_cache
+
+
+def first_group(pattern):
+    '''
+    source of the first capturing group of pattern (string),
+    the whole pattern if it has none
+    '''
+    depth = 0
+    start = None
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+            # a ] right after [ or [^ is a literal
+            if pattern[i + 1:i + 2] == "]":
+                i += 1
+            elif pattern[i + 1:i + 3] == "^]":
+                i += 2
+        elif char == "(":
+            if start is None and pattern[i + 1:i + 2] != "?":
+                start = i + 1
+                depth = 0
+            elif start is not None:
+                depth += 1
+        elif char == ")" and start is not None:
+            if depth == 0:
+                return pattern[start:i]
+            depth -= 1
+        i += 1
+    return pattern
+
+
+class CourseIdParser:
+    '''
+    Splits course ids into (subject_code, course_code, course_key) with
+    one compiled pattern built from a Curriculum's subject_search and
+    code_search, memoized per distinct raw string.
+    '''
+    def __init__(self, course_search, subject_search, code_search,
+                 maxsize=65536):
+        '''
+        course_search, subject_search, code_search (re.Pattern) the
+        Curriculum's searches
+        id_search (re.Pattern) (?P<subject>...)\\s*(?P<code>...)
+        maxsize (int) distinct strings remembered by the LRU caches
+        '''
+        self.course_search = course_search
+        self.subject_search = subject_search
+        self.code_search = code_search
+        self.id_search = re.compile(
+            r"(?P<subject>%s)\s*(?P<code>%s)" %
+            (first_group(subject_search.pattern),
+             first_group(code_search.pattern)))
+        self.parse = lru_cache(maxsize=maxsize)(self.parse_uncached)
+        self.normalize = lru_cache(maxsize=maxsize)(normalize)
+
+    def parse_uncached(self, course_id):
+        '''
+        (subject_code, course_code, course_key, is_id) of course_id or None
+        if no subject and code are found, is_id tells if course_search
+        matches at the start of the id
+        '''
+        course_id = unicodedata.normalize('NFKD', course_id)
+        match = self.id_search.search(course_id)
+        if match is not None:
+            subject_code = match.group("subject").strip()
+            course_code = match.group("code")
+        else:
+            # the two searches don't line up as one pattern
+            subjects = self.subject_search.findall(course_id)
+            codes = self.code_search.findall(course_id)
+            if not subjects or not codes:
+                return None
+            subject_code, course_code = subjects[0], codes[0]
+        # patterns like SFSU's want whitespace after the id
+        is_id = (self.course_search.match(course_id) is not None or
+                 self.course_search.match(course_id + " ") is not None)
+        return (subject_code, course_code,
+                subject_code + " " + course_code, is_id)
+
+    def split(self, course_id):
+        ''' (subject_code, course_code), IndexError if it isn't an id '''
+        parsed = self.parse(course_id)
+        if parsed is None:
+            raise IndexError("no course id in %r" % course_id)
+        return parsed[0], parsed[1]
+
+    def key(self, course_id):
+        ''' "SUBJ CODE" form of course_id, or its normalized self '''
+        parsed = self.parse(course_id)
+        if parsed is None:
+            return self.normalize(course_id)
+        return parsed[2]
+
+    def is_course_id(self, course_id):
+        parsed = self.parse(course_id)
+        return parsed is not None and parsed[3]
+
+
+@lru_cache(maxsize=65536)
+def code_int(course_code):
+    ''' the number in course_code (string), "226L" is 226 '''
+    match = re.search(r"([0-9]+)", course_code)
+    if match is None:
+        return int(course_code)
+    return int(match[0])
+
+
+def normalize(text):
+    return unicodedata.normalize('NFKD', text)
@@ -0,0 +1,214 @@
+#! python3
+
+import json
+from contextlib import nullcontext
+from time import perf_counter, process_time
+
+# spans run per course or per page, only totalled unless asked for
+SUMMARIZED = ("add_course_object", "cache_lookup")
+
+
+class Span:
+    ''' one timed with block of an Instrument '''
+    __slots__ = ('instrument', 'name', 'wall', 'cpu', 'base', 'peak')
+
+    def __init__(self, instrument, name):
+        self.instrument = instrument
+        self.name = name
+
+    def __enter__(self):
+        self.instrument.enter(self)
+        self.wall = perf_counter()
+        self.cpu = process_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall = perf_counter() - self.wall
+        cpu = process_time() - self.cpu
+        self.instrument.exit(self, wall, cpu)
+        return False
+
+
+class Instrument:
+    '''
+    Collects named spans (wall and cpu seconds, optionally the
+    tracemalloc peak) and counters of a Curriculum's pipeline and hands
+    the finished spans to its sinks. Give one to Curriculum(instrument=)
+    and call flush() to send the totals.
+    Spans: cache_lookup, fetch, parse, add_course_object, update,
+    generate_nx, analysis, analysis.<metric>, layout, render, export.
+    Counters: page_cache_hits/misses, record_cache_hits/misses,
+    analysis_cache_hits/misses, courses_added, absorbs, alias_unions.
+    '''
+    enabled = True
+
+    def __init__(self, sinks=(), memory=False, summarized=SUMMARIZED):
+        '''
+        sinks (list of callables) each called with every event (dict),
+            see LoggingSink and JsonSink, any function works as a callback
+        memory (bool) traces allocations for the peak bytes of every
+            span, tracemalloc slows the traced code down several times
+        summarized (list of str) spans only added to the totals, not
+            sent to the sinks one by one
+        spans = {name : {"count", "wall", "cpu", "peak"}} totals, wall
+            and cpu leave out spans nested in one of the same name
+        counters = {name : int}
+        '''
+        self.sinks = list(sinks)
+        self.memory = memory
+        self.summarized = frozenset(summarized)
+        self.spans = {}
+        self.counters = {}
+        self.stack = []
+        self.tracing = False
+
+    def span(self, name):
+        ''' context manager timing its block under name '''
+        return Span(self, name)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def enter(self, span):
+        if self.memory:
+            # imported here, it pulls in pickle and friends
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            # the peak is reset for this span, the parent keeps its own
+            if self.stack:
+                parent = self.stack[-1]
+                parent.peak = max(parent.peak, peak)
+            tracemalloc.reset_peak()
+            span.base = span.peak = current
+        self.stack.append(span)
+
+    def exit(self, span, wall, cpu):
+        self.stack.pop()
+        peak = None
+        if self.memory:
+            import tracemalloc
+            top = max(span.peak, tracemalloc.get_traced_memory()[1])
+            if self.stack:
+                parent = self.stack[-1]
+                parent.peak = max(parent.peak, top)
+            peak = top - span.base
+        totals = self.spans.get(span.name)
+        if totals is None:
+            totals = self.spans[span.name] = {"count": 0, "wall": 0.0,
+                                              "cpu": 0.0, "peak": None}
+        totals["count"] += 1
+        if not any(outer.name == span.name for outer in self.stack):
+            totals["wall"] += wall
+            totals["cpu"] += cpu
+        if peak is not None:
+            totals["peak"] = max(totals["peak"] or 0, peak)
+        if self.sinks and span.name not in self.summarized:
+            self.emit({"type": "span", "name": span.name,
+                       "depth": len(self.stack), "wall": wall, "cpu": cpu,
+                       "peak": peak})
+
+    def emit(self, event):
+        for sink in self.sinks:
+            sink(event)
+
+    def summary(self):
+        ''' {"type": "summary", "spans": totals, "counters": counters} '''
+        return {"type": "summary",
+                "spans": {name: dict(totals)
+                          for name, totals in self.spans.items()},
+                "counters": dict(self.counters)}
+
+    def flush(self):
+        ''' sends the summary to the sinks and returns it '''
+        summary = self.summary()
+        self.emit(summary)
+        return summary
+
+    def reset(self):
+        ''' forgets the totals and counters '''
+        self.spans = {}
+        self.counters = {}
+
+    def close(self):
+        ''' stops tracemalloc if this instrument started it '''
+        if self.tracing:
+            import tracemalloc
+            tracemalloc.stop()
+            self.tracing = False
+
+
+class NullInstrument:
+    ''' the disabled Instrument, spans and counters do nothing '''
+    enabled = False
+    sinks = ()
+
+    def span(self, name):
+        return NULL_SPAN
+
+    def count(self, name, n=1):
+        pass
+
+    def summary(self):
+        return {"type": "summary", "spans": {}, "counters": {}}
+
+    def flush(self):
+        return self.summary()
+
+    def reset(self):
+        pass
+
+    def close(self):
+        pass
+
+
+# one reusable no-op with block for every disabled span
+NULL_SPAN = nullcontext()
+NULL_INSTRUMENT = NullInstrument()
+
+
+def describe(event):
+    ''' one line of text for a span event '''
+    line = "%s%s: %.4f s wall, %.4f s cpu" % ("  " * event["depth"],
+                                              event["name"], event["wall"],
+                                              event["cpu"])
+    if event["peak"] is not None:
+        line += ", peak %.1f KiB" % (event["peak"] / 1024)
+    return line
+
+
+class LoggingSink:
+    ''' logs span events and summaries with the logging module '''
+    def __init__(self, logger="curriculummapper", level=None):
+        '''
+        logger (string or logging.Logger)
+        level (int) defaults to logging.INFO
+        '''
+        import logging
+        if isinstance(logger, str):
+            logger = logging.getLogger(logger)
+        self.logger = logger
+        self.level = logging.INFO if level is None else level
+
+    def __call__(self, event):
+        log = self.logger.log
+        if event["type"] == "span":
+            log(self.level, describe(event))
+            return
+        for name, totals in event["spans"].items():
+            log(self.level, describe(dict(totals, name=name, depth=0)) +
+                " over %d" % totals["count"])
+        for name, value in event["counters"].items():
+            log(self.level, "%s: %d" % (name, value))
+
+
+class JsonSink:
+    ''' appends every event to path as one line of json '''
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, event):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event) + "\n")
@@ -0,0 +1,138 @@
+#! python3
+
+import json
+import math
+import zlib
+
+import networkx as nx
+
+
+LAYOUT_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS layouts (
+    fingerprint TEXT NOT NULL,
+    method TEXT NOT NULL,
+    body BLOB NOT NULL,
+    PRIMARY KEY (fingerprint, method)
+);
+'''
+
+
+def depths(graph):
+    '''
+    {node : layer} of graph (nx.DiGraph), the length of the longest
+    prerequisite chain leading to the node. Courses in a cycle share the
+    layer of their strongly connected component.
+    '''
+    try:
+        order = list(nx.topological_sort(graph))
+    except nx.NetworkXUnfeasible:
+        condensed = nx.condensation(graph)
+        component_depth = depths(condensed)
+        return {node: component_depth[component] for node, component
+                in condensed.graph["mapping"].items()}
+    depth = {}
+    pred = graph.pred
+    for node in order:
+        depth[node] = max((depth[parent] + 1 for parent in pred[node]),
+                          default=0)
+    return depth
+
+
+def barycenter_sweep(layers, neighbors):
+    '''
+    reorders every layer (list of node lists) after the first by the
+    average position of each node's neighbors (dict of node lists) in the
+    layers already placed, nodes without any keep their place
+    '''
+    position = {}
+    for layer in layers[:1]:
+        for i, node in enumerate(layer):
+            position[node] = (i + 0.5) / len(layer)
+    for layer in layers[1:]:
+        keys = {}
+        for i, node in enumerate(layer):
+            placed = [position[n] for n in neighbors[node] if n in position]
+            keys[node] = (sum(placed) / len(placed) if placed
+                          else (i + 0.5) / len(layer))
+        layer.sort(key=keys.get)
+        for i, node in enumerate(layer):
+            position[node] = (i + 0.5) / len(layer)
+
+
+def layered_layout(graph, iterations=4, layer_gap=150, node_gap=80):
+    '''
+    {node : (x, y)} Sugiyama style layout of graph (nx.DiGraph): courses
+    go in rows by depths() with prerequisites above what they unlock, and
+    each row is ordered by barycenters of the rows above and below to cut
+    down on edge crossings. Linear in the edges per iteration.
+    '''
+    depth = depths(graph)
+    layers = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+    for node in graph:
+        layers[depth[node]].append(node)
+    pred = {node: list(graph.pred[node]) for node in graph}
+    succ = {node: list(graph.succ[node]) for node in graph}
+    for _ in range(iterations):
+        # down using prerequisites, then back up using what they unlock
+        barycenter_sweep(layers, pred)
+        layers.reverse()
+        barycenter_sweep(layers, succ)
+        layers.reverse()
+    positions = {}
+    for row, layer in enumerate(layers):
+        offset = (len(layer) - 1) / 2
+        for i, node in enumerate(layer):
+            positions[node] = (round((i - offset) * node_gap),
+                               row * layer_gap)
+    return positions
+
+
+def spring_layout(graph, node_gap=80, seed=0):
+    '''
+    {node : (x, y)} force directed layout of graph scaled to pixels,
+    networkx switches to its sparse solver on graphs of 500+ nodes
+    '''
+    if len(graph) == 0:
+        return {}
+    scale = node_gap * math.sqrt(len(graph))
+    return {node: (round(x), round(y)) for node, (x, y)
+            in nx.spring_layout(graph, seed=seed, scale=scale).items()}
+
+
+# method name : layout function of an nx.DiGraph
+LAYOUTS = {
+    'layered': layered_layout,
+    'spring': spring_layout,
+}
+
+
+class LayoutCache:
+    '''
+    Node positions keyed by graph_fingerprint and layout method, so an
+    unchanged graph is laid out once and drawn the same way every run.
+    Lives in the same SQLite file as the PageStore it is given.
+    '''
+    def __init__(self, store):
+        ''' store PageStore whose connection holds the layouts table '''
+        self.store = store
+        with store.lock, store.connection:
+            store.connection.executescript(LAYOUT_SCHEMA)
+
+    def get(self, fingerprint, method):
+        ''' {node : (x, y)} or None if this graph wasn't laid out '''
+        with self.store.lock:
+            row = self.store.connection.execute(
+                "SELECT body FROM layouts WHERE fingerprint = ? AND "
+                "method = ?", (fingerprint, method)).fetchone()
+        if row is None:
+            return None
+        return {node: tuple(xy) for node, xy
+                in json.loads(zlib.decompress(row[0])).items()}
+
+    def put(self, fingerprint, method, positions):
+        ''' stores positions ({node : (x, y)}) of the fingerprinted graph '''
+        body = zlib.compress(json.dumps(positions).encode())
+        with self.store.lock, self.store.connection:
+            self.store.connection.execute(
+                "INSERT OR REPLACE INTO layouts (fingerprint, method, body) "
+                "VALUES (?, ?, ?)", (fingerprint, method, body))
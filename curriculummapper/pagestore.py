@@ -0,0 +1,150 @@
+#! python3
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+
+PageEntry = namedtuple("PageEntry", ["url", "digest", "etag",
+                                     "last_modified", "fetched_at"])
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    body BLOB NOT NULL
+);
+'''
+
+DEFAULT_PATH = os.path.join("canned_soup", "pages.sqlite3")
+
+
+class PageStore:
+    '''
+    Cache of downloaded pages: a SQLite index keyed by full URL that
+    points at zlib-compressed response bodies stored once per sha256.
+    One store can be shared by any number of Curriculum objects and
+    scripts, pages older than max_age get revalidated with a
+    conditional GET.
+    '''
+    def __init__(self, path=DEFAULT_PATH, max_age=None):
+        '''
+        path (string) of the SQLite file
+        max_age (float) seconds a page stays fresh, None for forever
+        '''
+        self.path = path
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def __contains__(self, url):
+        return self.entry(url) is not None
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+    def entry(self, url):
+        ''' PageEntry of url or None if it was never stored '''
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT url, digest, etag, last_modified, fetched_at "
+                "FROM pages WHERE url = ?", (url,)).fetchone()
+        return None if row is None else PageEntry(*row)
+
+    def is_fresh(self, entry):
+        ''' True if entry (PageEntry) can be used without revalidating '''
+        if entry is None:
+            return False
+        if self.max_age is None:
+            return True
+        return time.time() - entry.fetched_at <= self.max_age
+
+    def get(self, url):
+        ''' the raw bytes stored for url or None '''
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT blobs.body FROM pages JOIN blobs "
+                "ON pages.digest = blobs.digest WHERE pages.url = ?",
+                (url,)).fetchone()
+        return None if row is None else zlib.decompress(row[0])
+
+    def put(self, url, content, etag=None, last_modified=None):
+        ''' stores content (bytes) as the current page of url '''
+        digest = hashlib.sha256(content).hexdigest()
+        with self.lock, self.connection:
+            old = self.connection.execute(
+                "SELECT digest FROM pages WHERE url = ?", (url,)).fetchone()
+            self.connection.execute(
+                "INSERT OR IGNORE INTO blobs (digest, body) VALUES (?, ?)",
+                (digest, zlib.compress(content)))
+            self.connection.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(url, digest, etag, last_modified, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, digest, etag, last_modified, time.time()))
+            if old is not None and old[0] != digest:
+                # drop the old body unless another url still uses it
+                self.connection.execute(
+                    "DELETE FROM blobs WHERE digest = ? AND NOT EXISTS "
+                    "(SELECT 1 FROM pages WHERE digest = ?)",
+                    (old[0], old[0]))
+        return digest
+
+    def revalidated(self, url):
+        ''' the server said url hasn't changed, restart its max_age '''
+        with self.lock, self.connection:
+            self.connection.execute(
+                "UPDATE pages SET fetched_at = ? WHERE url = ?",
+                (time.time(), url))
+
+    def expire(self, url=None):
+        ''' marks url (or every page if None) as needing revalidation '''
+        with self.lock, self.connection:
+            if url is None:
+                self.connection.execute("UPDATE pages SET fetched_at = 0")
+            else:
+                self.connection.execute(
+                    "UPDATE pages SET fetched_at = 0 WHERE url = ?", (url,))
+
+    def conditional_headers(self, url):
+        ''' If-None-Match / If-Modified-Since headers for refetching url '''
+        entry = self.entry(url)
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def save_response(self, url, res):
+        '''
+        stores the requests.Response of a (conditional) GET of url,
+        returns the current bytes of the page
+        '''
+        if res.status_code == 304:
+            self.revalidated(url)
+            return self.get(url)
+        self.put(url, res.content, res.headers.get("ETag"),
+                 res.headers.get("Last-Modified"))
+        return res.content
@@ -0,0 +1,37 @@
+#! python3
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from bs4 import BeautifulSoup
+
+
+def extract_records(extractor, content, curriculum):
+    '''
+    runs extractor over content (page bytes) and returns its CourseRecords
+    as a list, extractors with markup = "bytes" parse the page themselves
+    '''
+    if getattr(extractor, "markup", "soup") == "bytes":
+        return list(extractor(content, curriculum))
+    # using lxml because of bs4 doc
+    return list(extractor(BeautifulSoup(content, "lxml"), curriculum))
+
+
+def extract_page(content, extractor, settings):
+    '''
+    process pool worker: extracts the records of one page with a scratch
+    Curriculum built from settings (Curriculum.parser_settings())
+    '''
+    # imported here, curriculummapper imports this module
+    from .curriculummapper import Curriculum
+    return extract_records(extractor, content, Curriculum(**settings))
+
+
+def extract_pages(contents, extractor, settings, max_workers=None):
+    '''
+    extracts every page in contents (list of bytes) in a process pool,
+    returns one list of CourseRecords per page in the same order
+    '''
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(extract_page, contents, repeat(extractor),
+                             repeat(settings)))
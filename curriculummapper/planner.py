@@ -0,0 +1,134 @@
+#! python3
+
+import heapq
+from collections import namedtuple
+
+# terms [[node]] in order, levels {node : earliest term (longest path)},
+# loads [per term load] under the cap
+Plan = namedtuple("Plan", ["terms", "levels", "loads"])
+
+
+def required(index, targets, done=()):
+    '''
+    set of the nodes of index (ReachabilityIndex) needed for targets
+    (nodes): the targets and everything they require, less done (nodes)
+    and everything done requires, which must have been taken already
+    '''
+    need = set(targets)
+    need.update(index.ancestors_of_all(need))
+    if done:
+        need.difference_update(done)
+        need.difference_update(index.ancestors_of_all(done))
+    return need
+
+
+def groups(index, nodes):
+    '''
+    {component : [node]} of nodes by strongly connected component, in
+    topological order. Courses requiring each other are planned together.
+    '''
+    component = index.component
+    found = {}
+    for node in nodes:
+        found.setdefault(component[node], []).append(node)
+    return {c: found[c] for c in sorted(found)}
+
+
+def component_edges(index, found):
+    ''' {component : set of the prerequisite components among found} '''
+    component = index.component
+    edges = {}
+    for c, members in found.items():
+        parents = set()
+        for node in members:
+            for parent in index.pred[node]:
+                p = component[parent]
+                if p != c and p in found:
+                    parents.add(p)
+        edges[c] = parents
+    return edges
+
+
+def component_levels(found, edges):
+    ''' {component : longest chain of prerequisites}, topologically '''
+    level = {}
+    for c in found:
+        level[c] = max((level[p] + 1 for p in edges[c]), default=0)
+    return level
+
+
+def layers(index, nodes):
+    '''
+    {node : earliest term} of nodes, the longest prerequisite chain
+    leading to it inside nodes, in one topological pass
+    '''
+    found = groups(index, nodes)
+    level = component_levels(found, component_edges(index, found))
+    return {node: level[c] for c, members in found.items()
+            for node in members}
+
+
+def schedule(index, nodes, max_load=None, load=None, max_courses=None):
+    '''
+    Plan of nodes over terms, every course after all its prerequisites
+    among nodes, by list scheduling: each term takes the ready courses
+    with the longest chain still hanging off them first, while its load
+    stays within max_load (load(node) per course, 1 by default) and its
+    size within max_courses. A course over the caps on its own still
+    gets a term to itself.
+    '''
+    if load is None:
+        def load(node):
+            return 1
+    found = groups(index, nodes)
+    edges = component_edges(index, found)
+    children = {c: [] for c in found}
+    for c, parents in edges.items():
+        for p in parents:
+            children[p].append(c)
+    level = component_levels(found, edges)
+    height = {}
+    for c in reversed(list(found)):
+        height[c] = max((height[child] + 1 for child in children[c]),
+                        default=0)
+    weight = {c: sum(load(node) for node in members)
+              for c, members in found.items()}
+    waiting = {c: len(parents) for c, parents in edges.items()}
+    ready = [(-height[c], c) for c in found if waiting[c] == 0]
+    heapq.heapify(ready)
+    terms = []
+    loads = []
+    while ready:
+        term = []
+        term_load = 0
+        size = 0
+        deferred = []
+        while ready:
+            item = heapq.heappop(ready)
+            c = item[1]
+            fits = ((max_load is None or
+                     term_load + weight[c] <= max_load) and
+                    (max_courses is None or
+                     size + len(found[c]) <= max_courses))
+            if fits or not term:
+                term.append(c)
+                term_load += weight[c]
+                size += len(found[c])
+            else:
+                deferred.append(item)
+            if size == max_courses or term_load == max_load:
+                # full, the rest of the heap waits untouched
+                break
+        opened = []
+        for c in term:
+            for child in children[c]:
+                waiting[child] -= 1
+                if waiting[child] == 0:
+                    opened.append((-height[child], child))
+        for item in deferred + opened:
+            heapq.heappush(ready, item)
+        terms.append([node for c in term for node in found[c]])
+        loads.append(term_load)
+    levels = {node: level[c] for c, members in found.items()
+              for node in members}
+    return Plan(terms, levels, loads)
@@ -0,0 +1,400 @@
+#! python3
+
+from array import array
+from bisect import bisect_right
+from functools import cached_property
+
+# networkx is only imported by the functions needing it, the
+# ReachabilityIndex loads without it
+
+
+def popcount(bits):
+    ''' number of set bits in a Python int '''
+    return bin(bits).count("1")
+
+
+if hasattr(int, "bit_count"):
+    # python 3.10+
+    popcount = int.bit_count  # noqa: F811
+
+
+def reachability_counts(graph):
+    '''
+    ({node : number of ancestors}, {node : number of descendants}) of every
+    node of graph (nx.DiGraph), same numbers as len(nx.ancestors(graph, n))
+    and len(nx.descendants(graph, n)).
+    The prerequisite DAG is walked once forwards and once backwards in
+    topological order, carrying each node's ancestors and descendants as
+    bitsets packed in Python ints. Graphs with cycles are walked over
+    their strongly connected components instead.
+    '''
+    import networkx as nx
+    try:
+        order = list(nx.topological_sort(graph))
+    except nx.NetworkXUnfeasible:
+        return component_counts(graph)
+    index = {node: i for i, node in enumerate(order)}
+    pred = graph.pred
+    succ = graph.succ
+    ancestors = [0] * len(order)
+    for i, node in enumerate(order):
+        bits = 0
+        for parent in pred[node]:
+            j = index[parent]
+            bits |= ancestors[j] | (1 << j)
+        ancestors[i] = bits
+    descendants = [0] * len(order)
+    for i in range(len(order) - 1, -1, -1):
+        bits = 0
+        for child in succ[order[i]]:
+            j = index[child]
+            bits |= descendants[j] | (1 << j)
+        descendants[i] = bits
+    return ({node: popcount(ancestors[i]) for i, node in enumerate(order)},
+            {node: popcount(descendants[i]) for i, node in enumerate(order)})
+
+
+def component_counts(graph):
+    '''
+    reachability_counts for graphs with cycles: the same sweeps over the
+    condensation, with every component's bitset holding its members
+    '''
+    import networkx as nx
+    condensed = nx.condensation(graph)
+    order = list(nx.topological_sort(condensed))
+    members = condensed.graph["mapping"]
+    # one bit per node, numbered component by component
+    index = {}
+    sizes = {}
+    for component in order:
+        for node in condensed.nodes[component]["members"]:
+            index[node] = len(index)
+        sizes[component] = len(condensed.nodes[component]["members"])
+    own = {}
+    for component in order:
+        bits = 0
+        for node in condensed.nodes[component]["members"]:
+            bits |= 1 << index[node]
+        own[component] = bits
+    ancestors = {}
+    for component in order:
+        bits = 0
+        for parent in condensed.pred[component]:
+            bits |= ancestors[parent] | own[parent]
+        ancestors[component] = bits
+    descendants = {}
+    for component in reversed(order):
+        bits = 0
+        for child in condensed.succ[component]:
+            bits |= descendants[child] | own[child]
+        descendants[component] = bits
+    # inside a cycle every other member is both ancestor and descendant
+    ancestor_counts = {}
+    descendant_counts = {}
+    for node, component in members.items():
+        cycle = sizes[component] - 1 if sizes[component] > 1 else 0
+        ancestor_counts[node] = popcount(ancestors[component]) + cycle
+        descendant_counts[node] = popcount(descendants[component]) + cycle
+    return ancestor_counts, descendant_counts
+
+
+def ancestor_counts(graph):
+    ''' {node : len(nx.ancestors(graph, node))} in one sweep '''
+    return reachability_counts(graph)[0]
+
+
+def descendant_counts(graph):
+    ''' {node : len(nx.descendants(graph, node))} in one sweep '''
+    return reachability_counts(graph)[1]
+
+
+def topological_components(pred):
+    '''
+    [[node]] strongly connected components of the graph given by pred
+    ({node : set of predecessors}) in topological order, single nodes
+    unless there are cycles
+    '''
+    succ = {node: [] for node in pred}
+    waiting = {}
+    for node, parents in pred.items():
+        waiting[node] = len(parents)
+        for parent in parents:
+            succ[parent].append(node)
+    ready = [node for node, count in waiting.items() if count == 0]
+    order = []
+    while ready:
+        node = ready.pop()
+        order.append(node)
+        for child in succ[node]:
+            waiting[child] -= 1
+            if waiting[child] == 0:
+                ready.append(child)
+    if len(order) == len(pred):
+        return [[node] for node in order]
+    # Tarjan finds the components sinks first
+    return strong_components(pred, succ)[::-1]
+
+
+def strong_components(nodes, succ):
+    '''
+    [[node]] strongly connected components of nodes (iterable) and succ
+    ({node : successors}), every component after the ones it reaches.
+    Tarjan's algorithm with an explicit stack, prerequisite chains are
+    deeper than the recursion limit.
+    '''
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    components = []
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(succ[root]))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(succ[child])))
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    member = None
+                    while member != node:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                    components.append(component)
+    return components
+
+
+def merge_intervals(pairs):
+    '''
+    array of lo, end, lo, end, ... of the union of the half-open
+    intervals [lo, end) in pairs (list of (lo, end), sorted in place)
+    '''
+    pairs.sort()
+    merged = array("i")
+    lo, end = pairs[0]
+    for a, b in pairs:
+        if a <= end:
+            if b > end:
+                end = b
+        else:
+            merged.append(lo)
+            merged.append(end)
+            lo, end = a, b
+    merged.append(lo)
+    merged.append(end)
+    return merged
+
+
+def intervals(label):
+    ''' (lo, end) pairs of a label '''
+    return zip(label[::2], label[1::2])
+
+
+NO_INTERVALS = array("i")
+
+
+class IntervalClosure:
+    '''
+    Everything reachable from each component of a DAG of components,
+    following children, as sorted intervals of positions (the interval
+    labels of Agrawal, Borgida and Jagadish). Every component picks the
+    parent with the longest chain above it as its parent in a spanning
+    tree, and components are numbered in the post-order of that tree
+    with their members next to each other. A component's tree then
+    covers one interval and a label only grows past one interval where
+    the DAG strays from the tree. Labels leave the component's own
+    members out.
+    '''
+    def __init__(self, components, children, parents, order):
+        '''
+        components [[node]] members of every component
+        children, parents [set of component numbers] the edges to
+            follow and the edges back
+        order [component number] every component, parents first
+        nodes [node] at every position
+        position = {node : position}
+        start [int] first position of each component's members
+        labels [array of lo, end, ...] positions reachable from each
+            component, members left out
+        '''
+        level = [0] * len(components)
+        tree = [[] for _ in components]
+        roots = []
+        for c in order:
+            if parents[c]:
+                p = max(parents[c], key=level.__getitem__)
+                level[c] = level[p] + 1
+                tree[p].append(c)
+            else:
+                roots.append(c)
+        nodes = []
+        start = [0] * len(components)
+        for root in roots:
+            work = [(root, iter(tree[root]))]
+            while work:
+                c, rest = work[-1]
+                for child in rest:
+                    work.append((child, iter(tree[child])))
+                    break
+                else:
+                    work.pop()
+                    start[c] = len(nodes)
+                    nodes.extend(components[c])
+        labels = [NO_INTERVALS] * len(components)
+        for c in reversed(order):
+            pairs = []
+            for child in children[c]:
+                pairs.extend(intervals(labels[child]))
+                pairs.append((start[child],
+                              start[child] + len(components[child])))
+            if pairs:
+                labels[c] = merge_intervals(pairs)
+        self.components = components
+        self.nodes = nodes
+        self.position = {node: i for i, node in enumerate(nodes)}
+        self.start = start
+        self.labels = labels
+
+    def __contains__(self, pair):
+        ''' (component, node) in closure if node is reachable from it '''
+        c, node = pair
+        return bisect_right(self.labels[c], self.position[node]) & 1 == 1
+
+    def decode(self, pairs):
+        ''' [node] at the positions of pairs ((lo, end) intervals) '''
+        nodes = self.nodes
+        found = []
+        for lo, end in pairs:
+            found.extend(nodes[lo:end])
+        return found
+
+    def reached(self, nodes, component):
+        '''
+        [node] reachable from any of nodes, with the other members of
+        their components (component = {node : component number})
+        '''
+        pairs = []
+        chosen = {}
+        for node in nodes:
+            chosen.setdefault(component[node], []).append(node)
+        for c, members in chosen.items():
+            pairs.extend(intervals(self.labels[c]))
+            first = self.start[c]
+            end = first + len(self.components[c])
+            if len(members) > 1:
+                pairs.append((first, end))
+            else:
+                # a node is only reached through its cycle mates
+                at = self.position[members[0]]
+                pairs.append((first, at))
+                pairs.append((at + 1, end))
+        pairs = [pair for pair in pairs if pair[0] < pair[1]]
+        if not pairs:
+            return []
+        return self.decode(intervals(merge_intervals(pairs)))
+
+
+class ReachabilityIndex:
+    '''
+    Transitive closure of a prerequisite graph kept as interval labels
+    over its strongly connected components (see IntervalClosure): "is a
+    required for b" is a binary search in one label and "everything
+    required for b" slices out one run of nodes per interval. The
+    ancestor and descendant labels are each built on first use.
+    '''
+    def __init__(self, pred):
+        '''
+        pred = {node : set of its direct prerequisites}, every
+            prerequisite must be a node as well
+        nodes [node] in topological order, component by component
+        component = {node : component number}, components are numbered
+            in topological order
+        components [[node]] members of every component
+        component_pred, component_succ [set of component numbers]
+        '''
+        self.pred = pred
+        self.succ = {node: set() for node in pred}
+        for node, parents in pred.items():
+            for parent in parents:
+                self.succ[parent].add(node)
+        self.nodes = []
+        self.component = {}
+        self.components = topological_components(pred)
+        for number, members in enumerate(self.components):
+            for node in members:
+                self.component[node] = number
+            self.nodes.extend(members)
+        self.component_pred = [set() for _ in self.components]
+        self.component_succ = [set() for _ in self.components]
+        component = self.component
+        for node, parents in pred.items():
+            c = component[node]
+            for parent in parents:
+                p = component[parent]
+                if p != c:
+                    self.component_pred[c].add(p)
+                    self.component_succ[p].add(c)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, node):
+        return node in self.component
+
+    @cached_property
+    def ancestors(self):
+        ''' IntervalClosure of every component's ancestors '''
+        return IntervalClosure(self.components, self.component_pred,
+                               self.component_succ,
+                               range(len(self.components) - 1, -1, -1))
+
+    @cached_property
+    def descendants(self):
+        ''' IntervalClosure of every component's descendants '''
+        return IntervalClosure(self.components, self.component_succ,
+                               self.component_pred,
+                               range(len(self.components)))
+
+    def ancestors_of(self, node):
+        ''' [node] of everything node requires, like nx.ancestors '''
+        return self.ancestors.reached([node], self.component)
+
+    def descendants_of(self, node):
+        ''' [node] of everything requiring node, like nx.descendants '''
+        return self.descendants.reached([node], self.component)
+
+    def ancestors_of_all(self, nodes):
+        ''' [node] of everything any of nodes requires '''
+        return self.ancestors.reached(nodes, self.component)
+
+    def descendants_of_all(self, nodes):
+        ''' [node] of everything requiring any of nodes '''
+        return self.descendants.reached(nodes, self.component)
+
+    def reaches(self, a, b):
+        ''' True if a is required, directly or not, for b '''
+        ca = self.component[a]
+        cb = self.component[b]
+        if ca == cb:
+            return a != b
+        # topological order rules out most pairs without a search
+        if ca > cb:
+            return False
+        return (cb, a) in self.ancestors
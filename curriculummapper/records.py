@@ -0,0 +1,84 @@
+#! python3
+
+import hashlib
+import json
+import zlib
+from collections import namedtuple
+
+from .requirements import from_json
+
+# what an extractor pulls out of one course block, ids are strings
+# like "MATH 226" so records survive a round trip through the cache.
+# requirements is the AND/OR expression of the prerequisites when
+# the text offers a choice, None when all of them are needed
+CourseRecord = namedtuple("CourseRecord", ["subject_code", "course_code",
+                                           "course_title",
+                                           "course_description",
+                                           "prerequisites", "aliases",
+                                           "requirements"],
+                          defaults=(None,))
+
+RECORD_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS records (
+    digest TEXT NOT NULL,
+    extractor TEXT NOT NULL,
+    body BLOB NOT NULL,
+    PRIMARY KEY (digest, extractor)
+);
+'''
+
+
+def extractor_key(extractor, settings=None):
+    '''
+    identifies an extractor in the record cache, bump the extractor's
+    version attribute whenever its output changes.
+    settings (dict) the Curriculum's parser_settings, the records depend
+    on its id patterns, so curricula sharing a PageStore with different
+    patterns get their own records
+    '''
+    name = getattr(extractor, "__qualname__", type(extractor).__qualname__)
+    module = getattr(extractor, "__module__", "")
+    key = "%s.%s:%s" % (module, name, getattr(extractor, "version", 0))
+    if settings:
+        digest = hashlib.sha256(json.dumps(settings, sort_keys=True)
+                                .encode("utf-8")).hexdigest()
+        key += "@" + digest[:16]
+    return key
+
+
+class RecordCache:
+    '''
+    CourseRecords extracted from each page, keyed by the sha256 digest of
+    the page and the extractor that produced them.
+    Lives in the same SQLite file as the PageStore it is given.
+    '''
+    def __init__(self, store):
+        ''' store PageStore whose connection holds the records table '''
+        self.store = store
+        with store.lock, store.connection:
+            store.connection.executescript(RECORD_SCHEMA)
+
+    def get(self, digest, extractor):
+        ''' list of CourseRecord or None if this page wasn't extracted '''
+        with self.store.lock:
+            row = self.store.connection.execute(
+                "SELECT body FROM records WHERE digest = ? AND extractor = ?",
+                (digest, extractor)).fetchone()
+        if row is None:
+            return None
+        records = []
+        for fields in json.loads(zlib.decompress(row[0])):
+            # rows cached before records had requirements have six fields
+            fields += [None] * (len(CourseRecord._fields) - len(fields))
+            records.append(CourseRecord(*fields[:4], tuple(fields[4]),
+                                        tuple(fields[5]),
+                                        from_json(fields[6])))
+        return records
+
+    def put(self, digest, extractor, records):
+        ''' stores the list of CourseRecord extracted from a page '''
+        body = zlib.compress(json.dumps([list(r) for r in records]).encode())
+        with self.store.lock, self.store.connection:
+            self.store.connection.execute(
+                "INSERT OR REPLACE INTO records (digest, extractor, body) "
+                "VALUES (?, ?, ?)", (digest, extractor, body))
@@ -0,0 +1,104 @@
+#! python3
+
+import sys
+from collections.abc import MutableMapping
+
+
+class CourseRegistry:
+    '''
+    Interns course ids ("SUBJ 1234") into small integer handles.
+    Course objects, prerequisite sets and alias sets refer to each other
+    through these handles instead of through strings or objects.
+    '''
+    def __init__(self):
+        '''
+        handles = {course_key : handle}
+        keys = [course_key] indexed by handle
+        parts = [(subject_code, course_code) or None] indexed by handle
+        '''
+        self.handles = {}
+        self.keys = []
+        self.parts = []
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, course_key):
+        return course_key in self.handles
+
+    def intern(self, course_key, subject_code=None, course_code=None):
+        ''' returns the handle of course_key, creating one if needed '''
+        handle = self.handles.get(course_key)
+        if handle is None:
+            course_key = sys.intern(course_key)
+            handle = len(self.keys)
+            self.handles[course_key] = handle
+            self.keys.append(course_key)
+            self.parts.append(None)
+        if subject_code is not None and self.parts[handle] is None:
+            self.parts[handle] = (subject_code, course_code)
+        return handle
+
+    def lookup(self, course_key):
+        ''' returns the handle of course_key or None, never creates one '''
+        return self.handles.get(course_key)
+
+    def key(self, handle):
+        ''' returns the course_key string behind handle '''
+        return self.keys[handle]
+
+    def split(self, handle):
+        '''
+        returns (subject_code, course_code) of handle, guessed from the key
+        when the id has only ever been seen as an alias string
+        '''
+        parts = self.parts[handle]
+        if parts is None:
+            subject_code, _, course_code = self.keys[handle].rpartition(" ")
+            parts = (subject_code, course_code)
+        return parts
+
+
+# every Course and Curriculum in the process shares one registry
+REGISTRY = CourseRegistry()
+
+
+class CourseDict(MutableMapping):
+    '''
+    {course_key : Course} view over a {handle : Course} dictionary,
+    this is what Curriculum.course_dict returns.
+    '''
+    __slots__ = ('courses',)
+
+    def __init__(self, courses):
+        self.courses = courses
+
+    def __getitem__(self, course_key):
+        handle = REGISTRY.lookup(course_key)
+        if handle is None or handle not in self.courses:
+            raise KeyError(course_key)
+        return self.courses[handle]
+
+    def __setitem__(self, course_key, course):
+        self.courses[REGISTRY.intern(course_key)] = course
+
+    def __delitem__(self, course_key):
+        handle = REGISTRY.lookup(course_key)
+        if handle is None:
+            raise KeyError(course_key)
+        del self.courses[handle]
+
+    def __contains__(self, course_key):
+        handle = REGISTRY.lookup(course_key)
+        return handle is not None and handle in self.courses
+
+    def __iter__(self):
+        keys = REGISTRY.keys
+        for handle in self.courses:
+            yield keys[handle]
+
+    def __len__(self):
+        return len(self.courses)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
@@ -0,0 +1,160 @@
+#! python3
+
+import csv
+import json
+import os
+from pprint import pformat
+
+from .registry import REGISTRY
+
+BREAK = "----------\n"
+# bytes buffered before each write reaches the disk
+BUFFER_SIZE = 1 << 16
+
+
+def course_row(course):
+    ''' {field : value} of course for the structured formats '''
+    keys = REGISTRY.keys
+    return {"course_key": keys[course.handle],
+            "subject_code": str(course.subject_code),
+            "course_code": str(course.course_code),
+            "course_title": course.course_title,
+            "course_description": course.course_description,
+            "prerequisites": sorted(keys[h] for h in course.prereq_ids),
+            "aliases": sorted(keys[h] for h in course.alias_ids)}
+
+
+def edges(curriculum):
+    ''' yields (prereq course_key, course_key) for every prerequisite '''
+    keys = REGISTRY.keys
+    for course in curriculum.courses.values():
+        for handle in course.prereq_ids:
+            yield keys[handle], keys[course.handle]
+
+
+def alias_groups(curriculum):
+    ''' yields (canonical course_key, sorted member course_keys) '''
+    keys = REGISTRY.keys
+    for members in curriculum.alias_groups():
+        yield (keys[curriculum.aliases.canonical(members[0])],
+               sorted(keys[h] for h in members))
+
+
+def plain(value):
+    ''' analysis value as plain json-able data '''
+    if hasattr(value, "_asdict"):
+        # an analysis.Estimate
+        return value._asdict()
+    return value
+
+
+def write_text(curriculum, f):
+    ''' the print_all report: sources, every full_desc and the analysis '''
+    f.write("Sources:\n")
+    for url in curriculum.url_list:
+        f.write("\t%s\n\n" % url)
+    f.write(BREAK)
+    f.write("%s\n" % curriculum)
+    f.write(BREAK)
+    f.write("Course Inventory contains %d courses...\n" %
+            curriculum.num_courses())
+    if curriculum.num_courses() > 0:
+        for course in curriculum.courses.values():
+            f.write(BREAK)
+            f.write(course.full_desc(heading=True))
+            f.write("\n")
+        f.write(BREAK)
+    write_analysis_text(curriculum, f)
+
+
+def write_analysis_text(curriculum, f):
+    ''' same lines as print_graph_analysis '''
+    for key, value in curriculum.graph_analysis.items():
+        f.write("\t%s: %s\n" % (key, pformat(value, sort_dicts=False)))
+
+
+def write_jsonl(curriculum, f):
+    '''
+    one json object per line, each with a "type": curriculum, source,
+    course, alias_group, edge and analysis
+    '''
+    dumps = json.dumps
+    f.write(dumps({"type": "curriculum", "name": str(curriculum),
+                   "university": curriculum.university,
+                   "degree_name": curriculum.degree_name,
+                   "number_of_courses": curriculum.num_courses()}) + "\n")
+    for url in curriculum.url_list:
+        f.write(dumps({"type": "source", "url": url}) + "\n")
+    for course in curriculum.courses.values():
+        row = {"type": "course"}
+        row.update(course_row(course))
+        f.write(dumps(row) + "\n")
+    for canonical, members in alias_groups(curriculum):
+        f.write(dumps({"type": "alias_group", "canonical": canonical,
+                       "members": members}) + "\n")
+    for prereq, course in edges(curriculum):
+        f.write(dumps({"type": "edge", "prerequisite": prereq,
+                       "course": course}) + "\n")
+    for key, value in curriculum.graph_analysis.items():
+        f.write(dumps({"type": "analysis", "metric": key,
+                       "value": plain(value)}) + "\n")
+
+
+def write_csv(curriculum, base):
+    '''
+    base_courses.csv, base_aliases.csv, base_edges.csv and
+    base_analysis.csv, lists are joined with "; " and analysis values
+    are json, returns the paths written
+    '''
+    paths = []
+
+    def table(name, header, rows):
+        path = "%s_%s.csv" % (base, name)
+        with open(path, "w", newline="", encoding="utf-8",
+                  buffering=BUFFER_SIZE) as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        paths.append(path)
+
+    fields = ["course_key", "subject_code", "course_code", "course_title",
+              "course_description", "prerequisites", "aliases"]
+    table("courses", fields,
+          ([row[field] if isinstance(row[field], str)
+            else "; ".join(row[field]) for field in fields]
+           for row in map(course_row, curriculum.courses.values())))
+    table("aliases", ["canonical", "course_key"],
+          ((canonical, member)
+           for canonical, members in alias_groups(curriculum)
+           for member in members))
+    table("edges", ["prerequisite", "course"], edges(curriculum))
+    table("analysis", ["metric", "value"],
+          ((key, json.dumps(plain(value)))
+           for key, value in curriculum.graph_analysis.items()))
+    return paths
+
+
+def export(curriculum, base, formats=("text",)):
+    '''
+    streams the report of curriculum to files named after base (path
+    without extension) in every format of formats: "text" (base.txt),
+    "jsonl" (base.jsonl) and "csv" (see write_csv).
+    Returns the paths written.
+    '''
+    directory = os.path.dirname(base)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    paths = []
+    for fmt in formats:
+        if fmt == "csv":
+            paths += write_csv(curriculum, base)
+            continue
+        writer = {"text": write_text, "jsonl": write_jsonl}.get(fmt)
+        if writer is None:
+            raise ValueError("unknown report format %r" % fmt)
+        path = base + (".txt" if fmt == "text" else "." + fmt)
+        with open(path, "w", encoding="utf-8",
+                  buffering=BUFFER_SIZE) as f:
+            writer(curriculum, f)
+        paths.append(path)
+    return paths
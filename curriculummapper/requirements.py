@@ -0,0 +1,274 @@
+#! python3
+
+import re
+
+# a requirement expression is None (nothing needed), a leaf (course id
+# string or registry handle) or a tuple (AND or OR, child, child, ...)
+AND = "and"
+OR = "or"
+
+# connectives and brackets between the course ids of prereq text
+OPERATORS = (r"(?i:\b(?:(?:one|any)\s+of(?:\s+the\s+following)?|either)\b"
+             r"|\band\b|\bor\b|[(),;&/]|\.(?=\s|$))")
+OPERATOR_TOKENS = {"and": AND, "&": AND, "or": OR, "/": "/",
+                   ".": ";", ";": ";", ",": ",", "(": "(", ")": ")"}
+
+
+def join(op, parts):
+    '''
+    expression op (AND or OR) of parts, None parts dropped, nested
+    expressions of the same op flattened and repeats removed
+    '''
+    children = []
+    for part in parts:
+        if part is None:
+            continue
+        if isinstance(part, tuple) and part[0] == op:
+            children.extend(part[1:])
+        else:
+            children.append(part)
+    children = list(dict.fromkeys(children))
+    if not children:
+        return None
+    if len(children) == 1:
+        return children[0]
+    return (op,) + tuple(children)
+
+
+def combine(*exprs):
+    ''' expression needing every one of exprs '''
+    return join(AND, exprs)
+
+
+def leaves(expr):
+    ''' set of the course leaves of expr '''
+    if expr is None:
+        return set()
+    if not isinstance(expr, tuple):
+        return {expr}
+    found = set()
+    for child in expr[1:]:
+        found |= leaves(child)
+    return found
+
+
+def map_leaves(expr, func):
+    '''
+    expr with every leaf replaced by func(leaf), leaves mapped to None
+    are dropped and the expression simplified
+    '''
+    if expr is None:
+        return None
+    if not isinstance(expr, tuple):
+        return func(expr)
+    return join(expr[0], [map_leaves(child, func) for child in expr[1:]])
+
+
+def has_choice(expr):
+    ''' True if expr holds an OR, otherwise it's just a set of courses '''
+    return (isinstance(expr, tuple) and
+            (expr[0] == OR or any(has_choice(child) for child in expr[1:])))
+
+
+def from_json(value):
+    ''' expression back from its json form, where tuples became lists '''
+    if isinstance(value, list):
+        return (value[0],) + tuple(from_json(child) for child in value[1:])
+    return value
+
+
+def tokenize(text, course_search, normalize=str.strip):
+    '''
+    [(kind, value)] of text: ("id", course id) for every course_search
+    match (group 1 if it has one, passed through normalize) and the
+    connectives AND, OR, ",", ";", "(", ")" and "one of"
+    '''
+    search = re.compile(r"(?P<id>%s)|(?P<op>%s)" % (course_search.pattern,
+                                                    OPERATORS))
+    has_group = course_search.groups > 0
+    tokens = []
+    # patterns like SFSU's want whitespace after the id
+    for match in search.finditer(text + " "):
+        if match.group("op") is None:
+            found = course_search.match(match.group("id"))
+            course_id = found.group(1) if has_group else found.group(0)
+            tokens.append(("id", normalize(course_id)))
+            continue
+        op = match.group("op").lower()
+        tokens.append((OPERATOR_TOKENS.get(op, "one of"), op))
+    return tokens
+
+
+class RequirementParser:
+    '''
+    Reads "MATH 226 or MATH 227, and CSC 210" style prereq text into an
+    expression of course ids. AND binds tighter than OR, commas and
+    semicolons bind loosest: a comma list takes the connective written
+    after one of its commas ("A, B, or C"), periods and semicolons
+    separate requirements that are all needed. "A/B" is a choice
+    binding tighter than anything else. Words that aren't ids
+    or connectives are skipped, so "C or better" adds nothing, and so
+    are bracketed remarks without ids like "(or equivalent)".
+    '''
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self, ahead=0):
+        position = self.position + ahead
+        if position < len(self.tokens):
+            return self.tokens[position][0]
+        return None
+
+    def take(self):
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def parse(self):
+        ''' the expression of every token, stray ")" are skipped '''
+        parts = [self.clauses()]
+        while self.peek() is not None:
+            self.take()
+            parts.append(self.clauses())
+        return combine(*parts)
+
+    def clauses(self):
+        parts = [self.comma_list()]
+        while self.peek() == ";":
+            self.take()
+            parts.append(self.comma_list())
+        return combine(*parts)
+
+    def comma_list(self):
+        parts = [self.disjunction()]
+        connective = None
+        while self.peek() == ",":
+            self.take()
+            if self.peek() in (AND, OR):
+                connective = connective or self.take()[0]
+            parts.append(self.disjunction())
+        if connective is None:
+            connective = AND
+            # "A, B or C" lists choices the same as "A, B, or C"
+            last = parts[-1]
+            if (len(parts) > 1 and isinstance(last, tuple) and
+                    last[0] == OR and
+                    not any(isinstance(part, tuple) for part in parts[:-1])
+                    and not any(isinstance(child, tuple)
+                                for child in last[1:])):
+                connective = OR
+        return join(connective, parts)
+
+    def disjunction(self):
+        parts = [self.conjunction()]
+        while self.peek() == OR:
+            self.take()
+            parts.append(self.conjunction())
+        return join(OR, parts)
+
+    def conjunction(self):
+        parts = [self.unit()]
+        while self.peek() == AND:
+            self.take()
+            parts.append(self.unit())
+        return join(AND, parts)
+
+    def remark_end(self):
+        '''
+        position just past the bracketed group starting here if it holds
+        no ids, like "(C or better)", otherwise None
+        '''
+        depth = 0
+        for position in range(self.position, len(self.tokens)):
+            kind = self.tokens[position][0]
+            if kind == "id":
+                return None
+            if kind == "(":
+                depth += 1
+            elif kind == ")":
+                depth -= 1
+                if depth == 0:
+                    return position + 1
+        return None
+
+    def skip_remarks(self):
+        ''' steps over bracketed groups without ids '''
+        while self.peek() == "(":
+            end = self.remark_end()
+            if end is None:
+                return
+            self.position = end
+
+    def unit(self):
+        self.skip_remarks()
+        kind = self.peek()
+        if kind == "id":
+            parts = [self.take()[1]]
+            while self.peek() == "/" and self.peek(1) == "id":
+                self.take()
+                parts.append(self.take()[1])
+            expr = join(OR, parts)
+            self.skip_remarks()
+            # "A (or B)" offers B instead of A
+            if self.peek() == "(" and self.peek(1) == OR:
+                self.take()
+                self.take()
+                expr = join(OR, [expr, self.clauses()])
+                if self.peek() == ")":
+                    self.take()
+                self.skip_remarks()
+            return expr
+        if kind == "(":
+            self.take()
+            expr = self.clauses()
+            if self.peek() == ")":
+                self.take()
+            return expr
+        if kind == "one of":
+            self.take()
+            return self.one_of()
+        # an operator with nothing before it, left for the caller
+        return None
+
+    def one_of(self):
+        ''' "one of A, B, or C": every unit up to an "and" is a choice '''
+        parts = [self.unit()]
+        while True:
+            kind = self.peek()
+            if kind == "," and self.peek(1) != AND:
+                self.take()
+                if self.peek() == OR:
+                    self.take()
+            elif kind == OR:
+                self.take()
+            else:
+                break
+            parts.append(self.unit())
+        return join(OR, parts)
+
+
+def parse_requirements(text, course_search, normalize=str.strip):
+    ''' expression of the course ids in prereq text, see RequirementParser '''
+    return RequirementParser(tokenize(text, course_search,
+                                      normalize)).parse()
+
+
+def source(expr, leaf, and_op=" and ", or_op=" or ", empty="True"):
+    ''' python source of expr, leaf(leaf) gives the source of each leaf '''
+    if expr is None:
+        return empty
+    if not isinstance(expr, tuple):
+        return leaf(expr)
+    op = and_op if expr[0] == AND else or_op
+    return "(%s)" % op.join(source(child, leaf, and_op, or_op, empty)
+                            for child in expr[1:])
+
+
+def compile_requirement(expr):
+    '''
+    function of a set of completed leaves, True if they meet expr,
+    compiled to a single python expression of "in" tests
+    '''
+    code = "lambda done: %s" % source(expr, lambda leaf: "%r in done" % leaf)
+    return eval(compile(code, "<requirement>", "eval"), {})
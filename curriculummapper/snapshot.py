@@ -0,0 +1,221 @@
+#! python3
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+from .curriculummapper import Course
+
+MAGIC = b"CMSNAP01"
+# meta, string count, blob bytes, courses, prereq rows, alias rows,
+# alias group rows
+HEADER = struct.Struct("<8s7Q")
+# string ids of key, subject_code, course_code, title, description
+COURSE_FIELDS = 5
+TITLE_FIELD = 3
+DESCRIPTION_FIELD = 4
+# Course's own slots, holding the details once something sets them
+TITLE_SLOT = Course.course_title
+DESCRIPTION_SLOT = Course.course_description
+
+
+def padding(size):
+    ''' bytes of zeros bringing size up to a multiple of 8 '''
+    return b"\0" * (-size % 8)
+
+
+def little_endian(values):
+    ''' values (array) as little endian bytes '''
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class StringTable:
+    ''' interns strings into ids while a snapshot is written '''
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def __call__(self, string):
+        string_id = self.ids.get(string)
+        if string_id is None:
+            string_id = self.ids[string] = len(self.strings)
+            self.strings.append(string)
+        return string_id
+
+    def encode(self):
+        ''' (offsets array, utf-8 blob) '''
+        offsets = array("q", [0])
+        parts = []
+        size = 0
+        for string in self.strings:
+            data = string.encode("utf-8")
+            parts.append(data)
+            size += len(data)
+            offsets.append(size)
+        return offsets, b"".join(parts)
+
+
+def write_snapshot(path, meta, courses, prereqs, aliases, groups):
+    '''
+    writes a snapshot file
+    meta (dict) json-able Curriculum settings
+    courses [(key, subject_code, course_code, title, description)]
+    prereqs, aliases [(course index, course_key)]
+    groups [(member course_key, canonical course_key)]
+    '''
+    table = StringTable()
+    course_ids = array("i")
+    for course in courses:
+        course_ids.extend(table(field) for field in course)
+    pair_arrays = []
+    for rows, first_is_index in ((prereqs, True), (aliases, True),
+                                 (groups, False)):
+        pairs = array("i")
+        for first, key in rows:
+            pairs.append(first if first_is_index else table(first))
+            pairs.append(table(key))
+        pair_arrays.append(pairs)
+    offsets, blob = table.encode()
+    meta_bytes = json.dumps(meta).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(meta_bytes), len(table.strings),
+                            len(blob), len(courses),
+                            *(len(pairs) // 2 for pairs in pair_arrays)))
+        for section in ([meta_bytes, little_endian(offsets), blob,
+                         little_endian(course_ids)] +
+                        [little_endian(pairs) for pairs in pair_arrays]):
+            f.write(section)
+            f.write(padding(len(section)))
+
+
+class Snapshot:
+    '''
+    Read-only view of a snapshot file written by Curriculum.save.
+    With mmap the file is memory-mapped and every array is a memoryview
+    into it, so processes loading the same snapshot share its pages
+    instead of each reading their own copy.
+    '''
+    def __init__(self, path, use_mmap=True):
+        '''
+        meta (dict) Curriculum settings
+        offsets, courses, prereqs, aliases, groups memoryviews of ints,
+            courses has COURSE_FIELDS string ids per course and the others
+            two ints per row
+        '''
+        with open(path, "rb") as f:
+            if use_mmap:
+                self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.buffer = f.read()
+        view = memoryview(self.buffer)
+        (magic, meta_size, string_count, blob_size, course_count,
+         prereq_count, alias_count, group_count) = \
+            HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError("%s is not a curriculum snapshot" % path)
+        self.position = HEADER.size
+        self.view = view
+        self.meta = json.loads(bytes(self.section(meta_size)))
+        self.offsets = self.ints("q", string_count + 1)
+        self.blob = self.section(blob_size)
+        self.courses = self.ints("i", course_count * COURSE_FIELDS)
+        self.prereqs = self.ints("i", prereq_count * 2)
+        self.aliases = self.ints("i", alias_count * 2)
+        self.groups = self.ints("i", group_count * 2)
+
+    def section(self, size):
+        ''' memoryview of the next size bytes, skipping the padding '''
+        start = self.position
+        self.position += size + (-size % 8)
+        return self.view[start:start + size]
+
+    def ints(self, typecode, count):
+        ''' the next count ints as a memoryview (or array if big endian) '''
+        data = self.section(count * array(typecode).itemsize)
+        if sys.byteorder != "little":
+            values = array(typecode, bytes(data))
+            values.byteswap()
+            return values
+        return data.cast(typecode)
+
+    def __len__(self):
+        return len(self.courses) // COURSE_FIELDS
+
+    def string(self, string_id):
+        offsets = self.offsets
+        return str(self.blob[offsets[string_id]:offsets[string_id + 1]],
+                   "utf-8")
+
+    def strings(self):
+        ''' every string of the table, decoded '''
+        blob = bytes(self.blob)
+        offsets = self.offsets.tolist()
+        return [blob[offsets[i]:offsets[i + 1]].decode("utf-8")
+                for i in range(len(offsets) - 1)]
+
+    def close(self):
+        ''' releases the views and the mapping '''
+        for name in ("offsets", "blob", "courses", "prereqs", "aliases",
+                     "groups", "view"):
+            value = getattr(self, name)
+            if isinstance(value, memoryview):
+                value.release()
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SnapshotCourse(Course):
+    '''
+    Course loaded by Curriculum.load. Its title and description stay in
+    the Snapshot and are decoded from it whenever they are read, until
+    something sets them, so processes loading the same memory-mapped
+    snapshot share those strings instead of each holding a copy.
+    '''
+    __slots__ = ('snapshot', 'row')
+
+    def __init__(self, snapshot, row, subject_code, course_code):
+        '''
+        snapshot (Snapshot) kept open for as long as the course lives
+        row (int) index of the course in snapshot.courses
+        '''
+        Course.__init__(self, subject_code, course_code)
+        TITLE_SLOT.__delete__(self)
+        DESCRIPTION_SLOT.__delete__(self)
+        self.snapshot = snapshot
+        self.row = row
+
+    def field(self, slot, index):
+        ''' the value set in slot, or else string index of the row '''
+        try:
+            return slot.__get__(self, Course)
+        except AttributeError:
+            snapshot = self.snapshot
+            return snapshot.string(
+                snapshot.courses[self.row * COURSE_FIELDS + index])
+
+    @property
+    def course_title(self):
+        return self.field(TITLE_SLOT, TITLE_FIELD)
+
+    @course_title.setter
+    def course_title(self, value):
+        TITLE_SLOT.__set__(self, value)
+
+    @property
+    def course_description(self):
+        return self.field(DESCRIPTION_SLOT, DESCRIPTION_FIELD)
+
+    @course_description.setter
+    def course_description(self, value):
+        DESCRIPTION_SLOT.__set__(self, value)
@@ -0,0 +1,194 @@
+#! python3
+
+import weakref
+from collections.abc import Mapping
+
+from .curriculummapper import Course, Curriculum
+from .registry import REGISTRY
+
+
+class SubsetDict(Mapping):
+    '''
+    read-only {handle : Course} view of the handles in selection (set)
+    over a bigger {handle : Course} dictionary, nothing is copied
+    '''
+    __slots__ = ('courses', 'selection')
+
+    def __init__(self, courses, selection):
+        self.courses = courses
+        self.selection = selection
+
+    def __getitem__(self, handle):
+        if handle not in self.selection:
+            raise KeyError(handle)
+        return self.courses[handle]
+
+    def __contains__(self, handle):
+        return handle in self.selection
+
+    def __iter__(self):
+        return iter(self.selection)
+
+    def __len__(self):
+        return len(self.selection)
+
+
+class CourseStore(Curriculum):
+    '''
+    University-level curriculum that holds every course, alias group and
+    cached page once. Degree programs are ProgramViews made with
+    program(), which select courses from the store without copying them.
+    '''
+    def __init__(self, university="", preferred_subject_code="",
+                 degree_name="Course Store", **kwargs):
+        '''
+        same arguments as Curriculum, the degree_name comes last
+        views WeakSet of ProgramView told about every change
+        '''
+        self.views = weakref.WeakSet()
+        Curriculum.__init__(self, university, degree_name,
+                            preferred_subject_code, **kwargs)
+
+    def touch(self, handle):
+        Curriculum.touch(self, handle)
+        for view in self.views:
+            view.touch(handle)
+
+    def program(self, degree_name="", subjects=None, course_list=None,
+                closure=True, preferred_subject_code=None,
+                colored_subjects=None, palette=None):
+        ''' returns a ProgramView of this store, see ProgramView '''
+        return ProgramView(self, degree_name, subjects, course_list,
+                           closure, preferred_subject_code, colored_subjects,
+                           palette)
+
+
+class ProgramView(Curriculum):
+    '''
+    One degree program over a CourseStore. Selects the courses of the
+    given subjects and/or course ids (plus, with closure, everything they
+    require) and exposes the Curriculum API over that selection. Course
+    data and alias groups stay in the store, only the graph is its own.
+    '''
+    def __init__(self, store, degree_name="", subjects=None,
+                 course_list=None, closure=True, preferred_subject_code=None,
+                 colored_subjects=None, palette=None):
+        '''
+        store CourseStore the courses live in
+        subjects [list of str] subject codes the program takes whole
+        course_list [list of str or Course] courses the program requires
+        closure (bool) also select every prerequisite, transitively
+        selection = set(handle) of the selected courses
+        '''
+        if preferred_subject_code is None:
+            preferred_subject_code = store.preferred_subject_code
+        Curriculum.__init__(self, store.university, degree_name,
+                            preferred_subject_code,
+                            course_search=store.course_search.pattern,
+                            subject_search=store.subject_search.pattern,
+                            code_search=store.code_search.pattern,
+                            colored_subjects=colored_subjects,
+                            palette=palette,
+                            page_store=store.page_store,
+                            analysis_budget=store.analysis_budget,
+                            instrument=store.instrument)
+        self.store = store
+        self.aliases = store.aliases
+        self.subjects = set(subjects or [])
+        self.course_ids = set()
+        for course in course_list or []:
+            if isinstance(course, Course):
+                self.course_ids.add(course.handle)
+            else:
+                self.course_ids.add(REGISTRY.intern(course))
+        self.closure = closure
+        self.selection = set()
+        self.courses = SubsetDict(store.courses, self.selection)
+        self.store_version = -1
+        store.views.add(self)
+        self.refresh()
+
+    def refresh(self):
+        ''' recomputes the selection if the store changed since last time '''
+        store = self.store
+        if self.store_version == store.version:
+            return
+        self.store_version = store.version
+        canonical = store.aliases.canonical
+        selected = set()
+        if self.subjects:
+            selected.update(handle for handle, course in store.courses.items()
+                            if course.subject_code in self.subjects)
+        selected.update(handle for handle in self.course_ids
+                        if handle in store.courses)
+        if self.closure:
+            frontier = list(selected)
+            while frontier:
+                handle = frontier.pop()
+                for member in store.aliases.members(handle):
+                    course = store.courses.get(member)
+                    if course is None:
+                        continue
+                    for prereq_id in course.prereq_ids:
+                        if prereq_id not in selected:
+                            selected.add(prereq_id)
+                            frontier.append(prereq_id)
+        # canonical courses are drawn, so they always come along
+        selected.update([canonical(handle) for handle in selected])
+        for handle in selected.symmetric_difference(self.selection):
+            self.touch(handle)
+        self.selection.clear()
+        self.selection.update(selected)
+        self.course_codes_set = set(store.courses[handle]
+                                    .get_course_code_int()
+                                    for handle in selected)
+
+    def generate_nx(self, emphasize_in_degree=False):
+        self.refresh()
+        Curriculum.generate_nx(self, emphasize_in_degree)
+
+    def num_courses(self):
+        self.refresh()
+        return Curriculum.num_courses(self)
+
+    def get_reachability(self):
+        self.refresh()
+        return Curriculum.get_reachability(self)
+
+    def node_handle(self, course):
+        self.refresh()
+        return Curriculum.node_handle(self, course)
+
+    def get_course(self, course_id=""):
+        '''
+        canonical course of course_id in the program, KeyError if it
+        isn't one of the program's courses
+        '''
+        self.refresh()
+        handle = self.store.lookup_handle(course_id)
+        if handle is not None:
+            handle = self.aliases.canonical(handle)
+        if handle not in self.selection:
+            raise KeyError(course_id)
+        return self.store.courses[handle]
+
+    def alias_groups(self):
+        ''' the store's alias groups cut down to the program's courses '''
+        self.refresh()
+        selection = self.selection
+        for members in self.aliases.groups():
+            kept = [handle for handle in members if handle in selection]
+            if len(kept) > 1:
+                yield kept
+
+    def add_course_object(self, x):
+        ''' adds x to the store and to the program's course list '''
+        self.store.add_course_object(x)
+        self.course_ids.add(x.handle)
+        self.store_version = -1
+
+    # the store's add_course_object does the timing and counting
+    instrumented_add_course_object = add_course_object
+
+    def join_aliases(self, handles):
+        self.store.join_aliases(handles)
@@ -0,0 +1,78 @@
+#! python3
+
+import matplotlib
+import numpy as np
+
+
+# colormap of each colored subject by position, the first three are the
+# original Blues, Greens and Purples
+DEFAULT_PALETTE = ("Blues", "Greens", "Purples", "Oranges", "Reds",
+                   "YlOrBr")
+# colormap of every other subject
+OTHER_COLORMAP = "Greys"
+
+
+def get_colormap(colormap):
+    ''' matplotlib Colormap of colormap (name or Colormap) '''
+    if isinstance(colormap, str):
+        return matplotlib.colormaps[colormap]
+    return colormap
+
+
+def hex_table(colormap):
+    '''
+    numpy array of the "#rrggbb" colors of every entry of colormap,
+    same strings as matplotlib.colors.rgb2hex(colormap(i))
+    '''
+    rgba = colormap(np.arange(colormap.N))
+    channels = np.round(rgba[:, :3] * 255).astype(int)
+    return np.array(["#%02x%02x%02x" % tuple(rgb)
+                     for rgb in channels.tolist()])
+
+
+def node_colors(code_ints, groups, colormaps, color_max):
+    '''
+    array of hex colors, one per node.
+    code_ints (array of int) course number of each node
+    groups (array of int) index into colormaps of each node
+    colormaps [list of Colormap]
+    color_max (int) course number at the top of every colormap,
+        higher numbers get its last color like matplotlib.colors.Normalize
+    '''
+    colors = np.empty(len(code_ints), dtype=object)
+    if not len(code_ints):
+        return colors
+    if color_max > 0:
+        values = np.asarray(code_ints, dtype=float) / color_max
+    else:
+        values = np.zeros(len(code_ints))
+    for group in np.unique(groups):
+        colormap = colormaps[group]
+        mask = groups == group
+        # the lookup table index matplotlib would use for each value
+        index = np.clip((values[mask] * colormap.N).astype(int),
+                        0, colormap.N - 1)
+        colors[mask] = hex_table(colormap)[index]
+    return colors
+
+
+def style_nodes(graph, nodes, code_ints, colormaps, color_max,
+                emphasize_in_degree=False):
+    '''
+    sets the size and color of nodes (list) of graph (nx.DiGraph) in one
+    batch, the size from the in or out degree and the color from the
+    node's course number in the colormap of its group attribute
+    code_ints [list of int] course number of each node
+    '''
+    count = len(nodes)
+    degree = graph.in_degree if emphasize_in_degree else graph.out_degree
+    sizes = 2 * (np.fromiter((degree(node) for node in nodes),
+                             dtype=int, count=count) + 5)
+    groups = np.fromiter((graph.nodes[node]['group'] for node in nodes),
+                         dtype=int, count=count)
+    colors = node_colors(np.asarray(code_ints), groups, colormaps, color_max)
+    attributes = graph.nodes
+    for node, size, color in zip(nodes, sizes.tolist(), colors.tolist()):
+        data = attributes[node]
+        data['size'] = size
+        data['color'] = color
@@ -3,12 +3,13 @@
 
 import json
 import validators
-import requests
 import pprint
 import os
 from urllib.parse import urljoin
 from bs4 import BeautifulSoup
 from pathlib import Path
+from curriculummapper.fetch import fetch, make_session
+from curriculummapper.pagestore import PageStore
 
 
 def bulletincrawler(school_short_name="SCHOOL",
@@ -35,34 +36,24 @@ def bulletincrawler(school_short_name="SCHOOL",
             except Exception as e:
                 print(e)
 
-    filename = school_short_name + "_bulletin" + ".html"
-    # print("Trying %s/%s" % (data_dir, filename))
+    # same page store as Curriculum, so the subject pages found here
+    # are downloaded once for every degree program
+    store = PageStore(os.path.join(data_dir_path.parent, "pages.sqlite3"))
     try:
         os.makedirs(data_dir_path)
     except Exception:
         # only here if already have the directory
         # do nothing safely
         pass
-    try:
-        # try to open html, where we cache the soup
-        print("Reading from '%s'..." %
-              os.path.join(data_dir_path, filename))
-        with open(os.path.join(data_dir_path, filename), "r") as file:
-            soup = BeautifulSoup(file, "lxml")
-    except Exception:
-        try:
-            print("\t\tPinging Server")
-            res = requests.get(bulletin_URL)
-            # using lxml because of bs4 doc
-            soup = BeautifulSoup(res.content, "lxml")
-            print("Writing to '%s'..." %
-                  os.path.join(data_dir_path, filename))
-            with open(os.path.join(data_dir_path, filename), 'w+') as file:
-                file.write(str(soup))
-        except Exception:
-            print("Why are you even here?")
-            print(str(Exception))
-            soup = BeautifulSoup(requests.get(bulletin_URL), "lxml")
+    content = store.get(bulletin_URL)
+    if content is None:
+        print("\t\tPinging Server")
+        res = fetch(make_session(), bulletin_URL)
+        content = store.save_response(bulletin_URL, res)
+    else:
+        print("Reading '%s' from the page store..." % bulletin_URL)
+    # using lxml because of bs4 doc
+    soup = BeautifulSoup(content, "lxml")
 
     url_list = []
     for tag in soup.find(container_tag_type,
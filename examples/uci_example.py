@@ -2,9 +2,15 @@
 
 
 from time import perf_counter
-import re
-import unicodedata
-from curriculummapper import Course, Curriculum
+from curriculummapper import Curriculum, CourseLeafExtractor
+
+
+# the description is the first paragraph of div.courseblockdesc plus the
+# Overlaps/Restriction paragraphs, a later paragraph starts with
+# "Prerequisite:" and runs until the next label
+uci_extractor = CourseLeafExtractor(
+    desc_extra=r"Overlaps|Restrict",
+    prereq_search=r"Prerequisites?: (.*?)(?:\s[A-Z][a-z]+(?: with)?:|$)")
 
 
 def main():
@@ -23,49 +29,12 @@ def main():
                 "https://catalogue.uci.edu/allcourses/econ/",
                 "https://catalogue.uci.edu/allcourses/stats/",
                 "https://catalogue.uci.edu/allcourses/math/"]
+    # download every page that isn't cached yet before scraping
+    curriculum.prefetch(url_list)
     for URL in url_list:
         print("Politely Checking: %s..." % URL)
-        soup = curriculum.get_soup(URL)
-        # inpecting the source reveals that each course is neatly in div blocks
-        # courseblock class. Iterating through each courseblock
-        print("Scraping courseblocks...")
-        # This was the same label for case western...
-        for course_tag in soup.find_all("div", {"class": "courseblock"}):
-            # Grabbing the bolded titled bit
-            blocktitle_tag = course_tag.find("p", {"class": "courseblocktitle"}).find("strong")  # noqa: E501
-            # convert the content to UNICODE
-            blocktitle_string = unicodedata.normalize(
-                'NFKD', str(blocktitle_tag.string))
-            split_blocktitle_list = blocktitle_string.split(" ", 3)
-            subject_code = split_blocktitle_list[0]
-            course_code = split_blocktitle_list[1].split(".")[0]
-            course_title = split_blocktitle_list[-1].split(".")[0]
-            # print("Course_ID: %s %s \nCourse Title: %s" %
-            #      (subject_code, course_code, course_title.split("(")[0]))
-
-            # grab the coruse describ tag
-            courseblockdesc_tag = \
-                course_tag.find("div", {"class": "courseblockdesc"})
-            # grab all the paragraph tags inside each course block description
-            paragraph_tags = courseblockdesc_tag.find_all("p")
-            # first paragraph is the course description
-            course_description = paragraph_tags[0].text
-            # print(course_description)
-            prereqs = []
-            aliases = []
-            for tag in paragraph_tags:
-                # print(tag.text)
-                if re.search("Prereq", tag.text):
-                    prereqs += curriculum.course_list_from_string(tag.text)
-                additional_text = (re.search("Overlaps", tag.text) or
-                                   re.search("Restrict", tag.text))
-                if additional_text:
-                    course_description += "\n" + tag.text
-
-            # print(aliases)
-            curriculum.add_course(Course(subject_code, course_code,
-                                         course_title, course_description,
-                                         prereqs, aliases))
+        # pages that haven't changed since the last run skip parsing
+        curriculum.ingest(URL, uci_extractor)
 
     curriculum.print_all()
     true_finish_time = perf_counter()
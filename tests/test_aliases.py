@@ -0,0 +1,64 @@
+"""
+Unit tests for the alias forest
+"""
+
+
+from curriculummapper import Course, Curriculum  # noqa: E402
+from curriculummapper.aliases import AliasForest  # noqa: E402
+
+
+# handles that were never joined are their own canonical
+def test_singleton():
+    forest = AliasForest()
+    assert (forest.canonical(7) == 7 and forest.members(7) == [7] and
+            len(forest) == 0)
+
+
+# without a preference the first handle stays canonical
+def test_union_keeps_first():
+    forest = AliasForest()
+    kept, lost, moved = forest.union(1, 2)
+    assert (kept == 1 and lost == 2 and moved == [2] and
+            forest.canonical(2) == 1 and sorted(forest.members(1)) == [1, 2])
+
+
+# joining twice does nothing
+def test_union_repeat():
+    forest = AliasForest()
+    forest.union(1, 2)
+    assert forest.union(2, 1) is None
+
+
+# the preferred handle wins canonical across chained unions
+def test_union_prefer():
+    forest = AliasForest(prefer=lambda h: h == 3)
+    forest.union(1, 2)
+    kept, lost, moved = forest.union(2, 3)
+    assert (kept == 3 and lost == 1 and sorted(moved) == [1, 2] and
+            forest.canonical(1) == 3)
+
+
+# restored groups keep their canonical and can still be joined
+def test_from_groups():
+    forest = AliasForest.from_groups([(2, [1, 2]), (5, [4, 5])])
+    assert (forest.canonical(1) == 2 and len(forest) == 4 and
+            sorted(forest.groups()) == [[1, 2], [4, 5]])
+    kept, lost, moved = forest.union(1, 4)
+    assert (kept == 2 and lost == 5 and sorted(moved) == [4, 5] and
+            forest.canonical(5) == 2)
+
+
+# details are merged into the canonical course once per union
+def test_alias_merge():
+    x = Course("ALIA", "100", "Short", "A longer description",
+               [Course("PREQ", "100")])
+    y = Course("OTHR", "100", "Longer title",
+               alias_list=["ALIA 100"])
+    test_curr = Curriculum("TAMS", "High School Diploma with Honors", "ALIA",
+                           course_list=[x, y])
+    course = test_curr.get_course("OTHR 100")
+    assert (str(course) == "ALIA 100" and
+            course.course_title == "Longer title" and
+            course.course_description == "A longer description" and
+            course.alias_set == set(["ALIA 100", "OTHR 100"]) and
+            test_curr.alias_dict["OTHR 100"] == set(["ALIA 100", "OTHR 100"]))
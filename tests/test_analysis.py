@@ -0,0 +1,129 @@
+"""
+Unit tests for the budgeted diameter and transitivity estimates
+"""
+import random
+
+import networkx as nx
+
+from curriculummapper import AnalysisBudget, Course, Curriculum  # noqa: E402
+from curriculummapper.analysis import (AnalysisEngine,  # noqa: E402
+                                       diameter_bounds, graph_fingerprint,
+                                       transitivity_estimate)
+from curriculummapper.pagestore import PageStore  # noqa: E402
+
+
+def random_connected(n, m, seed):
+    rng = random.Random(seed)
+    graph = nx.Graph()
+    # a random tree keeps it connected
+    for node in range(1, n):
+        graph.add_edge(node, rng.randrange(node))
+    while graph.number_of_edges() < m:
+        graph.add_edge(*rng.sample(range(n), 2))
+    return graph
+
+
+# with enough sweeps iFUB proves the exact diameter
+def test_diameter_exact():
+    for seed in range(5):
+        graph = random_connected(300, 400, seed)
+        estimate = diameter_bounds(graph, sweeps=10000)
+        assert estimate.exact
+        assert estimate.value == nx.diameter(graph)
+    path = nx.path_graph(50)
+    assert diameter_bounds(path, sweeps=4) == (49, 49, 49, True)
+
+
+# small graphs are where stopping a level early goes wrong
+def test_diameter_exact_small():
+    for seed in range(3000):
+        rng = random.Random(seed)
+        n = rng.randint(2, 14)
+        graph = random_connected(n, rng.randint(n - 1, min(2 * n,
+                                                           n * (n - 1) // 2)),
+                                 seed)
+        estimate = diameter_bounds(graph, sweeps=10000)
+        assert estimate.exact
+        assert estimate.value == nx.diameter(graph), seed
+
+
+# a tight budget still brackets the true diameter
+def test_diameter_budget():
+    graph = random_connected(2000, 2100, 3)
+    estimate = diameter_bounds(graph, sweeps=5)
+    assert estimate.lower <= nx.diameter(graph) <= estimate.upper
+    assert estimate.value == estimate.lower
+
+
+# sampled transitivity lands inside its bounds
+def test_transitivity_estimate():
+    graph = nx.gnm_random_graph(400, 3000, seed=1)
+    estimate = transitivity_estimate(graph, samples=5000, seed=2)
+    assert not estimate.exact
+    assert estimate.lower <= nx.transitivity(graph) <= estimate.upper
+    small = nx.complete_graph(5)
+    assert transitivity_estimate(small, samples=5000) == (1, 1, 1, True)
+    assert transitivity_estimate(nx.path_graph(2)) == (0, 0, 0, True)
+
+
+# small curricula keep the exact numbers, bigger ones get Estimates
+def test_generate_graph_analysis_budget():
+    x = Course("DATA", "100", "Intro")
+    y = Course("DATA", "200", "Middle", prerequisites=[x])
+    z = Course("DATA", "300", "End", prerequisites=[y])
+    test_curr = Curriculum(course_list=[x, y, z])
+    test_curr.generate_nx()
+    test_curr.generate_graph_analysis()
+    assert test_curr.graph_analysis['subgraph_diameter'] == 2
+    assert test_curr.graph_analysis['subgraph_transitivity'] == 0
+    test_curr.analysis_budget = AnalysisBudget(exact_limit=0)
+    test_curr.generate_graph_analysis()
+    assert test_curr.graph_analysis['subgraph_diameter'] == (2, 2, 2, True)
+    assert test_curr.graph_analysis['subgraph_transitivity'].exact
+
+
+def small_curriculum(**kwargs):
+    x = Course("DATA", "100", "Intro")
+    y = Course("DATA", "200", "Middle", prerequisites=[x])
+    z = Course("DATA", "300", "End", prerequisites=[x, y])
+    return Curriculum(course_list=[x, y, z], **kwargs)
+
+
+# the fingerprint only depends on the nodes and edges
+def test_graph_fingerprint():
+    a = nx.DiGraph([("A", "B"), ("B", "C")])
+    b = nx.DiGraph()
+    b.add_nodes_from(["C", "B", "A"])
+    b.add_edges_from([("B", "C"), ("A", "B")])
+    assert graph_fingerprint(a) == graph_fingerprint(b)
+    b.add_edge("A", "C")
+    assert graph_fingerprint(a) != graph_fingerprint(b)
+
+
+# one engine shares its intermediates between metrics
+def test_engine_metrics():
+    graph = nx.DiGraph([("A", "B"), ("B", "C"), ("A", "C"), ("D", "E")])
+    engine = AnalysisEngine(graph)
+    results = engine.compute(['subgraph_number_of_nodes', 'subgraph_diameter',
+                              'most ancestors', 'least descendants'])
+    assert results['subgraph_number_of_nodes'] == 3
+    assert results['subgraph_diameter'] == 1
+    assert results['most ancestors'][:2] == [("C", 2), ("B", 1)]
+    assert results['least descendants'][0] == ("C", 0)
+    assert engine.largest_component is engine.largest_component
+
+
+# a second run over the same graph reads every metric from the cache
+def test_analysis_cache(tmp_path):
+    store = PageStore(str(tmp_path / "pages.sqlite3"))
+    first = small_curriculum(page_store=store)
+    first.generate_nx()
+    first.nx_analysis(key='descendants', nx_func=nx.descendants)
+    second = small_curriculum(page_store=store)
+    second.generate_nx()
+    second.nx_analysis(key='descendants', nx_func=nx.descendants)
+    assert second.graph_analysis == first.graph_analysis
+    assert second.graph_analysis['most_ancestors']['End'] == 2
+    engine = second.get_analysis_engine()
+    assert 'reachability' not in engine.__dict__
+    assert 'largest_component' not in engine.__dict__
@@ -0,0 +1,68 @@
+"""
+Unit tests for the batch eligibility audit
+"""
+import io
+import json
+import random
+
+from curriculummapper import Course, Curriculum, CourseRecord  # noqa: E402
+from curriculummapper import audit  # noqa: E402
+
+
+def sample_curriculum():
+    test_curr = Curriculum()
+    test_curr.add_record(CourseRecord("DATA", "100", "Intro", "", (), ()))
+    test_curr.add_record(CourseRecord("DATA", "200", "Middle", "",
+                                      ("DATA 100",), ()))
+    test_curr.add_record(CourseRecord(
+        "DATA", "300", "Modeling", "", ("DATA 200", "MATH 200"), (),
+        ("or", "DATA 200", "MATH 200")))
+    test_curr.add_record(CourseRecord("MATH", "100", "Algebra", "", (), ()))
+    test_curr.add_record(CourseRecord("MATH", "200", "Calculus", "",
+                                      ("MATH 100",), ("STAT 200",)))
+    return test_curr
+
+
+# every transcript gets the courses is_eligible allows and it hasn't taken
+def test_audit_matches_is_eligible(monkeypatch):
+    # a tiny block so the results stream out over several blocks
+    monkeypatch.setattr(audit, "BLOCK_BITS", 64)
+    test_curr = sample_curriculum()
+    keys = ["DATA 100", "DATA 200", "DATA 300", "MATH 100", "STAT 200",
+            "MATH 200", "BOGUS 100"]
+    rng = random.Random(0)
+    transcripts = [rng.sample(keys, rng.randint(0, 4)) for _ in range(37)]
+    result = test_curr.audit(transcripts)
+    assert len(result) == 37
+    rows = list(result.rows())
+    for position, completed in enumerate(transcripts):
+        done = test_curr.completed_handles(completed)
+        expected = [key for key in result.keys
+                    if test_curr.is_eligible(key, completed) and
+                    test_curr.node_handle(key) not in done]
+        assert result.courses_of(position) == expected
+        assert rows[position] == (position, expected)
+    students, courses = result.coordinates()
+    assert len(students) == sum(len(row[1]) for row in rows)
+    counts = result.counts()
+    assert counts == {key: sum(key in row[1] for row in rows)
+                      for key in result.keys}
+
+
+# student ids come along, completed courses can be kept, jsonl per student
+def test_audit_output():
+    test_curr = sample_curriculum()
+    result = test_curr.audit({"amy": ["DATA 100"],
+                              "bo": [Course("STAT", "200")]},
+                             include_completed=True)
+    # bo took STAT 200 (MATH 200) without MATH 100 so can't take it again
+    assert {student: set(courses) for student, courses in result.rows()} == {
+        "amy": {"DATA 100", "MATH 100", "DATA 200"},
+        "bo": {"DATA 100", "MATH 100", "DATA 300"}}
+    f = io.StringIO()
+    result.write_jsonl(f)
+    lines = [json.loads(line) for line in f.getvalue().splitlines()]
+    assert [line["student"] for line in lines] == ["amy", "bo"]
+    assert set(lines[1]["eligible"]) == {"DATA 100", "MATH 100",
+                                         "DATA 300"}
+    assert test_curr.audit([]).counts() == dict.fromkeys(result.keys, 0)
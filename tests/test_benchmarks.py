@@ -0,0 +1,37 @@
+"""
+Unit tests keeping the benchmark suite runnable
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "benchmarks"))
+
+from curriculummapper import Curriculum  # noqa: E402
+from synthetic import (SYNTHETIC_EXTRACTOR, courseleaf_pages,  # noqa: E402
+                       synthetic_records)
+from bench_pipeline import STAGES, compare, run_pipeline  # noqa: E402
+
+
+# the generator is seeded and its pages parse back into the same records
+def test_synthetic_round_trip():
+    records = synthetic_records(250, seed=3, alias_density=0.2,
+                                cycle_rate=0.05)
+    assert records == synthetic_records(250, seed=3, alias_density=0.2,
+                                        cycle_rate=0.05)
+    assert records != synthetic_records(250, seed=4)
+    test_curr = Curriculum()
+    extracted = [record for page in courseleaf_pages(records, 100)
+                 for record in SYNTHETIC_EXTRACTOR(page, test_curr)]
+    assert extracted == records
+
+
+# every stage runs and gets timed, regressions are found
+def test_run_pipeline(tmp_path):
+    timings = run_pipeline(300, cycle_rate=0.02, workdir=str(tmp_path))
+    assert list(timings) == STAGES
+    assert run_pipeline(100, skip=STAGES[1:]).keys() == {"extract"}
+    baseline = {"300": {"update": 1.0, "generate_nx": 0.5}}
+    results = {"300": {"update": 1.1, "generate_nx": 0.9}}
+    assert compare(results, baseline, 0.25) == [("300", "generate_nx",
+                                                 0.5, 0.9)]
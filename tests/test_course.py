@@ -45,6 +45,26 @@ def test_eq():
     assert (x == y)
 
 
+# equality goes by course_key, an int course code matches its string
+def test_eq_int_code():
+    x = Course("SUBJ", 1234)
+    y = Course("SUBJ", "1234")
+    assert (x == y and hash(x) == hash(y) and len({x, y}) == 1)
+
+
+# the sets handed out are copies that can't be changed in place
+def test_sets_frozen():
+    x = Course("CSDS", 1234, prerequisites=[Course()])
+    x.add_alias("ABCD 1234")
+    for ids in (x.alias_set, x.prerequisites):
+        try:
+            ids.add("EFGH 1234")
+            raise AssertionError("frozenset expected")
+        except AttributeError:
+            pass
+    assert x.alias_set == {"ABCD 1234"} and x.prerequisites == {Course()}
+
+
 # testing simple add_alias
 def test_alias():
     ''' should be sorted '''
@@ -0,0 +1,112 @@
+"""
+Unit tests for the CourseLeaf extractor
+"""
+
+
+from curriculummapper import Curriculum, CourseLeafExtractor  # noqa: E402
+from curriculummapper.courseleaf import has_class  # noqa: E402
+
+SFSU_PAGE = b"""<html><body><div class="sc_sccoursedescs">
+<div class="courseblock">
+<p class="courseblocktitle"><strong>MATH&#160;326 Linear Algebra (3)</strong>
+</p>
+<p class="courseblockdesc">Vector spaces and   linear maps.</p>
+<p class="courseblockextra">Prerequisite: <a class="bubblelink code">MATH
+&#160;226</a> or <a class="bubblelink code">CSC&#160;226</a>.</p>
+<a class="bubblelink code">MATH 326</a> and
+<a class="bubblelink code">CSC 326</a> are paired courses.</div>
+<div class="courseblock">
+<p class="courseblocktitle"><strong>MATH 226 Calculus I (4)</strong></p>
+<p class="courseblockdesc">Limits.</p></div>
+</div></body></html>"""
+
+CWRU_PAGE = b"""<html><body>
+<table class="sc_courselist"><tr><td><a>CSDS 132</a></td>
+<td>Intro to Java</td></tr></table>
+<div class="courseblock">
+<p class="courseblocktitle"><strong>CSDS 233.  Data Structures.  4 Units.
+</strong></p>
+<p class="courseblockdesc">Lists and trees. Offered as CSDS 233 and ECSE 233.
+ Prereq: CSDS 132 or ENGR 131.</p></div>
+</body></html>"""
+
+UCI_PAGE = b"""<html><body><div class="courseblock">
+<p class="courseblocktitle"><strong>MGMT 1A.  Accounting.  4 Units.</strong>
+</p>
+<div class="courseblockdesc"><p>Debits and credits.</p>
+<p>Prerequisite: MGMT 1.</p>
+<p>Overlaps with ECON 15.</p>
+<p>Restriction: Business majors only.</p></div></div>
+</body></html>"""
+
+
+def sfsu_curriculum():
+    return Curriculum("SFSU", "Extractor", "MATH",
+                      course_search=r"([A-Z]+\s*[A-Z]*\s\d{3}\w*)\s",
+                      subject_search=r"([A-Z]+\s*[A-Z]*)\s\d{3}")
+
+
+# titles, descriptions, bubblelink prereqs and paired courses
+def test_sfsu_blocks():
+    extractor = CourseLeafExtractor(
+        prereq_path=".//p[%s]//a[%s]" % (has_class("courseblockextra"),
+                                         has_class("bubblelink")),
+        paired_search=r"paired\scourse")
+    records = list(extractor(SFSU_PAGE, sfsu_curriculum()))
+    first = records[0]
+    assert (len(records) == 2 and
+            first.subject_code == "MATH" and first.course_code == "326" and
+            first.course_title == "Linear Algebra" and
+            first.course_description == "Vector spaces and linear maps." and
+            first.prerequisites == ("MATH 226", "CSC 226") and
+            set(first.aliases) == set(["MATH 326", "CSC 326"]) and
+            first.requirements == ("or", "MATH 226", "CSC 226") and
+            records[1].aliases == () and records[1].requirements is None)
+
+
+# description cut, prereq and alias sentences, requirement table rows
+def test_cwru_blocks():
+    extractor = CourseLeafExtractor(
+        desc_stop=r"Offered as|Prereq:",
+        prereq_search=r"Prereq: ([^!?.]*)",
+        alias_search=r"Offered as ([^!?.]*)",
+        courselist_class="sc_courselist")
+    records = list(extractor(CWRU_PAGE, Curriculum()))
+    row, block = records
+    assert (row.course_title == "Intro to Java" and
+            block.course_title == "Data Structures" and
+            block.course_description == "Lists and trees." and
+            block.prerequisites == ("CSDS 132", "ENGR 131") and
+            block.aliases == ("CSDS 233", "ECSE 233"))
+
+
+# matching paragraphs after the first one are kept in the description
+def test_uci_blocks():
+    extractor = CourseLeafExtractor(desc_extra=r"Overlaps|Restrict")
+    block, = extractor(UCI_PAGE, Curriculum(
+        course_search=r"([A-Z]{3}[A-Z]*\s\d\d*[A-Z]*)\b",
+        subject_search=r"([A-Z]{3}[A-Z]*)"))
+    assert (block.course_code == "1A" and
+            block.course_description == "Debits and credits.\n"
+            "Overlaps with ECON 15.\nRestriction: Business majors only.")
+
+
+# differently configured extractors never share cached records
+def test_version_includes_config():
+    assert (CourseLeafExtractor().version ==
+            CourseLeafExtractor().version !=
+            CourseLeafExtractor(desc_stop="Prereq").version)
+
+
+# ingest feeds the raw page to the extractor and adds the records
+def test_ingest_bytes(tmp_path):
+    from curriculummapper.pagestore import PageStore
+    store = PageStore(str(tmp_path / "pages.sqlite3"))
+    store.put("http://sfsu.example/math/", SFSU_PAGE)
+    test_curr = sfsu_curriculum()
+    test_curr.page_store = store
+    test_curr.ingest("http://sfsu.example/math/", CourseLeafExtractor(
+        prereq_path=".//a[%s]" % has_class("bubblelink"),
+        paired_search=r"paired\scourse"))
+    assert (str(test_curr.get_course("CSC 326")) == "MATH 326" and
+            test_curr.soup is None)
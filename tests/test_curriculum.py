@@ -44,6 +44,25 @@ def test_prereq_recursion():
             str(test_curr.course_dict[str(y)]) == str(y))
 
 
+def test_prereq_details():
+    '''
+    a prereq given as a Course keeps its title and description, both in
+    the curriculum and in prerequisites, even if its id came first
+    '''
+    x = Course("DATA", "100", "Intro", "Numbers")
+    w = Course("DATA", "50", "Counting")
+    x.add_prereq(w)
+    y = Course("DATA", "200", "Middle", prerequisites=[x])
+    test_curr = Curriculum(course_list=["DATA 100"])
+    test_curr.add_course(y)
+    assert (test_curr.course_dict["DATA 100"].course_title == "Intro" and
+            test_curr.course_dict["DATA 100"].course_description ==
+            "Numbers" and
+            test_curr.course_dict["DATA 50"].course_title == "Counting")
+    prereq, = y.prerequisites
+    assert prereq is x and prereq.course_title == "Intro"
+
+
 def test_adding_repeated_course():
     '''
     when adding a course with less details the details should be preserved
@@ -80,3 +99,61 @@ def test_alias():
     test_curr.add_course(y)
     test_curr.add_course(x)
     assert str(test_curr.get_course("YMCA 1234")) == "CSDS 1234"
+
+
+def test_generate_nx_cached():
+    ''' nothing changed means generate_nx leaves the graph alone '''
+    x = Course("DATA", "100")
+    y = Course("DATA", "200", prerequisites=[x])
+    test_curr = Curriculum(course_list=[x, y])
+    graph = test_curr.get_nx()
+    version = test_curr.graph_version
+    test_curr.generate_nx()
+    assert (test_curr.get_nx() is graph and
+            test_curr.graph_version == version and
+            list(graph.edges) == [("DATA 100", "DATA 200")])
+
+
+def test_generate_nx_incremental():
+    ''' an alias added after the first build moves the edges over '''
+    x = Course("DATA", "300", prerequisites=[Course("YMCA", "300")])
+    test_curr = Curriculum("TAMS", "High School Diploma with Honors", "CSDS",
+                           course_list=[x])
+    test_curr.generate_nx()
+    test_curr.add_course(Course("CSDS", "300", "Sound Engineering",
+                                alias_list=["CSDS 300", "YMCA 300"]))
+    graph = test_curr.get_nx()
+    assert (sorted(graph.nodes) == ["CSDS 300", "DATA 300"] and
+            list(graph.edges) == [("CSDS 300", "DATA 300")])
+
+
+def test_generate_nx_add_subject():
+    ''' a subject colored after the first build regroups its courses '''
+    x = Course("DATA", "200")
+    y = Course("STAT", "200", prerequisites=[x])
+    test_curr = Curriculum(course_list=[x, y])
+    graph = test_curr.get_nx()
+    color = graph.nodes["STAT 200"]["color"]
+    assert graph.nodes["STAT 200"]["group"] == 0
+    test_curr.add_subject("STAT", "Greens")
+    test_curr.generate_nx()
+    assert (graph.nodes["STAT 200"]["group"] ==
+            test_curr.colored_subjects.index("STAT") + 1 and
+            graph.nodes["STAT 200"]["color"] != color)
+
+
+def test_render_titles():
+    ''' tooltips are only made for renderers and redone after changes '''
+    x = Course("DATA", "100", "Intro")
+    y = Course("DATA", "200", "Middle", prerequisites=[x])
+    test_curr = Curriculum(course_list=[x, y])
+    graph = test_curr.get_nx()
+    assert all('title' not in data for _, data in graph.nodes(data=True))
+    test_curr.render_titles()
+    assert graph.nodes["DATA 200"]['title'] == y.full_desc(tooltip=True)
+    test_curr.add_course(Course("DATA", "200", "", "Now with words"))
+    test_curr.generate_nx()
+    assert 'title' not in graph.nodes["DATA 200"]
+    assert 'title' in graph.nodes["DATA 100"]
+    test_curr.render_titles()
+    assert "Now with words" in graph.nodes["DATA 200"]['title']
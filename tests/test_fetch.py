@@ -0,0 +1,95 @@
+"""
+Unit tests for prefetching against a local stand-in server
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from curriculummapper import Curriculum  # noqa: E402
+from curriculummapper.fetch import HostRateLimiter  # noqa: E402
+from curriculummapper.pagestore import PageStore  # noqa: E402
+
+
+class BulletinHandler(BaseHTTPRequestHandler):
+    ''' serves a tiny page for /courses/<subject>/, 404 otherwise '''
+    hits = []
+
+    def do_GET(self):
+        BulletinHandler.hits.append(self.path)
+        if not self.path.startswith("/courses/"):
+            self.send_error(404)
+            return
+        etag = '"%s"' % self.path.split("/")[2]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = ("<html><body><h1>%s</h1></body></html>" %
+                self.path.split("/")[2]).encode()
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    ''' local bulletin server, the cache goes to a temp directory '''
+    monkeypatch.chdir(tmp_path)
+    BulletinHandler.hits = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), BulletinHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:%d" % httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+# every miss gets downloaded once, get_soup then reads from the cache
+def test_prefetch_fills_cache(server):
+    urls = [server + "/courses/%s/" % s for s in ("math", "csc", "stat")]
+    test_curr = Curriculum("TAMS", "Prefetch")
+    fetched = test_curr.prefetch(urls, max_workers=3, per_host_rate=0)
+    soup = test_curr.get_soup(urls[1])
+    assert (sorted(fetched) == sorted(urls) and
+            len(BulletinHandler.hits) == 3 and
+            soup.find("h1").string == "csc")
+
+
+# cached pages are not requested again, failures are skipped
+def test_prefetch_skips_cached(server):
+    urls = [server + "/courses/math/", server + "/missing/"]
+    test_curr = Curriculum("TAMS", "Prefetch")
+    test_curr.prefetch(urls[:1], per_host_rate=0)
+    fetched = test_curr.prefetch(urls, per_host_rate=0)
+    assert fetched == [] and BulletinHandler.hits.count("/courses/math/") == 1
+
+
+# stale pages are revalidated with If-None-Match and kept on a 304
+def test_prefetch_revalidates(server):
+    url = server + "/courses/math/"
+    store = PageStore("pages.sqlite3", max_age=0)
+    test_curr = Curriculum("TAMS", "Prefetch", page_store=store)
+    test_curr.prefetch([url], per_host_rate=0)
+    digest = store.entry(url).digest
+    fetched = test_curr.prefetch([url], per_host_rate=0)
+    assert (fetched == [url] and len(BulletinHandler.hits) == 2 and
+            store.entry(url).digest == digest and
+            test_curr.get_soup(url).find("h1").string == "math")
+
+
+# requests to one host are spaced out by the rate limit, other hosts aren't
+def test_rate_limiter_spacing():
+    limiter = HostRateLimiter(per_host_rate=50)
+    start = time.monotonic()
+    for i in range(3):
+        limiter.wait("http://a.example/%d" % i)
+    limiter.wait("http://b.example/0")
+    elapsed = time.monotonic() - start
+    assert 0.04 <= elapsed < 0.5
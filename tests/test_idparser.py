@@ -0,0 +1,63 @@
+"""
+Unit tests for the memoized course id parser
+"""
+import re
+
+from curriculummapper import Course, Curriculum  # noqa: E402
+from curriculummapper.idparser import first_group  # noqa: E402
+
+
+# the first capturing group is pulled out of a search pattern
+def test_first_group():
+    assert (first_group(r"([A-Z]+\s*[A-Z]*)\s\d{3}") == r"[A-Z]+\s*[A-Z]*"
+            and first_group(r"(?:x)(a(b)[)]c)") == r"a(b)[)]c" and
+            first_group(r"\d+") == r"\d+")
+
+
+# one pattern gives the same split as the two separate searches did
+def test_split_matches_findall():
+    searches = [(r"([A-Z]{4})", r"(\d+\w*)",
+                 ["CSDS 132", "MATH 121A", "STAT\xa0312"]),
+                (r"([A-Z]+\s*[A-Z]*)\s\d{3}", r"(\d+\w*)",
+                 ["MATH 226", "CSC 210", "MATH\xa0326"]),
+                (r"([A-Z]{3}[A-Z]*)", r"(\d+\w*)",
+                 ["MGMT 1A", "ECON 20B", "STATS 7"])]
+    for subject_search, code_search, ids in searches:
+        test_curr = Curriculum(subject_search=subject_search,
+                               code_search=code_search)
+        for course_id in ids:
+            norm_id = course_id.replace("\xa0", " ")
+            assert test_curr.course_id_to_list(course_id) == (
+                re.findall(subject_search, norm_id)[0],
+                re.findall(code_search, norm_id)[0])
+
+
+# repeated ids are served from the cache
+def test_memoized():
+    test_curr = Curriculum()
+    parse = test_curr.id_parser.parse
+    for _ in range(3):
+        test_curr.course_id_to_list("CSDS 132")
+        test_curr.get_course("CSDS 132")
+    assert parse.cache_info().misses == 1
+
+
+# ids with a non-breaking space find the same course
+def test_key_normalizes():
+    test_curr = Curriculum(course_list=["MATH 121"])
+    assert (test_curr.id_parser.key("MATH\xa0121") == "MATH 121" and
+            str(test_curr.get_course("MATH\xa0121")) == "MATH 121")
+
+
+# keys the id pattern can't read are still found as they are
+def test_exact_key_first():
+    test_curr = Curriculum(course_list=[Course("STATS", "7")])
+    assert str(test_curr.get_course("STATS 7")) == "STATS 7"
+    assert test_curr.node_handle("STATS 7") == test_curr.get_course(
+        "STATS 7").handle
+    try:
+        test_curr.get_course("no course here")
+    except KeyError as e:
+        assert e.args == ("no course here",)
+    else:
+        assert False
@@ -0,0 +1,41 @@
+"""
+Unit tests for the dependency-light core import
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# the course model loads without the graph, drawing and scraping stacks
+def test_core_import_is_light():
+    code = ("import sys; sys.path.insert(0, %r)\n"
+            "import curriculummapper\n"
+            "from curriculummapper import Course, Curriculum\n"
+            "x = Course('DATA', '100')\n"
+            "c = Curriculum(course_list=[x, Course('DATA', '200',"
+            " prerequisites=[x])])\n"
+            "assert c.get_course('DATA 200').prerequisites == {x}\n"
+            "print(' '.join(m for m in ('networkx', 'numpy', 'matplotlib',"
+            " 'pyvis', 'requests', 'bs4', 'lxml') if m in sys.modules))"
+            % ROOT)
+    out = subprocess.run([sys.executable, "-c", code], check=True,
+                         capture_output=True, text=True).stdout
+    assert out.strip() == ""
+
+
+# lazy names still come out of the package
+def test_lazy_exports():
+    import curriculummapper
+    from curriculummapper.analysis import AnalysisBudget
+    assert curriculummapper.AnalysisBudget is AnalysisBudget
+    assert "CourseLeafExtractor" in curriculummapper.__all__
+
+
+# making a Curriculum doesn't touch the filesystem
+def test_no_makedirs(tmp_path, monkeypatch):
+    from curriculummapper import Curriculum
+    monkeypatch.chdir(tmp_path)
+    Curriculum("TAMS", "Nothing on Disk")
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,83 @@
+"""
+Unit tests for the pipeline instrumentation
+"""
+import json
+
+from curriculummapper import (Course, Curriculum, Instrument,  # noqa: E402
+                              JsonSink)
+from curriculummapper.instrument import NULL_INSTRUMENT  # noqa: E402
+from curriculummapper.pagestore import PageStore  # noqa: E402
+
+
+def small_curriculum(**kwargs):
+    x = Course("DATA", "100", "Intro")
+    y = Course("DATA", "200", "Middle", prerequisites=[x],
+               alias_list=["STAT 200"])
+    z = Course("DATA", "300", "End", prerequisites=[y])
+    return Curriculum("TAMS", "Data", "DATA", course_list=[x, y, z],
+                      **kwargs)
+
+
+# every stage reports its span to the callback, counters add up
+def test_pipeline_spans(tmp_path):
+    events = []
+    instrument = Instrument(sinks=[events.append])
+    test_curr = small_curriculum(instrument=instrument,
+                                 page_store=PageStore(str(tmp_path /
+                                                          "p.sqlite3")))
+    test_curr.add_course(Course("DATA", "300", "End, the longer title"))
+    test_curr.generate_nx()
+    names = [event["name"] for event in events if event["type"] == "span"]
+    assert "update" in names and "generate_nx" in names
+    assert "analysis.subgraph_diameter" in names
+    # per course spans are only totalled
+    assert "add_course_object" not in names
+    spans = instrument.spans
+    assert spans["add_course_object"]["count"] >= 4
+    assert spans["generate_nx"]["wall"] >= spans["analysis"]["wall"]
+    counters = instrument.counters
+    assert counters["courses_added"] == 4
+    assert counters["alias_unions"] == 1
+    assert counters["absorbs"] >= 2
+    assert counters["analysis_cache_misses"] == 8
+    # same graph again, this time from the analysis cache
+    again = small_curriculum(instrument=instrument,
+                             page_store=test_curr.page_store)
+    again.add_course(Course("DATA", "300", "End, the longer title"))
+    again.generate_nx()
+    assert counters["analysis_cache_hits"] == 8
+    summary = instrument.flush()
+    assert events[-1] is summary
+    assert summary["counters"]["courses_added"] == 8
+
+
+# nested spans of one name count once in the time totals, memory peaks
+def test_nesting_and_memory(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    instrument = Instrument(sinks=[JsonSink(path)], memory=True)
+    with instrument.span("outer"):
+        with instrument.span("outer"):
+            kept = [0] * 100000
+        with instrument.span("inner"):
+            pass
+    del kept
+    instrument.close()
+    totals = instrument.spans["outer"]
+    assert totals["count"] == 2
+    assert totals["peak"] >= 800000
+    assert instrument.spans["inner"]["peak"] < 800000
+    with open(path) as f:
+        events = [json.loads(line) for line in f]
+    assert [(e["name"], e["depth"]) for e in events] == [("outer", 1),
+                                                         ("inner", 1),
+                                                         ("outer", 0)]
+    assert totals["wall"] == events[-1]["wall"]
+
+
+# without an instrument nothing is collected
+def test_disabled():
+    test_curr = small_curriculum()
+    assert test_curr.instrument is NULL_INSTRUMENT
+    test_curr.generate_nx()
+    assert NULL_INSTRUMENT.flush() == {"type": "summary", "spans": {},
+                                       "counters": {}}
@@ -0,0 +1,55 @@
+"""
+Unit tests for the layered layout and its cache
+"""
+import networkx as nx
+
+from curriculummapper import Course, Curriculum  # noqa: E402
+from curriculummapper.layout import (depths, layered_layout,  # noqa: E402
+                                     spring_layout)
+from curriculummapper.pagestore import PageStore  # noqa: E402
+
+
+def crossings(graph, positions):
+    count = 0
+    edges = list(graph.edges)
+    for i, (a, b) in enumerate(edges):
+        for c, d in edges[i + 1:]:
+            if (positions[a][1] == positions[c][1] and
+                    positions[b][1] == positions[d][1] and
+                    (positions[a][0] - positions[c][0]) *
+                    (positions[b][0] - positions[d][0]) < 0):
+                count += 1
+    return count
+
+
+# rows follow the longest prerequisite chain, cycles share a row
+def test_depths():
+    graph = nx.DiGraph([("A", "B"), ("B", "C"), ("A", "C"), ("D", "C")])
+    assert depths(graph) == {"A": 0, "D": 0, "B": 1, "C": 2}
+    graph.add_edges_from([("C", "E"), ("E", "C")])
+    assert depths(graph)["E"] == depths(graph)["C"] == 2
+
+
+# prerequisites sit above, and the barycenter sweeps untangle edges
+def test_layered_layout():
+    graph = nx.DiGraph([("A", "Y"), ("B", "X"), ("A", "Y2"), ("B", "X2")])
+    positions = layered_layout(graph)
+    assert all(positions[u][1] < positions[v][1] for u, v in graph.edges)
+    assert crossings(graph, positions) == 0
+    assert len(set(positions.values())) == len(graph)
+    assert set(spring_layout(graph)) == set(graph)
+
+
+# positions are kept per graph in the page store and reused
+def test_layout_cache(tmp_path):
+    store = PageStore(str(tmp_path / "pages.sqlite3"))
+    x = Course("DATA", "100", "Intro")
+    y = Course("DATA", "200", "Middle", prerequisites=[x])
+    first = Curriculum(course_list=[x, y], page_store=store)
+    positions = first.get_layout()
+    assert positions["DATA 100"][1] < positions["DATA 200"][1]
+    second = Curriculum(course_list=[y, x], page_store=store)
+    second.generate_nx()
+    assert second.get_layout_cache().get(second.get_fingerprint(),
+                                         "layered") == positions
+    assert second.get_layout() == positions
@@ -0,0 +1,53 @@
+"""
+Unit tests for the SQLite page store
+"""
+
+
+from curriculummapper.pagestore import PageStore  # noqa: E402
+
+
+# stored pages come back byte for byte
+def test_put_get(tmp_path):
+    store = PageStore(str(tmp_path / "pages.sqlite3"))
+    store.put("http://a.example/x/", b"<html>x</html>", etag='"1"')
+    assert (store.get("http://a.example/x/") == b"<html>x</html>" and
+            store.get("http://a.example/y/") is None and
+            store.entry("http://a.example/x/").etag == '"1"')
+
+
+# urls ending in the same segment no longer overwrite each other
+def test_full_url_keys(tmp_path):
+    store = PageStore(str(tmp_path / "pages.sqlite3"))
+    store.put("http://a.example/one/math/", b"one")
+    store.put("http://a.example/two/math/", b"two")
+    assert (store.get("http://a.example/one/math/") == b"one" and
+            store.get("http://a.example/two/math/") == b"two")
+
+
+# identical bodies are stored once, replaced bodies are dropped
+def test_content_addressed(tmp_path):
+    store = PageStore(str(tmp_path / "pages.sqlite3"))
+    store.put("http://a.example/1", b"same")
+    store.put("http://a.example/2", b"same")
+    store.put("http://a.example/2", b"new")
+    blobs = store.connection.execute("SELECT COUNT(*) FROM blobs").fetchone()
+    assert blobs[0] == 2 and len(store) == 2
+
+
+# two stores on one file share the pages
+def test_shared_file(tmp_path):
+    path = str(tmp_path / "pages.sqlite3")
+    PageStore(path).put("http://a.example/1", b"shared")
+    assert PageStore(path).get("http://a.example/1") == b"shared"
+
+
+# max_age and expire decide when a page needs revalidating
+def test_freshness(tmp_path):
+    store = PageStore(str(tmp_path / "pages.sqlite3"), max_age=3600)
+    store.put("http://a.example/1", b"x", last_modified="yesterday")
+    fresh = store.is_fresh(store.entry("http://a.example/1"))
+    store.expire("http://a.example/1")
+    assert (fresh and
+            not store.is_fresh(store.entry("http://a.example/1")) and
+            store.conditional_headers("http://a.example/1") ==
+            {"If-Modified-Since": "yesterday"})
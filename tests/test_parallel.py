@@ -0,0 +1,81 @@
+"""
+Unit tests for parallel ingestion and merging curricula
+"""
+import pickle
+
+from curriculummapper import Course, Curriculum  # noqa: E402
+from curriculummapper import CourseLeafExtractor, CourseRecord  # noqa: E402
+from curriculummapper.pagestore import PageStore  # noqa: E402
+
+PAGE = """<html><body><div class="courseblock">
+<p class="courseblocktitle"><strong>%s 101. Intro. 3 Units.</strong></p>
+<p class="courseblockdesc">About %s. Prereq: MATH 100.</p></div>
+<div class="courseblock">
+<p class="courseblocktitle"><strong>%s 201. More. 3 Units.</strong></p>
+<p class="courseblockdesc">Prereq: %s 101.</p></div></body></html>"""
+
+
+def extractor():
+    return CourseLeafExtractor(desc_stop=r"Prereq:",
+                               prereq_search=r"Prereq: ([^!?.]*)")
+
+
+def page_store(tmp_path, subjects):
+    store = PageStore(str(tmp_path / "pages.sqlite3"))
+    for subj in subjects:
+        store.put("http://a.example/%s/" % subj,
+                  (PAGE % (subj, subj, subj, subj)).encode())
+    return store
+
+
+# courses and extractors survive a trip to another process
+def test_pickle():
+    x = Course("PICK", "101", "Title", "Desc", [Course("PICK", "100")],
+               ["PICK 101", "OTHR 101"])
+    y = pickle.loads(pickle.dumps(x))
+    z = pickle.loads(pickle.dumps(extractor()))
+    assert (y == x and y.course_title == "Title" and
+            y.prereq_ids == x.prereq_ids and y.alias_ids == x.alias_ids and
+            z.version == extractor().version)
+
+
+# the process pool gives the same curriculum as ingesting one by one
+def test_ingest_all_matches_ingest(tmp_path):
+    subjects = ["CSDS", "STAT", "DSCI"]
+    urls = ["http://a.example/%s/" % subj for subj in subjects]
+    parallel = Curriculum(page_store=page_store(tmp_path / "p", subjects))
+    count = parallel.ingest_all(urls, extractor(), max_workers=2)
+    serial = Curriculum(page_store=page_store(tmp_path / "s", subjects))
+    for url in urls:
+        serial.ingest(url, extractor())
+    assert (count == 6 and parallel.num_courses() == 7 and
+            parallel.course_dict == serial.course_dict and
+            parallel.get_course("STAT 201").prereq_ids ==
+            serial.get_course("STAT 201").prereq_ids)
+
+
+# merge follows absorb for details and add_alias_group for aliases
+def test_merge():
+    first = Curriculum("TAMS", "Merge", "CSDS", course_list=[
+        Course("CSDS", "300", "Short", "A long description")])
+    second = Curriculum(course_list=[
+        Course("YMCA", "300", "A longer title",
+               prerequisites=[Course("MATH", "100")],
+               alias_list=["CSDS 300", "YMCA 300"])])
+    first.merge(second)
+    course = first.get_course("YMCA 300")
+    assert (str(course) == "CSDS 300" and
+            course.course_title == "A longer title" and
+            course.course_description == "A long description" and
+            second.get_course("YMCA 300").course_description == "" and
+            "MATH 100" in first.course_dict)
+
+
+# from_parts reduces curricula and record batches alike
+def test_from_parts():
+    part = Curriculum(course_list=[Course("PART", "100")])
+    records = [CourseRecord("PART", "200", "Two", "", ("PART 100",), ())]
+    whole = Curriculum.from_parts([part, records], university="TAMS")
+    assert (whole.university == "TAMS" and whole.num_courses() == 2 and
+            whole.get_course("PART 200").prereq_ids ==
+            set([whole.get_course("PART 100").handle]))
@@ -0,0 +1,77 @@
+"""
+Unit tests for the semester planner
+"""
+import random
+
+import networkx as nx
+
+from curriculummapper import Course, Curriculum  # noqa: E402
+from curriculummapper.planner import layers, schedule  # noqa: E402
+from curriculummapper.reachability import ReachabilityIndex  # noqa: E402
+
+
+def chain_curriculum():
+    a = Course("MATH", "100", "Algebra")
+    b = Course("MATH", "200", "Calculus", prerequisites=[a])
+    c = Course("MATH", "300", "Analysis", prerequisites=[b])
+    d = Course("DATA", "100", "Programming")
+    e = Course("DATA", "200", "Data Science", prerequisites=[b, d],
+               alias_list=["STAT 200"])
+    f = Course("HIST", "100", "History")
+    return Curriculum(course_list=[a, b, c, d, e, f])
+
+
+# longest path levels match networkx on a random DAG
+def test_layers_match_networkx():
+    rng = random.Random(5)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(120))
+    for _ in range(250):
+        u, v = sorted(rng.sample(range(120), 2))
+        graph.add_edge(u, v)
+    index = ReachabilityIndex({n: set(graph.pred[n]) for n in graph})
+    expected = {}
+    for node in nx.topological_sort(graph):
+        expected[node] = max((expected[p] + 1 for p in graph.pred[node]),
+                             default=0)
+    assert layers(index, graph.nodes) == expected
+    plan = schedule(index, graph.nodes, max_courses=7)
+    term_of = {node: i for i, term in enumerate(plan.terms)
+               for node in term}
+    assert len(term_of) == 120
+    assert all(len(term) <= 7 for term in plan.terms)
+    assert all(term_of[u] < term_of[v] for u, v in graph.edges)
+
+
+# only the closure of the targets is planned, under the cap
+def test_plan():
+    test_curr = chain_curriculum()
+    plan = test_curr.plan(["STAT 200"])
+    assert plan.terms == [["MATH 100", "DATA 100"], ["MATH 200"],
+                          ["DATA 200"]]
+    assert plan.levels == {"MATH 100": 0, "DATA 100": 0, "MATH 200": 1,
+                           "DATA 200": 2}
+    # the longer chain goes first when only one course fits
+    plan = test_curr.plan(subjects=["MATH", "DATA"], max_courses=1)
+    assert plan.terms[0] == ["MATH 100"]
+    assert len(plan.terms) == 5
+    # completed courses and what they needed drop out
+    plan = test_curr.plan(["MATH 300", "DATA 200"], completed=["MATH 200"])
+    assert plan.terms == [["DATA 100", "MATH 300"], ["DATA 200"]]
+    plan = test_curr.plan(["DATA 200"], max_credits=6,
+                          credits={"MATH 100": 4, "STAT 200": 5})
+    assert plan.terms == [["MATH 100"], ["DATA 100", "MATH 200"],
+                          ["DATA 200"]]
+    assert plan.loads == [4, 6, 5]
+
+
+# courses requiring each other share a term
+def test_plan_cycle():
+    a = Course("PHYS", "100", "Mechanics")
+    b = Course("PHYS", "101", "Lab", prerequisites=[a])
+    a.add_prereq(b)
+    c = Course("PHYS", "200", "Waves", prerequisites=[a])
+    test_curr = Curriculum(course_list=[a, b, c])
+    plan = test_curr.plan(["PHYS 200"], max_courses=1)
+    assert sorted(plan.terms[0]) == ["PHYS 100", "PHYS 101"]
+    assert plan.terms[1] == ["PHYS 200"]
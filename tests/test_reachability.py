@@ -0,0 +1,119 @@
+"""
+Unit tests for the bitset reachability counts
+"""
+import random
+
+import networkx as nx
+
+from curriculummapper import Course, Curriculum  # noqa: E402
+from curriculummapper.reachability import (ReachabilityIndex,  # noqa: E402
+                                           reachability_counts)
+
+
+def nx_counts(graph):
+    return ({n: len(nx.ancestors(graph, n)) for n in graph},
+            {n: len(nx.descendants(graph, n)) for n in graph})
+
+
+# same numbers as networkx on a random prerequisite DAG
+def test_dag_matches_networkx():
+    rng = random.Random(7)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(200))
+    for _ in range(600):
+        u, v = sorted(rng.sample(range(200), 2))
+        graph.add_edge(u, v)
+    assert reachability_counts(graph) == nx_counts(graph)
+
+
+# graphs with cycles fall back on the condensation
+def test_cycles_match_networkx():
+    graph = nx.DiGraph([(1, 2), (2, 3), (3, 1), (3, 4), (4, 5), (5, 4),
+                        (0, 1), (6, 6)])
+    assert reachability_counts(graph) == nx_counts(graph)
+
+
+# nx_analysis and generate_graph_analysis use the one-sweep counts
+def test_nx_analysis_descendants():
+    x = Course("DATA", "100", "Intro")
+    y = Course("DATA", "200", "Middle", prerequisites=[x])
+    z = Course("DATA", "300", "End", prerequisites=[y])
+    test_curr = Curriculum(course_list=[x, y, z])
+    test_curr.generate_nx()
+    test_curr.nx_analysis('descendants', nx.descendants)
+    assert (test_curr.graph_analysis['most descendants'] ==
+            {"Intro": 2, "Middle": 1, "End": 0} and
+            test_curr.graph_analysis['most_ancestors'] ==
+            {"End": 2, "Middle": 1, "Intro": 0})
+
+
+# the index answers like networkx, with and without cycles
+def test_index_matches_networkx():
+    rng = random.Random(3)
+    for cycles in (0, 15):
+        graph = nx.DiGraph()
+        graph.add_nodes_from(range(150))
+        for _ in range(300):
+            u, v = sorted(rng.sample(range(150), 2))
+            graph.add_edge(u, v)
+        for _ in range(cycles):
+            u, v = sorted(rng.sample(range(150), 2))
+            graph.add_edge(v, u)
+        index = ReachabilityIndex({n: set(graph.pred[n]) for n in graph})
+        for n in graph:
+            assert set(index.ancestors_of(n)) == nx.ancestors(graph, n)
+            assert set(index.descendants_of(n)) == nx.descendants(graph, n)
+        for _ in range(500):
+            a, b = rng.sample(range(150), 2)
+            assert index.reaches(a, b) == nx.has_path(graph, a, b)
+        assert (set(index.ancestors_of_all([5, 70, 140])) ==
+                nx.ancestors(graph, 5) | nx.ancestors(graph, 70) |
+                nx.ancestors(graph, 140))
+
+
+# deep layered graphs, a cycle at the bottom asked about whole
+def test_index_layered():
+    rng = random.Random(5)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(2000))
+    for v in range(50, 2000):
+        for u in rng.sample(range(v - v % 50), 2):
+            graph.add_edge(u, v)
+    graph.add_edges_from([(1999, 1998), (1998, 1999)])
+    index = ReachabilityIndex({n: set(graph.pred[n]) for n in graph})
+    for n in rng.sample(range(2000), 50):
+        assert set(index.ancestors_of(n)) == nx.ancestors(graph, n)
+        assert set(index.descendants_of(n)) == nx.descendants(graph, n)
+    assert (set(index.ancestors_of_all([1998, 1999])) ==
+            nx.ancestors(graph, 1998) | nx.ancestors(graph, 1999))
+
+
+# curriculum queries go through aliases and follow new courses
+def test_curriculum_queries():
+    x = Course("DATA", "100", "Intro")
+    y = Course("DATA", "200", "Middle", prerequisites=[x],
+               alias_list=["STAT 200"])
+    z = Course("DATA", "300", "End", prerequisites=[Course("STAT", "200")])
+    test_curr = Curriculum(course_list=[x, y, z])
+    assert test_curr.prerequisites_of("DATA 300") == {"DATA 100", "DATA 200"}
+    assert test_curr.prerequisites_of(z, transitive=False) == {"DATA 200"}
+    assert test_curr.unlocked_by("DATA 100") == {"DATA 200", "DATA 300"}
+    assert test_curr.is_prerequisite("STAT 200", "DATA 300")
+    assert not test_curr.is_prerequisite("DATA 300", "DATA 100")
+    # the diGraph was never built
+    assert test_curr.nx_graph is None
+    w = Course("DATA", "400", "Capstone", prerequisites=[z])
+    test_curr.add_course(w)
+    assert test_curr.prerequisites_of_many(["DATA 400", "DATA 200"]) == {
+        "DATA 400": {"DATA 100", "DATA 200", "DATA 300"},
+        "DATA 200": {"DATA 100"}}
+    assert test_curr.unlocked_by_many(["DATA 200", "DATA 300"],
+                                      combined=True) == {"DATA 300",
+                                                         "DATA 400"}
+    assert test_curr.is_prerequisite_many([("DATA 100", "DATA 400"),
+                                           ("DATA 400", "DATA 100")]) == [
+        True, False]
+    test_curr.generate_nx()
+    for key in test_curr.diGraph:
+        assert (test_curr.prerequisites_of(key) ==
+                nx.ancestors(test_curr.diGraph, key))
@@ -0,0 +1,80 @@
+"""
+Unit tests for the parsed-record cache
+"""
+
+
+from curriculummapper import Curriculum, CourseRecord  # noqa: E402
+from curriculummapper.pagestore import PageStore  # noqa: E402
+from curriculummapper.records import RecordCache, extractor_key  # noqa: E402
+
+PAGE = (b"<html><body><div class='courseblock'>CSDS 201</div>"
+        b"<div class='courseblock'>CSDS 301</div></body></html>")
+
+
+def block_extractor(soup, curriculum):
+    ''' every courseblock is a course requiring the one before it '''
+    block_extractor.calls += 1
+    previous = ()
+    for tag in soup.find_all("div", {"class": "courseblock"}):
+        subject_code, course_code = curriculum.course_id_to_list(tag.string)
+        yield CourseRecord(subject_code, course_code, "Title", "", previous,
+                           ())
+        previous = (tag.string,)
+
+
+block_extractor.version = 1
+
+
+# records survive the trip through the cache
+def test_round_trip(tmp_path):
+    cache = RecordCache(PageStore(str(tmp_path / "pages.sqlite3")))
+    record = CourseRecord("CSDS", "101", "Intro", "Desc", ("MATH 121",),
+                          ("STAT 101",))
+    cache.put("abc", "x:1", [record])
+    assert cache.get("abc", "x:1") == [record] and cache.get("abc", "x:2") \
+        is None
+
+
+# the extractor version is part of the cache key
+def test_extractor_key():
+    assert extractor_key(block_extractor).endswith("block_extractor:1")
+
+
+# the second ingest of an unchanged page skips the extractor
+def test_ingest_cached(tmp_path):
+    store = PageStore(str(tmp_path / "pages.sqlite3"))
+    store.put("http://a.example/csds/", PAGE)
+    block_extractor.calls = 0
+    first = Curriculum("TAMS", "Records", page_store=store)
+    first.ingest("http://a.example/csds/", block_extractor)
+    second = Curriculum("TAMS", "Records", page_store=store)
+    count = second.ingest("http://a.example/csds/", block_extractor)
+    assert (count == 2 and block_extractor.calls == 1 and
+            second.course_dict == first.course_dict and
+            second.get_course("CSDS 301").prereq_ids ==
+            set([second.get_course("CSDS 201").handle]))
+
+
+def search_extractor(soup, curriculum):
+    ''' every id the curriculum's course_search finds is a course '''
+    for course_id in curriculum.course_search.findall(soup.get_text()):
+        yield CourseRecord(*curriculum.course_id_to_list(course_id),
+                           "Title", "", (), ())
+
+
+# curricula with other id patterns don't share records on one store
+def test_ingest_patterns(tmp_path):
+    store = PageStore(str(tmp_path / "pages.sqlite3"))
+    store.put("http://a.example/mixed/",
+              b"<html><body><p>CSDS 201 and BIO 12 and BIO 34</p>"
+              b"</body></html>")
+    first = Curriculum("TAMS", "Records", page_store=store)
+    assert first.ingest("http://a.example/mixed/", search_extractor) == 1
+    second = Curriculum("TAMS", "Other Records", page_store=store,
+                        course_search=r"([A-Z]{3}\s\d{2})\b",
+                        subject_search=r"([A-Z]{3})",
+                        code_search=r"(\d{2})")
+    assert second.ingest("http://a.example/mixed/", search_extractor) == 2
+    assert sorted(second.course_dict) == ["BIO 12", "BIO 34"]
+    assert (extractor_key(search_extractor, first.parser_settings()) !=
+            extractor_key(search_extractor, second.parser_settings()))
@@ -0,0 +1,48 @@
+"""
+Unit tests for the course registry
+"""
+
+
+from curriculummapper import Course, Curriculum  # noqa: E402
+from curriculummapper.registry import REGISTRY  # noqa: E402
+
+
+# same course id should always give the same handle
+def test_intern_stable():
+    assert (REGISTRY.intern("REGI 101") == REGISTRY.intern("REGI 101") and
+            REGISTRY.key(REGISTRY.intern("REGI 101")) == "REGI 101")
+
+
+# lookup should never create a handle
+def test_lookup_missing():
+    assert REGISTRY.lookup("ZZZZ 999999") is None
+
+
+# courses with the same id hash the same regardless of title
+def test_hash_ignores_title():
+    x = Course("REGI", "102")
+    y = Course("REGI", "102", "A title")
+    assert hash(x) == hash(y) and len(set([x, y])) == 1
+
+
+# courses should not carry a __dict__
+def test_slots():
+    x = Course()
+    assert not hasattr(x, "__dict__")
+
+
+# prerequisites are kept as handles but read back as Course objects
+def test_prereq_ids():
+    x = Course("REGI", "103")
+    y = Course("REGI", "104", prerequisites=[x])
+    assert y.prereq_ids == set([x.handle]) and y.prerequisites == set([x])
+
+
+# course_dict is a string keyed view of the handle keyed courses
+def test_course_dict_view():
+    x = Course("REGI", "105")
+    test_curr = Curriculum(course_list=[x])
+    assert (test_curr.courses == {x.handle: x} and
+            "REGI 105" in test_curr.course_dict and
+            list(test_curr.course_dict) == ["REGI 105"] and
+            test_curr.course_dict.get("REGI 106") is None)
@@ -0,0 +1,70 @@
+"""
+Unit tests for the streaming report exporter
+"""
+import csv
+import io
+import json
+from contextlib import redirect_stdout
+
+from curriculummapper import Course, Curriculum  # noqa: E402
+from curriculummapper.report import write_text  # noqa: E402
+
+
+def sample_curriculum():
+    x = Course("DATA", "100", "Intro", "Numbers")
+    y = Course("DATA", "200", "Middle", prerequisites=[x])
+    test_curr = Curriculum("TAMS", "Report Degree", "DATA",
+                           course_list=[x, y])
+    test_curr.add_course(Course("STAT", "200", "Middle",
+                                alias_list=["DATA 200", "STAT 200"]))
+    test_curr.set_url("https://example.edu/data/")
+    test_curr.generate_nx()
+    return test_curr
+
+
+# the text report is what print_all used to print into its file
+def test_text_report():
+    test_curr = sample_curriculum()
+    expected = io.StringIO()
+    with redirect_stdout(expected):
+        print('Sources:')
+        for u in test_curr.url_list:
+            print("\t" + str(u) + "\n")
+        print("----------")
+        print(str(test_curr))
+        print("----------")
+        print("Course Inventory contains %d courses..." %
+              test_curr.num_courses())
+        for x in test_curr.course_dict:
+            print("----------")
+            print(test_curr.course_dict[x].full_desc(heading=True))
+        print("----------")
+        test_curr.print_graph_analysis()
+    written = io.StringIO()
+    write_text(test_curr, written)
+    assert written.getvalue() == expected.getvalue()
+
+
+# jsonl and csv hold the same inventory, aliases, edges and analysis
+def test_structured_reports(tmp_path):
+    test_curr = sample_curriculum()
+    paths = test_curr.export(("jsonl", "csv"), base=str(tmp_path / "r"))
+    assert [p.rsplit("/", 1)[1] for p in paths] == [
+        "r.jsonl", "r_courses.csv", "r_aliases.csv", "r_edges.csv",
+        "r_analysis.csv"]
+    with open(paths[0]) as f:
+        lines = [json.loads(line) for line in f]
+    types = [line["type"] for line in lines]
+    assert types.count("course") == 3 and types.count("edge") == 1
+    assert {"type": "edge", "prerequisite": "DATA 100",
+            "course": "DATA 200"} in lines
+    group = next(line for line in lines if line["type"] == "alias_group")
+    assert group == {"type": "alias_group", "canonical": "DATA 200",
+                     "members": ["DATA 200", "STAT 200"]}
+    with open(paths[1], newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[1]["prerequisites"] == "DATA 100"
+    with open(paths[4], newline="") as f:
+        analysis = {row["metric"]: json.loads(row["value"])
+                    for row in csv.DictReader(f)}
+    assert analysis["number_of_nodes"] == 2
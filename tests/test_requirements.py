@@ -0,0 +1,104 @@
+"""
+Unit tests for the and/or prerequisite expressions
+"""
+import pickle
+import re
+
+from curriculummapper import Course, Curriculum, CourseRecord  # noqa: E402
+from curriculummapper.requirements import (compile_requirement,  # noqa: E402
+                                           parse_requirements)
+
+COURSE_SEARCH = re.compile(r"([A-Z]{4}\s\d{3}\w*)")
+
+
+def parse(text):
+    return parse_requirements(text, COURSE_SEARCH)
+
+
+# commas, connectives, brackets and "one of" nest the way they read
+def test_parse():
+    assert parse("MATH 226 or MATH 227, and CSCI 210") == (
+        "and", ("or", "MATH 226", "MATH 227"), "CSCI 210")
+    assert parse("MATH 226, MATH 227, or CSCI 210") == (
+        "or", "MATH 226", "MATH 227", "CSCI 210")
+    assert parse("CSCI 210 and one of MATH 226, MATH 227, or MATH 228.") == (
+        "and", "CSCI 210", ("or", "MATH 226", "MATH 227", "MATH 228"))
+    assert parse("(MATH 226 or MATH 227) and (CSCI 210 or CSCI 211); "
+                 "PHYS 220 with a grade of C or better.") == (
+        "and", ("or", "MATH 226", "MATH 227"), ("or", "CSCI 210", "CSCI 211"),
+        "PHYS 220")
+    assert parse("MATH 226/MATH 227 and CSCI 210") == (
+        "and", ("or", "MATH 226", "MATH 227"), "CSCI 210")
+    assert parse("MATH 226 or permission of the instructor") == "MATH 226"
+    assert parse("Consent of the department.") is None
+
+
+# bracketed remarks without ids don't cut the parse short
+def test_parse_remarks():
+    assert parse("CSCI 210 (C or better) or CSCI 211 (C or better)") == (
+        "or", "CSCI 210", "CSCI 211")
+    assert parse("MATH 226 (or equivalent) or MATH 227") == (
+        "or", "MATH 226", "MATH 227")
+    assert parse("CSCI 210 (or CSCI 211) and MATH 226") == (
+        "and", ("or", "CSCI 210", "CSCI 211"), "MATH 226")
+    assert parse("(C or better) MATH 226 and (MATH 227 or MATH 228)") == (
+        "and", "MATH 226", ("or", "MATH 227", "MATH 228"))
+
+
+# the compiled check agrees with reading the expression
+def test_compile():
+    check = compile_requirement(parse("MATH 226 or MATH 227, and CSCI 210"))
+    assert check({"MATH 227", "CSCI 210"})
+    assert not check({"MATH 226", "MATH 227"})
+    assert compile_requirement(None)(set())
+
+
+# edges and full_desc don't change, the logic sits next to them
+def test_course_requirements():
+    record = CourseRecord("DATA", "300", "Modeling", "Models.",
+                          ("MATH 226", "MATH 227", "CSCI 210"), (),
+                          ("and", ("or", "MATH 226", "MATH 227"),
+                           "CSCI 210"))
+    plain = CourseRecord(*record[:6])
+    flat_curr = Curriculum()
+    flat_curr.add_record(plain)
+    test_curr = Curriculum()
+    test_curr.add_record(record)
+    course = test_curr.get_course("DATA 300")
+    assert (course.full_desc() ==
+            flat_curr.get_course("DATA 300").full_desc())
+    assert course.requirements == record.requirements
+    flat = flat_curr.get_course("DATA 300").requirements
+    assert flat[0] == "and" and set(flat[1:]) == {"CSCI 210", "MATH 226",
+                                                  "MATH 227"}
+    test_curr.generate_nx()
+    assert set(test_curr.diGraph.pred["DATA 300"]) == {
+        "MATH 226", "MATH 227", "CSCI 210"}
+    assert pickle.loads(pickle.dumps(course)).requirements == \
+        record.requirements
+    assert test_curr.is_eligible("DATA 300", ["MATH 227", "CSCI 210"])
+    assert test_curr.eligible_many("DATA 300", [
+        ["MATH 226"], ["MATH 226", "CSCI 210"], []]) == [False, True, False]
+
+
+# aliases bring their own requirements and count as each other
+def test_alias_requirements(tmp_path):
+    test_curr = Curriculum()
+    test_curr.add_record(CourseRecord(
+        "DATA", "300", "Modeling", "", ("MATH 226", "STAT 226"), (),
+        ("or", "MATH 226", "STAT 226")))
+    test_curr.add_record(CourseRecord(
+        "STAT", "300", "Modeling", "", ("CSCI 210",), ("DATA 300",)))
+    test_curr.add_course(Course("STAT", "226", "Stats",
+                                alias_list=["STAT 226", "ECON 226"]))
+    expr = test_curr.requirements_of("STAT 300")
+    assert expr[0] == "and" and set(expr[1:]) == {
+        ("or", "MATH 226", "STAT 226"), "CSCI 210"}
+    assert test_curr.is_eligible("STAT 300", ["ECON 226", "CSCI 210"])
+    assert not test_curr.is_eligible("DATA 300", ["CSCI 210"])
+    # snapshots keep the expressions
+    path = str(tmp_path / "curriculum.snap")
+    test_curr.save(path)
+    loaded = Curriculum.load(path)
+    assert (loaded.requirements_of("STAT 300") ==
+            test_curr.requirements_of("STAT 300"))
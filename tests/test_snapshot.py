@@ -0,0 +1,95 @@
+"""
+Unit tests for the binary snapshot save / load
+"""
+import pickle
+
+import pytest
+
+from curriculummapper import Course, Curriculum, CourseStore  # noqa: E402
+from curriculummapper.snapshot import Snapshot, SnapshotCourse  # noqa: E402
+
+
+def sample_curriculum():
+    x = Course("DATA", "100", "Intro", "Numbers and such")
+    y = Course("DATA", "200", "Middle", "Más números", prerequisites=[x])
+    z = Course("DATA", "300", "End", prerequisites=[x, y,
+                                                    Course("MATH", "99")])
+    test_curr = Curriculum("TAMS", "Snapshot Degree", "DATA",
+                           course_list=[x, y, z], colored_subjects=["MATH"],
+                           palette={"MATH": "Reds"})
+    test_curr.add_course(Course("STAT", "200", "Middle Again",
+                                alias_list=["DATA 200", "STAT 200"]))
+    test_curr.set_url("https://example.edu/data/")
+    return test_curr
+
+
+def summary(curriculum):
+    return ({key: (course.course_title, course.course_description,
+                   sorted(map(str, course.prerequisites)),
+                   sorted(course.alias_set))
+             for key, course in curriculum.course_dict.items()},
+            {key: sorted(group)
+             for key, group in curriculum.alias_dict.items()},
+            str(curriculum.get_course("STAT 200")))
+
+
+# the loaded curriculum has the same courses, aliases and graph
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_load(tmp_path, mmap):
+    test_curr = sample_curriculum()
+    path = str(tmp_path / "tams.snap")
+    test_curr.save(path)
+    loaded = Curriculum.load(path, mmap=mmap)
+    assert summary(loaded) == summary(test_curr)
+    assert str(loaded) == str(test_curr)
+    assert loaded.url_list == test_curr.url_list
+    assert loaded.colored_subjects == test_curr.colored_subjects
+    assert loaded.palette == {"MATH": "Reds"}
+    assert (sorted(loaded.get_nx().edges) ==
+            sorted(test_curr.get_nx().edges))
+
+
+# the arrays are views into the mapped file
+def test_snapshot_view(tmp_path):
+    path = str(tmp_path / "tams.snap")
+    sample_curriculum().save(path)
+    with Snapshot(path) as snapshot:
+        assert len(snapshot) == 5
+        assert snapshot.string(snapshot.courses[0]) == "DATA 100"
+        assert isinstance(snapshot.courses, memoryview)
+        assert snapshot.meta["degree_name"] == "Snapshot Degree"
+    (tmp_path / "junk").write_bytes(b"not a snapshot" * 10)
+    with pytest.raises(ValueError):
+        Snapshot(str(tmp_path / "junk"))
+
+
+# subclasses load as themselves
+def test_load_store(tmp_path):
+    store = CourseStore("TAMS", "DATA")
+    store.merge(sample_curriculum())
+    path = str(tmp_path / "store.snap")
+    store.save(path)
+    loaded = CourseStore.load(path)
+    assert isinstance(loaded, CourseStore)
+    assert str(loaded) == str(store)
+    view = loaded.program("Data Minor", subjects=["DATA"])
+    original = store.program("Data Minor", subjects=["DATA"])
+    assert set(view.course_dict) == set(original.course_dict)
+
+
+# details stay in the mapped file until they're read or set
+def test_lazy_details(tmp_path):
+    path = str(tmp_path / "tams.snap")
+    sample_curriculum().save(path)
+    loaded = Curriculum.load(path)
+    course = loaded.get_course("DATA 200")
+    assert isinstance(course, SnapshotCourse)
+    assert loaded.snapshot is course.snapshot
+    with pytest.raises(AttributeError):
+        Course.course_description.__get__(course, Course)
+    assert course.course_description == "Más números"
+    course.append_course_title("Middle of the Road")
+    assert course.course_title == "Middle of the Road"
+    copied = pickle.loads(pickle.dumps(course))
+    assert type(copied) is Course
+    assert copied.course_title == "Middle of the Road"
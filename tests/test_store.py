@@ -0,0 +1,97 @@
+"""
+Unit tests for the shared course store and program views
+"""
+
+
+import json  # noqa: E402
+
+from curriculummapper import Course, CourseStore, Curriculum  # noqa: E402
+
+
+def university():
+    store = CourseStore("TAMS", "MATH")
+    store.add_course(Course("MATH", "100", "Algebra"))
+    store.add_course(Course("MATH", "200", "Calculus",
+                            prerequisites=[Course("MATH", "100")]))
+    store.add_course(Course("CSC", "300", "Algorithms",
+                            prerequisites=[Course("MATH", "200")]))
+    store.add_course(Course("CSC", "100", "Programming"))
+    store.add_course(Course("HIST", "100", "History"))
+    return store
+
+
+# views select by subject without copying course objects
+def test_subject_view():
+    store = university()
+    view = store.program("BS in CS", subjects=["CSC"], closure=False)
+    assert (sorted(view.course_dict) == ["CSC 100", "CSC 300"] and
+            view.course_dict["CSC 300"] is store.course_dict["CSC 300"])
+
+
+# course lists pull in their prerequisite closure
+def test_closure_view():
+    store = university()
+    view = store.program("Minor", course_list=["CSC 300"])
+    graph = view.get_nx()
+    assert (sorted(view.course_dict) == ["CSC 300", "MATH 100", "MATH 200"]
+            and sorted(graph.edges) == [("MATH 100", "MATH 200"),
+                                        ("MATH 200", "CSC 300")])
+
+
+# views follow courses added to the store later
+def test_view_follows_store():
+    store = university()
+    view = store.program("Minor", course_list=["CSC 300"])
+    view.generate_nx()
+    store.add_course(Course("CSC", "300", prerequisites=[
+        Course("CSC", "100")]))
+    graph = view.get_nx()
+    assert (view.num_courses() == 4 and
+            ("CSC 100", "CSC 300") in graph.edges and
+            "HIST 100" not in graph)
+
+
+# aliases are resolved once in the store for every view
+def test_view_aliases():
+    store = university()
+    view = store.program("Minor", subjects=["HIST"], closure=False)
+    store.add_alias_group(["HIST 100", "MATH 150"])
+    store.add_course(Course("MATH", "150", "History of Mathematics"))
+    assert (str(view.get_course("HIST 100")) == "MATH 150" and
+            sorted(view.get_nx().nodes) == ["MATH 150"])
+
+
+# views only see the alias groups and courses inside the program
+def test_view_alias_groups(tmp_path):
+    store = university()
+    store.add_course(Course("STAT", "200", "Statistics"))
+    store.add_alias_group(["MATH 200", "STAT 200"])
+    store.add_alias_group(["HIST 100", "CSC 100"])
+    view = store.program("Minor", subjects=["HIST", "CSC"], closure=False)
+    assert view.alias_dict == {"CSC 100": {"CSC 100", "HIST 100"},
+                               "HIST 100": {"CSC 100", "HIST 100"}}
+    (path,) = view.export(("jsonl",), base=str(tmp_path / "minor"))
+    with open(path) as f:
+        lines = [json.loads(line) for line in f]
+    assert [line["members"] for line in lines
+            if line["type"] == "alias_group"] == [["CSC 100", "HIST 100"]]
+    view.save(str(tmp_path / "minor.snap"))
+    loaded = Curriculum.load(str(tmp_path / "minor.snap"), mmap=False)
+    assert "STAT 200" not in loaded.alias_dict
+    try:
+        view.get_course("MATH 100")
+        raise AssertionError("MATH 100 is outside the program")
+    except KeyError:
+        pass
+
+
+# views answer reachability over their own selection
+def test_view_reachability():
+    store = university()
+    view = store.program("Minor", course_list=["CSC 300"])
+    assert view.prerequisites_of("CSC 300") == {"MATH 100", "MATH 200"}
+    store.add_course(Course("CSC", "400", "Theory",
+                            prerequisites=[Course("CSC", "300")]))
+    assert store.unlocked_by("MATH 100") == {"MATH 200", "CSC 300",
+                                             "CSC 400"}
+    assert view.unlocked_by("MATH 100") == {"MATH 200", "CSC 300"}
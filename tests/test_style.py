@@ -0,0 +1,44 @@
+"""
+Unit tests for the batch node styling
+"""
+import matplotlib
+import numpy as np
+
+from curriculummapper import Course, Curriculum  # noqa: E402
+from curriculummapper.style import node_colors  # noqa: E402
+
+
+# same colors as normalizing and converting one node at a time
+def test_node_colors_match_matplotlib():
+    colormaps = [matplotlib.colormaps[name]
+                 for name in ("Greys", "Blues", "Greens")]
+    codes = np.arange(0, 1200, 7)
+    groups = codes % 3
+    norm = matplotlib.colors.Normalize(0, 700)
+    expected = [matplotlib.colors.rgb2hex(colormaps[group](norm(code)))
+                for code, group in zip(codes, groups)]
+    assert node_colors(codes, groups, colormaps, 700).tolist() == expected
+
+
+# every colored subject can pick its own colormap
+def test_palette():
+    x = Course("MATH", "100", "Intro")
+    y = Course("COMP", "200", "Middle", prerequisites=[x])
+    z = Course("PHYS", "300", "End", prerequisites=[y])
+    test_curr = Curriculum(course_list=[x, y, z],
+                           colored_subjects=["MATH", "COMP"],
+                           palette={"COMP": "Reds"})
+    test_curr.generate_nx()
+    nodes = test_curr.diGraph.nodes
+    groups = [nodes[key]['group']
+              for key in ("MATH 100", "COMP 200", "PHYS 300")]
+    assert groups == [1, 2, 0]
+    assert [c.name for c in test_curr.colormaps()] == ["Greys", "Blues",
+                                                       "Reds"]
+    assert nodes["MATH 100"]['size'] == 12
+    assert nodes["PHYS 300"]['size'] == 10
+    before = nodes["COMP 200"]['color']
+    test_curr.palette["COMP"] = "Oranges"
+    test_curr.touch(y.handle)
+    test_curr.generate_nx()
+    assert nodes["COMP 200"]['color'] != before